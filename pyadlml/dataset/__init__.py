@@ -7,7 +7,7 @@ from pyadlml.dataset._datasets.kasteren_2010 import fetch_kasteren_2010
 from pyadlml.dataset._datasets.casas_houses import fetch_casas
 
 from pyadlml.dataset._datasets.homeassistant import (
-    load_homeassistant, load_homeassistant_devices
+    load_homeassistant, load_homeassistant_devices, sync_homeassistant_devices
 )
 
 from pyadlml.dataset._datasets.activity_assistant import load as load_act_assist
@@ -109,10 +109,11 @@ def create_empty_activity_df():
     """
     returns: empty pd Dataframe 
     """
-    df = pd.DataFrame(columns=[START_TIME, END_TIME, ACTIVITY])
-    df[START_TIME] = pd.to_datetime(df[START_TIME])
-    df[END_TIME] = pd.to_datetime(df[END_TIME])
-    return df
+    return pd.DataFrame({
+        START_TIME: pd.Series(dtype='datetime64[ns]'),
+        END_TIME: pd.Series(dtype='datetime64[ns]'),
+        ACTIVITY: pd.Series(dtype=object),
+    })
 
 
 def add_other_activity(acts, min_diff=pd.Timedelta('5s')):
@@ -350,8 +351,9 @@ def _is_activity_et_after_st(df):
 
 def correct_activity_overlap(df_act, strategies=[], excep=[]):
     """ solve the merge overlapping interval problem
-        worst runtime is O(n^2)
-        average runtime is O()
+
+    The overlapping areas are found with a sweep line in O(n log n) and each
+    area is corrected on its own.
 
     Parameters
     ----------
@@ -373,107 +375,94 @@ def correct_activity_overlap(df_act, strategies=[], excep=[]):
                    .sort_values(START_TIME)\
                    .reset_index(drop=True)
 
-    res = create_empty_activity_df()
-    corrections = []
+    lefts, rights = _overlapping_areas(
+        df_act[START_TIME].values.astype(np.int64),
+        df_act[END_TIME].values.astype(np.int64)
+    )
 
-    # get all activities that have an overlap with a direct preceding interval
-    mask = (df_act[START_TIME].shift(-1) -
-            df_act[END_TIME]) <= pd.Timedelta('0ms')
-    idxs_succ_overlaps = np.array(list(df_act[mask].index))
-
-    i_l, i = 0, 0
-    while i < len(idxs_succ_overlaps):
-        # Append correct parts up to another overlap to result
-        i_h = idxs_succ_overlaps[i]
-        # exclusive i_h e,g 0->2 is [0,1]
-        res = pd.concat([res, df_act.iloc[i_l:i_h, :]])
-
-        # Get index of first element where start_time is lesser than the end_time
-        # this marks the point where we can copy again indices
-        i_l = i_h
-        i_h = _first_non_overlapped_int_after_idx(df_act, i_h)
-
-        # only for last iteration
-        if i == len(idxs_succ_overlaps)-1:
-            area_to_correct = df_act.iloc[i_l:i_h, :]
-            result = _correct_overlapping_segment(
-                area_to_correct, strategies, excep)
-            corrections.append((area_to_correct, result))
-            res = pd.concat([res, result])
-            break
-
-        # If the last overlapped interval exceeds any pair of overlapping indices, extent the range to
-        # include them and adjust the loop iteration
-        if (i_h >= idxs_succ_overlaps[i+1:]).any():
-            """ 
-            for all succ ov indicies get the maximum of the extented range
-            e.g max-int = 4
-               1 |~~~~~~~~~~~~~~|
-               2          |--|
-               3              |~~~~| 
-               4                 |---|
-               5                       |---| <----- max-int = 5
-               6                            |~~~~|
-               7                              |-|
-            """
-            for idx in idxs_succ_overlaps[i+1:]:
-                if idx >= i_h:
-                    break
-                # If the succeeding pair is in the range of the overlap skip the next outer loop iteration
-                # and set the upper overlap limit to the maximum of the included rows
-                i += 1
-                i_h = max(_first_non_overlapped_int_after_idx(df_act, idx), i_h)
+    corrections = []
+    for i_l, i_h in zip(lefts, rights):
         area_to_correct = df_act.iloc[i_l:i_h, :].copy()
         result = _correct_overlapping_segment(
             area_to_correct, strategies, excep)
 
         assert not result.empty
         corrections.append((area_to_correct, result))
-        res = pd.concat([res, result])
-        i += 1
-        i_l = i_h
-
-    res = pd.concat([res, df_act.iloc[i_h:, :]])
-
-    # sanity checks
-    assert len(res) >= len(df_act)
-    added_entrys = 0
-    for corr in corrections:
-        added_entrys += len(corr[1]) - len(corr[0])
-    assert len(res) - added_entrys == len(df_act)
 
+    # Fill the untouched rows and the corrected areas into one frame
+    n_res = len(df_act) + sum(len(corr[1]) - len(corr[0]) for corr in corrections)
+    st = np.empty(n_res, dtype='datetime64[ns]')
+    et = np.empty(n_res, dtype='datetime64[ns]')
+    act = np.empty(n_res, dtype=object)
+
+    act_st = df_act[START_TIME].values
+    act_et = df_act[END_TIME].values
+    act_act = df_act[ACTIVITY].values
+
+    def fill(pos, i_l, i_h):
+        k = pos + i_h - i_l
+        st[pos:k], et[pos:k], act[pos:k] = act_st[i_l:i_h], act_et[i_l:i_h], act_act[i_l:i_h]
+        return k
+
+    pos, i_prev = 0, 0
+    for i_l, i_h, (_, result) in zip(lefts, rights, corrections):
+        pos = fill(pos, i_prev, i_l)
+        k = pos + len(result)
+        st[pos:k] = pd.to_datetime(result[START_TIME]).values
+        et[pos:k] = pd.to_datetime(result[END_TIME]).values
+        act[pos:k] = result[ACTIVITY].values
+        pos, i_prev = k, i_h
+    pos = fill(pos, i_prev, len(df_act))
+    assert pos == n_res
+
+    # The values of timezone aware columns are in UTC and are localized again
+    tz = df_act[START_TIME].dt.tz
+    if tz is not None:
+        st = pd.DatetimeIndex(st).tz_localize('UTC').tz_convert(tz)
+        et = pd.DatetimeIndex(et).tz_localize('UTC').tz_convert(tz)
+
+    res = pd.DataFrame({START_TIME: st, END_TIME: et, ACTIVITY: act})
     res = res.sort_values(by=START_TIME)
     res = res.reset_index(drop=True)
     return res, corrections
 
 
-def _first_non_overlapped_int_after_idx(df, idx):
-    """ Returns the index of the first element in the dataframe where the
-    start_time is greater than the end_time of the interval that overlaps 
-    the succeeding one. Thus marking the overlapping areas that need correction.
-        idx=3 |----------------------|
-        4         |~~~~~~|
-        5                  |++++++++++++++++|
-        6                               |~~~~|
-        => Returns 6
+def _overlapping_areas(st, et):
+    """ Sweeps over the intervals sorted by start time and returns the areas of
+    two or more intervals that overlap each other transitively.
+        0 |----------|
+        1     |~~|
+        2          |+++++|
+        3                    |~~~|
+        => Returns ([0], [3])
 
     Parameters
     ----------
-    df : pd.DataFrame
-        activity dataframe
-    idx : int
-        index of the row where the interval overlaps the succeeding row(s)
+    st : np.ndarray
+        The sorted start times as integers
+    et : np.ndarray
+        The end times as integers
 
     Returns
     -------
-    res : int
-        index of a row
+    lefts : np.ndarray
+        The index of the first row of each area
+    rights : np.ndarray
+        The index after the last row of each area
     """
-    try:
-        return list(df[df[START_TIME] > df.iloc[idx, :].end_time].index)[0]
-    except IndexError:
-        # The intervals overlap the whole dataframe including the last row
-        return len(df)
+    if len(st) < 2:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    # An interval opens a new area if it starts after every preceding interval ended
+    reach = np.maximum.accumulate(et)
+    is_first = np.empty(len(st), dtype=bool)
+    is_first[0] = True
+    is_first[1:] = st[1:] > reach[:-1]
+
+    lefts = np.flatnonzero(is_first)
+    rights = np.append(lefts[1:], len(st))
+    mask = (rights - lefts) >= 2
+    return lefts[mask], rights[mask]
 
 
 def _correct_overlapping_segment(area_to_correct, strats, excepts=[]):
@@ -1,9 +1,10 @@
 """
 this file is to bring datasets into specific representations
 """
+import numpy as np
 import pandas as pd
-from pyadlml.util import get_parallel, get_npartitions
 from pyadlml.constants import OTHER, TIME, ACTIVITY, START_TIME, END_TIME
+from pyadlml.dataset._core.devices import DeviceEvents
 
 def label_data(df_devs: pd.DataFrame, df_acts: pd.DataFrame, other=False, n_jobs=1, inplace=True):
     """
@@ -11,7 +12,7 @@ def label_data(df_devs: pd.DataFrame, df_acts: pd.DataFrame, other=False, n_jobs
 
     Parameters
     ----------
-    df_devs : pd.DataFrame
+    df_devs : pd.DataFrame or DeviceEvents
         some data representation that possesses a column 'time' including timestamps.
     df_acts : pd.DataFrame
         a datasets activities. TODO
@@ -19,7 +20,8 @@ def label_data(df_devs: pd.DataFrame, df_acts: pd.DataFrame, other=False, n_jobs
         if true this leads to datapoints not falling into a logged activity to be
         labeled as "other"
     n_jobs : int, optional, default=1
-        the number of jobs that are run in parallel TODO look up sklearn
+        Deprecated and without effect. The labeling is done in a single vectorized
+        pass and does not benefit from parallelization anymore.
     inplace : bool, optional, default=True
         determines whether a new column is appended to the existing dataframe.
 
@@ -32,7 +34,7 @@ def label_data(df_devs: pd.DataFrame, df_acts: pd.DataFrame, other=False, n_jobs
     3 2008-03-20 00:34:39  False  ...   False
 
     now include
-    >>> label_data(raw, data.df_activities, other=True, n_jobs=10)
+    >>> label_data(raw, data.df_activities, other=True)
     1 time                    0   ...      13 activity
     2 2008-03-20 00:34:38  False  ...    True other
     3 2008-03-20 00:34:39  False  ...   False act1
@@ -41,40 +43,28 @@ def label_data(df_devs: pd.DataFrame, df_acts: pd.DataFrame, other=False, n_jobs
     -------
     df : pd.DataFrame
     """
-
-    df_devs = df_devs.copy()
-    df_devs[ACTIVITY] = -1
-
-    if n_jobs == 1:
-        df_devs[ACTIVITY] = df_devs[TIME].apply(
-                    _map_timestamp2activity,
-                    df_act=df_acts,
-                    other=other)
+    if isinstance(df_devs, DeviceEvents):
+        labels = _map_timestamps2activities(pd.Series(df_devs.timestamps), df_acts, other)
+        df_devs = df_devs.to_df()
     else:
-        N = get_npartitions()
-        if n_jobs == -1 or n_jobs > N:
-            n_jobs = N
-
-        import dask.dataframe as dd
-        #ddf_activities = dd.from_pandas(df_activities, npartitions=get_npartitions())
-        # compute with dask in parallel
-        df_devs[ACTIVITY] = dd.from_pandas(df_devs[TIME], npartitions=n_jobs).\
-                    map_partitions( # apply lambda functions on each partition
-                        lambda df: df.apply(
-                            _map_timestamp2activity,
-                            df_act=df_acts,
-                            other=other)).\
-                    compute(scheduler='processes')
+        labels = _map_timestamps2activities(df_devs[TIME], df_acts, other)
+        df_devs = df_devs.copy()
+    df_devs[ACTIVITY] = labels
     return df_devs
 
 
+def _map_timestamps2activities(timestamps, df_act, other):
+    """ Map every timestamp to the activity in df_act whose closed
+    interval [start_time, end_time] contains the timestamp.
 
-def _map_timestamp2activity(timestamp, df_act, other):
-    """ Map the given timestamp map to an activity in df_act
+    The activities are sorted by start time once and each timestamp is
+    looked up with a binary search over the running maximum of the end
+    times. This runs in O((N + M) log M) instead of O(N*M) for N timestamps
+    and M activities.
 
     Parameters
     ----------
-    timestamp : pd.Timestamp
+    timestamps : pd.Series
         E.g timestamp 2008-02-26 00:39:25
     df_act : pd.DataFrame
         An activity dataframe
@@ -83,32 +73,37 @@ def _map_timestamp2activity(timestamp, df_act, other):
 
     Returns
     -------
-        label of the activity
+    labels : np.ndarray of dtype object
+        The activity label for each timestamp
     """
-
-    # select activity intervals that the timestamp falls into
-    mask = (df_act[START_TIME] <= timestamp) & (timestamp <= df_act[END_TIME])
-    matches = df_act[mask]
-    match_amount = len(matches.index)
-
-    # 1. case no activity interval matched
-    if match_amount == 0 and other:
-        return OTHER
-    elif match_amount == 0 and not other:
-        return pd.NaT
-
-    # 2. case single row matches
-    elif match_amount == 1:
-        return matches.activity.values[0]
-    
-    # 3. case multiple rows
-    else:
-        print()
-        print('*'*70)
-        print('ts: ', timestamp)
-        print('matches: ', matches)
-        print('matches_amount: ', match_amount)
-        print('overlap of activities. this should be handled when loading activities')
-        print('*'*70)
-        raise ValueError
-
+    ts = timestamps.values
+    labels = np.full(len(ts), OTHER if other else pd.NaT, dtype=object)
+    if len(df_act) == 0 or len(ts) == 0:
+        return labels
+
+    df_act = df_act.sort_values(by=START_TIME, kind='stable')
+    st = df_act[START_TIME].values
+    et = df_act[END_TIME].values
+    acts = df_act[ACTIVITY].values
+
+    # The first activity k whose running maximal end time reaches the timestamp
+    # is the earliest interval that may contain it. If k does not start before
+    # the timestamp no interval contains the timestamp at all.
+    et_cummax = np.maximum.accumulate(et)
+    k = np.searchsorted(et_cummax, ts, side='left')
+    has_match = (k < len(st))
+    has_match[has_match] = st[k[has_match]] <= ts[has_match]
+
+    # Fast path: when the intervals are disjoint each timestamp falls into
+    # at most one interval, otherwise count the matches per timestamp.
+    if not (st[1:] > et_cummax[:-1]).all():
+        nr_matches = np.searchsorted(st, ts, side='right') \
+                   - np.searchsorted(np.sort(et), ts, side='left')
+        if (nr_matches > 1).any():
+            timestamp = timestamps.iloc[np.argmax(nr_matches > 1)]
+            mask = (df_act[START_TIME] <= timestamp) & (timestamp <= df_act[END_TIME])
+            matches = df_act[mask]
+            raise ValueError(f'overlapping activities at {timestamp}:\n{matches}')
+
+    labels[has_match] = acts[k[has_match]]
+    return labels
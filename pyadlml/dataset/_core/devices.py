@@ -1,3 +1,6 @@
+import functools
+import hashlib
+from collections import OrderedDict
 from pathlib import Path
 import numpy as np
 from scipy import signal as sc_signal
@@ -28,6 +31,225 @@ COLS_DEV = [TIME, DEVICE, VALUE]
  """
 
 
+class DeviceEvents():
+    """ Immutable, dictionary encoded store of device events.
+
+    The events are kept in time order as nanosecond timestamps and device codes.
+    Timezone aware times are stored in UTC together with their timezone.
+    The values are split by the datatype of their device. Booleans are stored as bool,
+    numericals as float and categorical values as codes into :attr:`categories`.
+    The events of every device are indexed once on creation, such that accessing the
+    events of one device does not require masking the whole dataset.
+
+    Parameters
+    ----------
+    df_devs : pd.DataFrame
+        A device dataframe. For more information refer to
+        :ref:`user guide<device_dataframe>`.
+
+    Attributes
+    ----------
+    times : np.ndarray of dtype int64 and shape (n_events,)
+        The event times in nanoseconds since the epoch (UTC) in ascending order.
+    tz : datetime.tzinfo or None
+        The timezone of the device dataframe's times.
+    codes : np.ndarray of dtype int16 and shape (n_events,)
+        For each event the position of its device in :attr:`devices`.
+    devices : pd.Index
+        The devices in order of their first event.
+    categories : pd.Index
+        The distinct values of all categorical devices.
+
+    Examples
+    --------
+    >>> from pyadlml.dataset._core.devices import DeviceEvents
+    >>> from pyadlml.stats import device_event_count
+    >>> events = DeviceEvents(data['devices'])
+    >>> events.device_times('Cups cupboard')
+    array([1203983728000000000, 1203983730000000000, ...])
+    >>> device_event_count(events)
+                    device    event_count
+    0        Cups cupboard             98
+    ..                 ...            ...
+    """
+    __slots__ = ('times', 'tz', 'codes', 'devices', 'categories',
+                 '_dtype_of', '_order', '_offsets', '_values', '_value_offsets')
+
+    def __init__(self, df_devs: pd.DataFrame):
+        from pyadlml.dataset.util import _infer_device_dtype
+
+        df = df_devs.sort_values(by=TIME, kind='stable')
+        codes, devices = pd.factorize(df[DEVICE], sort=False)
+        assert len(devices) <= np.iinfo(np.int16).max, 'Too many devices for int16 codes.'
+
+        # Group the events by device while retaining their time order
+        order = np.argsort(codes, kind='stable')
+        offsets = np.searchsorted(codes[order], np.arange(len(devices) + 1))
+
+        raw_values = df[VALUE].values
+        dtype_of = []
+        values = {BOOL: [], NUM: [], CAT: []}
+        value_offsets = np.zeros(len(devices), dtype=np.int64)
+        n_values = {BOOL: 0, NUM: 0, CAT: 0}
+        for i in range(len(devices)):
+            vals = pd.Series(raw_values[order[offsets[i]:offsets[i+1]]])
+            dtype = _infer_device_dtype(vals)
+            if dtype == NUM:
+                vals = pd.to_numeric(vals).astype(np.float64)
+            elif dtype == BOOL:
+                vals = vals.astype(bool)
+            dtype_of.append(dtype)
+            values[dtype].append(vals.values)
+            value_offsets[i] = n_values[dtype]
+            n_values[dtype] += len(vals)
+
+        concat = lambda lst, dtype: np.concatenate(lst).astype(dtype) if lst else np.empty(0, dtype=dtype)
+        cat_codes, categories = pd.factorize(concat(values[CAT], object))
+        values = {BOOL: concat(values[BOOL], bool),
+                  NUM: concat(values[NUM], np.float64),
+                  CAT: cat_codes.astype(np.int32)}
+
+        arrays = dict(
+            times=df[TIME].values.astype('datetime64[ns]').astype(np.int64),
+            codes=codes.astype(np.int16),
+            _order=order,
+            _offsets=offsets,
+            _value_offsets=value_offsets,
+            _dtype_of=np.array(dtype_of, dtype=object),
+            _values=values,
+        )
+        for name, arr in arrays.items():
+            for a in (arr.values() if isinstance(arr, dict) else [arr]):
+                a.flags.writeable = False
+            object.__setattr__(self, name, arr)
+        object.__setattr__(self, 'tz', df[TIME].dt.tz)
+        object.__setattr__(self, 'devices', pd.Index(devices))
+        object.__setattr__(self, 'categories', pd.Index(categories))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('DeviceEvents is immutable.')
+
+    def __len__(self):
+        return len(self.times)
+
+    def __repr__(self):
+        return f'DeviceEvents(n_events={len(self)}, n_devices={len(self.devices)})'
+
+    @classmethod
+    def wrap(cls, df_devs):
+        """ Returns the store for a device dataframe or the store itself.
+        """
+        if isinstance(df_devs, DeviceEvents):
+            return df_devs
+        elif isinstance(df_devs, pd.DataFrame):
+            return cls(df_devs)
+        else:
+            raise TypeError(f'Expected a device dataframe or DeviceEvents, got {type(df_devs).__name__}.')
+
+    @property
+    def dtypes(self) -> dict:
+        """ The devices mapped by datatype, see :func:`pyadlml.dataset.util.infer_dtypes`.
+        """
+        return {dtype: self.devices[self._dtype_of == dtype].tolist()
+                for dtype in [CAT, BOOL, NUM]}
+
+    def dtype(self, device) -> str:
+        return self._dtype_of[self.devices.get_loc(device)]
+
+    @property
+    def timestamps(self) -> pd.DatetimeIndex:
+        """ The event times localized to :attr:`tz`.
+        """
+        times = pd.DatetimeIndex(self.times.view('datetime64[ns]'))
+        return times if self.tz is None else times.tz_localize('UTC').tz_convert(self.tz)
+
+    def dtype_mask(self, dtypes) -> np.ndarray:
+        """ A boolean mask of the events whose device is of one of the datatypes.
+        """
+        return np.isin(self._dtype_of, dtypes)[self.codes]
+
+    def successors(self) -> np.ndarray:
+        """ For each event the position of the next event of the same device or -1.
+        """
+        res = np.empty(len(self), dtype=np.int64)
+        res[self._order[:-1]] = self._order[1:]
+        res[self._order[self._offsets[1:] - 1]] = -1
+        return res
+
+    def counts(self) -> np.ndarray:
+        """ The number of events for each device in :attr:`devices`.
+        """
+        return np.diff(self._offsets)
+
+    def device_index(self, device) -> np.ndarray:
+        """ The positions of the devices events in ascending time order.
+        """
+        i = self.devices.get_loc(device)
+        return self._order[self._offsets[i]:self._offsets[i+1]]
+
+    def device_times(self, device) -> np.ndarray:
+        """ The sorted event times of a device in nanoseconds.
+        """
+        return self.times[self.device_index(device)]
+
+    def device_values(self, device) -> np.ndarray:
+        """ The values of a device in ascending time order.
+        """
+        i = self.devices.get_loc(device)
+        dtype = self._dtype_of[i]
+        st = self._value_offsets[i]
+        vals = self._values[dtype][st:st + self._offsets[i+1] - self._offsets[i]]
+        if dtype == CAT:
+            vals = self.categories.take(vals).values
+        return vals
+
+    @property
+    def values(self) -> np.ndarray:
+        """ The decoded values of all events in ascending time order.
+        """
+        res = np.empty(len(self), dtype=object)
+        for dtype in [BOOL, NUM, CAT]:
+            devs = np.flatnonzero(self._dtype_of == dtype)
+            if len(devs) == 0:
+                continue
+            rows = np.concatenate([self._order[self._offsets[i]:self._offsets[i+1]] for i in devs])
+            vals = self._values[dtype]
+            res[rows] = self.categories.take(vals).values if dtype == CAT else vals
+        return res
+
+    def to_df(self) -> pd.DataFrame:
+        """ Creates a device dataframe from the store.
+        """
+        return pd.DataFrame({
+            TIME: self.timestamps,
+            DEVICE: self.devices.take(self.codes).values,
+            VALUE: pd.Series(self.values).infer_objects(),
+        })
+
+
+def _events_to_df(events: DeviceEvents) -> pd.DataFrame:
+    """ Creates the device dataframe of a store and registers the store's metadata
+    for it, such that the datatypes are not inferred again from the dataframe.
+    """
+    df = events.to_df()
+    key = _content_hash(df)
+    if key not in _METADATA_REGISTRY:
+        _register_metadata(key, DeviceMetadata.from_events(events))
+    return df
+
+
+def accepts_device_events(func):
+    """ Lets a function that expects device dataframes be passed a :class:`DeviceEvents`
+    in place of any device dataframe argument.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        args = [_events_to_df(a) if isinstance(a, DeviceEvents) else a for a in args]
+        kwargs = {k: _events_to_df(v) if isinstance(v, DeviceEvents) else v for k, v in kwargs.items()}
+        return func(*args, **kwargs)
+    return wrapper
+
+
 def _create_devices(dev_list: list, index=None):
     """
     creates an empty device dataframe
@@ -124,7 +346,7 @@ def device_events_to_states(df_devs: pd.DataFrame, start_time=None, end_time=Non
         
     Parameters
     ----------
-    df_devs : pd.DataFrame
+    df_devs : pd.DataFrame or DeviceEvents
         In event representation, a dataframe with columns (time, device, value)
         example row: [2008-02-25 00:20:14, Freezer, False]
     extrapolate_states : Boolean, default=False
@@ -144,47 +366,50 @@ def device_events_to_states(df_devs: pd.DataFrame, start_time=None, end_time=Non
     """
     epsilon = '1ns'
 
-    df = df_devs.copy() \
-        .reset_index(drop=True) \
-        .sort_values(TIME)
-
-    dtypes = infer_dtypes(df)
+    if isinstance(df_devs, DeviceEvents):
+        dtypes = df_devs.dtypes
+        if not extrapolate_states:
+            return _event_store_to_states(df_devs)
+        df = df_devs.to_df()
+    else:
+        df = df_devs.copy() \
+            .reset_index(drop=True) \
+            .sort_values(TIME)
+        dtypes = infer_dtypes(df)
 
     first_timestamp = df[TIME].iloc[0] if start_time is None else pd.Timestamp(start_time)
     last_timestamp  = df[TIME].iloc[-1] if end_time is None else pd.Timestamp(end_time)
 
     if extrapolate_states:
         # create additional rows in order to compensate for the state duration of the first event
-        # to the selected event for boolean devices
+        # to the selected event for boolean and categorical devices
         eps = pd.Timedelta(epsilon)
 
         # Prevents boolean cast warning when extrapolatiing states
         df[VALUE] = df[VALUE].astype(object)
 
-        for dev in dtypes[BOOL]:
-            df_dev = df[df[DEVICE] == dev]
-            first_row = df_dev.iloc[0].copy()
-            if first_row[TIME] != first_timestamp and first_row[TIME] - first_timestamp > pd.Timedelta('1s'):
-                first_row[VALUE] = not first_row[VALUE]
-                first_row[TIME] = first_timestamp + eps
-                df = pd.concat([df, first_row.to_frame().T], axis=0, ignore_index=True)
-            eps += pd.Timedelta(epsilon)
+        lst_extra = dtypes[BOOL] + dtypes[CAT]
+        first_rows = df.drop_duplicates(subset=DEVICE, keep='first')\
+                       .set_index(DEVICE, drop=False)\
+                       .reindex(lst_extra)
 
-        for dev in dtypes[CAT]:
-            df_dev = df[df[DEVICE] == dev].copy()
-            first_row = df_dev.iloc[0].copy()
-            if first_row[TIME] != first_timestamp and first_row[TIME] - first_timestamp > pd.Timedelta('1s'):
-                df_dev['value_succ'] = df_dev['value'].shift(-1)
-                # Frequencies of category i followed by j
-                f_ij = pd.crosstab(df_dev[VALUE], df_dev['value_succ'])
-                # p(j | i) = f_ij rate where first was cat_i than transitioned to cat_j
-                # therefore get max_i for cat_j to get p(i | j)
-                max_cat_i = f_ij.index[f_ij.loc[:, first_row[VALUE]].argmax()] 
-                first_row[VALUE] = max_cat_i
-                first_row[TIME] = first_timestamp + eps
-                df = pd.concat([df, first_row.to_frame().T], axis=0, ignore_index=True)
-
-            eps += pd.Timedelta(epsilon)
+        # Only extrapolate devices whose first event is far from the first timestamp
+        # and offset each extrapolated event by another epsilon
+        mask = (first_rows[TIME] - first_timestamp > pd.Timedelta('1s')).values
+        first_rows[TIME] = first_timestamp + eps*np.arange(1, len(lst_extra) + 1)
+
+        is_bool = first_rows[DEVICE].isin(dtypes[BOOL]).values
+        first_rows.loc[is_bool, VALUE] = first_rows.loc[is_bool, VALUE].map(lambda v: not v)
+
+        if dtypes[CAT]:
+            first_cat = first_rows.loc[~is_bool, VALUE]
+            max_cat_i = _most_likely_predecessors(df[df[DEVICE].isin(dtypes[CAT])], first_cat)
+            first_rows.loc[~is_bool, VALUE] = max_cat_i
+            # Categories that were never preceded by another one can not be extrapolated
+            mask &= first_rows[VALUE].notna().values | is_bool
+
+        if mask.any():
+            df = pd.concat([df, first_rows[mask].reset_index(drop=True)], axis=0, ignore_index=True)
 
         if dtypes[CAT]:
             print('Warning! Extrapolated categories based on most propable category.')
@@ -198,10 +423,8 @@ def device_events_to_states(df_devs: pd.DataFrame, start_time=None, end_time=Non
     if lst_cat_or_bool:
         df_cat_bool = df[df[DEVICE].isin(lst_cat_or_bool)].copy()
         df_cat_bool = df_cat_bool.rename(columns={TIME: START_TIME})
-        df_cat_bool[END_TIME] = pd.NaT
-        for dev in lst_cat_or_bool:
-            mask = (df_cat_bool[DEVICE] == dev)
-            df_cat_bool.loc[mask, END_TIME] = df_cat_bool.loc[mask, START_TIME].shift(-1)
+        # A state lasts until the successive event of the same device
+        df_cat_bool[END_TIME] = df_cat_bool.groupby(DEVICE, sort=False)[START_TIME].shift(-1)
         if extrapolate_states:
             df_cat_bool = df_cat_bool.fillna(last_timestamp)
         else:
@@ -212,7 +435,7 @@ def device_events_to_states(df_devs: pd.DataFrame, start_time=None, end_time=Non
         df_num = df[df[DEVICE].isin(dtypes[NUM])].copy()
         df_num = df_num.rename(columns={TIME: START_TIME})
         df_num[END_TIME] = df_num[START_TIME].copy()
-        res = res.append(df_num)
+        res = pd.concat([res, df_num])
 
     res[START_TIME] = pd.to_datetime(res[START_TIME])
     res[END_TIME] = pd.to_datetime(res[END_TIME])
@@ -220,6 +443,59 @@ def device_events_to_states(df_devs: pd.DataFrame, start_time=None, end_time=Non
     return res
 
 
+def _event_store_to_states(events: DeviceEvents) -> pd.DataFrame:
+    """ Creates the states of :func:`device_events_to_states` from the successors of
+    the events in the store.
+    """
+    succ = events.successors()
+    is_cat_bool = events.dtype_mask([CAT, BOOL])
+    idx = np.concatenate([np.flatnonzero(is_cat_bool & (succ >= 0)), np.flatnonzero(~is_cat_bool)])
+    end_idx = np.where(is_cat_bool[idx], succ[idx], idx)
+
+    times = events.timestamps
+    return pd.DataFrame({
+        START_TIME: times[idx],
+        END_TIME: times[end_idx],
+        DEVICE: events.devices.take(events.codes[idx]).values,
+        VALUE: events.values[idx],
+    }, index=pd.Index(idx, dtype=np.int64))
+
+
+def _most_likely_predecessors(df_cat: pd.DataFrame, first_values: pd.Series) -> pd.Series:
+    """ Determines for each categorical device the category that most often
+        preceded the devices first category.
+
+    Parameters
+    ----------
+    df_cat : pd.DataFrame
+        The time sorted events of the categorical devices.
+    first_values : pd.Series
+        The first category of each device indexed by device.
+
+    Returns
+    -------
+    pd.Series
+        The most likely preceding category indexed by device. Ties are broken
+        by the smallest category. NaN if the first category was never preceded.
+    """
+    SUCC = 'value_succ'
+    trans = pd.DataFrame({
+        DEVICE: df_cat[DEVICE].values,
+        VALUE: df_cat[VALUE].values,
+        SUCC: df_cat.groupby(DEVICE, sort=False)[VALUE].shift(-1).values
+    })
+    # Frequencies f_ij of category i followed by j for each device
+    f_ij = trans.groupby([DEVICE, SUCC, VALUE]).size().rename('count').reset_index()
+
+    # p(j | i) = f_ij rate where first was cat_i than transitioned to cat_j
+    # therefore get max_i for cat_j to get p(i | j)
+    first = first_values.rename(SUCC).rename_axis(DEVICE).reset_index()
+    f_ij = f_ij.merge(first, on=[DEVICE, SUCC], how='inner')
+    max_cat_i = f_ij.loc[f_ij.groupby(DEVICE, sort=False)['count'].idxmax()]\
+                    .set_index(DEVICE)[VALUE]
+    return max_cat_i.reindex(first_values.index)
+
+
 def device_boolean_on_states_to_events(df_devs_states: pd.DataFrame):
     """
     Parameters
@@ -646,34 +922,105 @@ def _get_bool(df):
     return df.groupby(by=[DEVICE]).filter(func)
 
 
-def create_device_info_dict(df_dev: pd.DataFrame) -> dict:
+class DeviceMetadata():
+    """ Metadata of the devices of one device dataframe.
+
+    The metadata is inferred once per dataframe content and shared through a registry,
+    see :func:`device_metadata`.
+
+    Attributes
+    ----------
+    dtypes : dict
+        The devices mapped by datatype, see :func:`pyadlml.dataset.util.infer_dtypes`.
+    categories : dict
+        Every categorical device mapped to its sorted categories.
+    first_state : dict
+        Every device mapped to its first value.
+    last_state : dict
+        Every device mapped to its last value.
+    ml_state : dict or None
+        Every device mapped to its most likely value. Is filled by
+        :func:`create_device_info_dict` on first use.
     """
-    Infers for each device the most likely state
+    def __init__(self, df_devs: pd.DataFrame):
+        from pyadlml.dataset.util import _infer_device_dtype
+
+        self.dtypes = {CAT: [], BOOL: [], NUM: []}
+        self.categories = {}
+        for dev, vals in df_devs.groupby(DEVICE, sort=False)[VALUE]:
+            dtype = _infer_device_dtype(vals)
+            self.dtypes[dtype].append(dev)
+            if dtype == CAT:
+                self.categories[dev] = sorted(vals.dropna().unique())
+
+        grouped = df_devs.sort_values(by=TIME).groupby(DEVICE)[VALUE]
+        self.first_state = grouped.first().to_dict()
+        self.last_state = grouped.last().to_dict()
+        self.ml_state = None
+
+    @classmethod
+    def from_events(cls, events: DeviceEvents):
+        """ Reads the metadata from a store instead of inferring it.
+        """
+        meta = cls.__new__(cls)
+        meta.dtypes = events.dtypes
+        meta.categories = {dev: sorted(pd.unique(events.device_values(dev)))
+                           for dev in meta.dtypes[CAT]}
+        values = {dev: events.device_values(dev) for dev in sorted(events.devices)}
+        meta.first_state = {dev: vals[0] for dev, vals in values.items()}
+        meta.last_state = {dev: vals[-1] for dev, vals in values.items()}
+        meta.ml_state = None
+        return meta
+
+
+_METADATA_REGISTRY = OrderedDict()
+_METADATA_REGISTRY_SIZE = 32
+
+
+def _content_hash(df_devs: pd.DataFrame) -> str:
+    """ Hashes the events of a device dataframe. The inferred type of the value
+    column is included as booleans and their string representation hash equally.
+    """
+    rows = pd.util.hash_pandas_object(df_devs[[TIME, DEVICE, VALUE]], index=False).values
+    value_kind = pd.api.types.infer_dtype(df_devs[VALUE], skipna=True)
+    return hashlib.md5(rows.tobytes() + value_kind.encode()).hexdigest()
+
+
+def device_metadata(df_devs: pd.DataFrame) -> DeviceMetadata:
+    """ Returns the metadata of a device dataframe.
+
+    The metadata is looked up by the content hash of the dataframe and only
+    inferred if no dataframe with the same events was seen recently.
 
     Parameters
     ----------
-    df_dev : pd.DataFrame
+    df_devs : pd.DataFrame
         A device dataframe
-    dtypes: pd.DataFrame
-        a dataframe containing every device and its corresponding datattype
 
     Returns
     -------
-    df : pd.DataFrame
-        the result
+    DeviceMetadata
     """
-    ML_STATE = 'ml_state'
-    DTYPE = 'dtype'
-    df_dev = df_dev.copy()
+    key = _content_hash(df_devs)
+    if key in _METADATA_REGISTRY:
+        _METADATA_REGISTRY.move_to_end(key)
+        return _METADATA_REGISTRY[key]
 
-    # extract devices of differing dtypes
-    dtypes = infer_dtypes(df_dev)
+    return _register_metadata(key, DeviceMetadata(df_devs))
 
+
+def _register_metadata(key: str, meta: DeviceMetadata) -> DeviceMetadata:
+    _METADATA_REGISTRY[key] = meta
+    if len(_METADATA_REGISTRY) > _METADATA_REGISTRY_SIZE:
+        _METADATA_REGISTRY.popitem(last=False)
+    return meta
+
+
+def _most_likely_states(df_dev: pd.DataFrame, dtypes: dict) -> dict:
+    """ Infers for each device the most likely state
+    """
+    ML_STATE = 'ml_state'
     res = {}
-    for key in dtypes.keys():
-        for dev in dtypes[key]:
-            res[dev] = {}
-            res[dev][DTYPE] = key
 
     # get most likely binary states
     if dtypes[BOOL]:
@@ -682,7 +1029,7 @@ def create_device_info_dict(df_dev: pd.DataFrame) -> dict:
         for dev in dtypes[BOOL]:
             true_has_more = dsf.loc[(dsf[DEVICE] == dev) & (dsf[VALUE] == True), 'frac'].values[0] \
                             > dsf.loc[(dsf[DEVICE] == dev) & (dsf[VALUE] == False), 'frac'].values[0]
-            res[dev][ML_STATE] = true_has_more
+            res[dev] = true_has_more
 
     # get most likely numerical states
     # use median for the most likely numerical state
@@ -691,7 +1038,7 @@ def create_device_info_dict(df_dev: pd.DataFrame) -> dict:
         df_num[VALUE] = pd.to_numeric(df_num[VALUE])
         res_num = df_num.groupby(by=[DEVICE]).median()
         for dev in dtypes[NUM]:
-            res[dev][ML_STATE] = res_num.at[dev, VALUE]
+            res[dev] = res_num.at[dev, VALUE]
 
     # get most likely categorical states
     if dtypes[CAT]:
@@ -699,11 +1046,46 @@ def create_device_info_dict(df_dev: pd.DataFrame) -> dict:
         res_cat = most_prominent_categorical_values(df_cat)
         res_cat.set_index(DEVICE, inplace=True)
         for dev in dtypes[CAT]:
-            res[dev][ML_STATE] = res_cat.at[dev, ML_STATE]
+            res[dev] = res_cat.at[dev, ML_STATE]
 
     return res
 
 
+@accepts_device_events
+def create_device_info_dict(df_dev: pd.DataFrame) -> dict:
+    """
+    Infers for each device the most likely state
+
+    The most likely states are computed once per dataframe content and kept in
+    the device metadata registry.
+
+    Parameters
+    ----------
+    df_dev : pd.DataFrame
+        A device dataframe
+
+    Returns
+    -------
+    res : dict
+        Every device mapped to a dictionary with its datatype 'dtype' and
+        most likely state 'ml_state'.
+    """
+    ML_STATE = 'ml_state'
+    DTYPE = 'dtype'
+
+    meta = device_metadata(df_dev)
+    if meta.ml_state is None:
+        meta.ml_state = _most_likely_states(df_dev.copy(), meta.dtypes)
+
+    res = {}
+    for key in meta.dtypes.keys():
+        for dev in meta.dtypes[key]:
+            res[dev] = {DTYPE: key}
+            if dev in meta.ml_state:
+                res[dev][ML_STATE] = meta.ml_state[dev]
+    return res
+
+
 def device_remove_state(df_devs, state, td, eps='0.2s'):
     """ Remove the events corresponding to a device that is a certain time
         in the specified state.
@@ -1070,3 +1452,4 @@ def device_remove_state_matching_signal(df_devs: pd.DataFrame,
     df = df[[TIME, DEVICE, VALUE]]
     res = correct_on_off_inconsistency(df)
     return res
+
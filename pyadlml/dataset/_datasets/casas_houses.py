@@ -1,12 +1,14 @@
 import os
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 from pyadlml.constants import ACTIVITY, VALUE, START_TIME, END_TIME, TIME, NAME, DEVICE
 from pyadlml.dataset.io.downloader import WebZipDownloader
 from pyadlml.dataset.io.remote import DataFetcher
 
 
 def fetch_casas(testbed='aruba', keep_original=True, cache=True, retain_corrections=False,
-                      folder_path=None) -> dict:
+                      folder_path=None, tables=None, start_time=None, end_time=None) -> dict:
     """
     Fetches one of CASAS datasets from the internet. The original dataset or its 
     cached version is stored in the data_home folder.
@@ -25,6 +27,12 @@ def fetch_casas(testbed='aruba', keep_original=True, cache=True, retain_correcti
         When set to *true* data points that are changed or dropped during preprocessing
         are listed in the respective attributes of the data object.  Fore more information
         about the attributes refer to the :ref:`user guide <error_correction>`.
+    tables : list of str, optional
+        The dataset keys to load, e.g. ['devices']. By default all keys are loaded.
+    start_time : str or pd.Timestamp, optional
+        If set, only events and activities ending at or after *start_time* are loaded.
+    end_time : str or pd.Timestamp, optional
+        If set, only events and activities starting before *end_time* are loaded.
 
     Examples
     --------
@@ -37,29 +45,35 @@ def fetch_casas(testbed='aruba', keep_original=True, cache=True, retain_correcti
         A dictionary containg the activity and device dataframe
     """
     assert testbed in ['milan', 'cairo', 'kyoto_2010', 'tulum', 'aruba']
+    selection = dict(tables=tables, start_time=start_time, end_time=end_time)
     if testbed == 'milan':
         return CasasMilanFetcher()(keep_original=keep_original, cache=cache, #load_cleaned=load_cleaned, retain_corrections=retain_corrections, folder_path=folder_path
+                                **selection
         )
 
     elif testbed == 'cairo':
         return CasasCairoFetcher()(keep_original=keep_original, cache=cache, #load_cleaned=load_cleaned,
-                                retain_corrections=retain_corrections, folder_path=folder_path
+                                retain_corrections=retain_corrections, folder_path=folder_path,
+                                **selection
         )
 
     elif testbed == 'tulum':
         return CasasTulumFetcher()(keep_original=keep_original, cache=cache, #load_cleaned=load_cleaned,
-                                retain_corrections=retain_corrections, folder_path=folder_path
+                                retain_corrections=retain_corrections, folder_path=folder_path,
+                                **selection
         )
 
     elif testbed == 'kyoto_2010':
 
         return CasasKyotoFetcher()(keep_original=keep_original, cache=cache, #load_cleaned=load_cleaned,
-                                retain_corrections=retain_corrections, folder_path=folder_path
+                                retain_corrections=retain_corrections, folder_path=folder_path,
+                                **selection
         )
 
     elif testbed == 'aruba':
         return CasasArubaFetcher()(keep_original=keep_original, cache=cache, #load_cleaned=load_cleaned,
-                                retain_corrections=retain_corrections, folder_path=folder_path
+                                retain_corrections=retain_corrections, folder_path=folder_path,
+                                **selection
         )
 
 
@@ -245,16 +259,7 @@ class CasasMilanFetcher(DataFetcher):
         fp_corr = folder_path.joinpath('corrected_data.csv')
         self._fix_data(fp, fp_corr)
 
-        df = pd.read_csv(fp_corr,
-                        sep=",",
-                        #parse_dates=True,
-                        infer_datetime_format=True,
-                        na_values=True,
-                        names=[START_TIME, 'id', VALUE, ACTIVITY],
-                        engine='python'  #to ignore warning for fallback to python engine because skipfooter
-                        #dtyp
-                        )
-        df[START_TIME] = pd.to_datetime(df[START_TIME])
+        df = _read_corrected_csv(fp_corr)
         df = df.sort_values(by=START_TIME).reset_index(drop=True)
 
         df_dev = _get_devices_df(df)
@@ -484,16 +489,7 @@ class CasasCairoFetcher(DataFetcher):
         fp_corr = folder_path.joinpath('corrected_data.csv')
         self._fix_data(fp, fp_corr)
 
-        df = pd.read_csv(fp_corr,
-                        sep=",",
-                        #parse_dates=True,
-                        infer_datetime_format=True,
-                        na_values=True,
-                        names=[START_TIME, 'id', VALUE, ACTIVITY],
-                        engine='python'  #to ignore warning for fallback to python engine because skipfooter
-                        #dtyp
-                        )
-        df[START_TIME] = pd.to_datetime(df[START_TIME])
+        df = _read_corrected_csv(fp_corr)
         df_dev = _get_devices_df(df)
         df_act = _get_activity_df(df)
         from pyadlml.dataset.util import ActivityDict
@@ -686,18 +682,43 @@ class CasasTulumFetcher(DataFetcher):
             device_list=lst_dev
         )
 
-def _load_corrected_dfs(fp_corr, delimiter=','):
-    df = pd.read_csv(fp_corr,
+CHUNKSIZE = 500000
+
+
+def _read_corrected_csv(fp_corr, delimiter=',', chunksize=CHUNKSIZE):
+    """ Reads a corrected CASAS file in chunks with the C parser.
+
+    Every chunk is typed on arrival, i.e. the timestamps are parsed and the
+    device ids are stored as categorical.
+
+    Returns
+    -------
+    df : pd.DataFrame
+        With the columns start_time, id, value and activity
+    """
+    reader = pd.read_csv(fp_corr,
                     sep=delimiter,
-                    #parse_dates=True,
-                    infer_datetime_format=True,
+                    header=None,
                     na_values=True,
                     names=[START_TIME, 'id', VALUE, ACTIVITY],
-                    engine='python'  #to ignore warning for fallback to python engine because skipfooter
-                    #dtyp
+                    dtype=str,
+                    engine='c',
+                    chunksize=chunksize
                     )
-    df[START_TIME] = pd.to_datetime(df[START_TIME])
-    df = df.sort_values(by=START_TIME)\
+    chunks, ids = [], []
+    for chunk in reader:
+        chunk[START_TIME] = pd.to_datetime(chunk[START_TIME])
+        ids.append(pd.Categorical(chunk.pop('id')))
+        chunks.append(chunk)
+
+    df = pd.concat(chunks, ignore_index=True)
+    df.insert(1, 'id', union_categoricals(ids))
+    return df
+
+
+def _load_corrected_dfs(fp_corr, delimiter=','):
+    df = _read_corrected_csv(fp_corr, delimiter)
+    df = df.sort_values(by=START_TIME, kind='stable')\
            .drop_duplicates()
     # Drop when a device is na 
     df = df[~df.iloc[:, :3].isna().any(axis=1)].reset_index(drop=True)
@@ -707,58 +728,57 @@ def _load_corrected_dfs(fp_corr, delimiter=','):
 
 
 def _get_devices_df(df):
-    df = df.copy().drop(ACTIVITY, axis=1)
-    bin_mask = (df[VALUE] == 'ON') | (df[VALUE] == 'OFF')
-
-    # preprocess only binary devices to ON-OFF--> False True
-    df_binary = df[bin_mask]
-    df_binary[VALUE] = (df_binary[VALUE] == 'ON')
-
-    # preprocess only numeric devices
-    num_mask = pd.to_numeric(df[VALUE], errors='coerce').notnull()
-    df_num = df[num_mask]
-    df_num[VALUE] = df_num[VALUE].astype(float)
-
-    # preprocess categorical devices
-    df_cat = df[~num_mask & ~bin_mask]
-
-    # join datasets
-    df = pd.concat([df_cat, df_binary, df_num], axis=0, ignore_index=True)
-    df.columns = [TIME, DEVICE, VALUE]
-    df = df.sort_values(by=TIME).reset_index(drop=True)
-
-    return df
+    """ Maps the values 'ON' and 'OFF' to booleans and numbers to floats.
+    Categorical values are kept as they are.
+    """
+    # Type each distinct value once instead of every row
+    codes, uniques = pd.factorize(df[VALUE])
+    uniques = pd.Series(uniques, dtype=object)
+    num = pd.to_numeric(uniques, errors='coerce')
+
+    mapped = uniques.values.copy()
+    num_mask = num.notnull().values
+    mapped[num_mask] = num[num_mask].astype(float).values
+    mapped[(uniques == 'ON').values] = True
+    mapped[(uniques == 'OFF').values] = False
+    mapped = np.append(mapped, np.nan).astype(object)
+
+    res = pd.DataFrame({
+        TIME: df[START_TIME].values,
+        DEVICE: np.asarray(df['id'], dtype=object),
+        VALUE: pd.Series(mapped[codes]).infer_objects().values,
+    })
+    res = res.sort_values(by=TIME, kind='stable').reset_index(drop=True)
+    return res
 
 
 def _get_activity_df(df):
+    """ Pairs the n-th begin marker of an activity with its n-th end marker.
+    """
     # get all rows containing activities
-    df = df.copy()[~df[ACTIVITY].isnull()][[START_TIME, ACTIVITY]]
-    df[ACTIVITY] = df[ACTIVITY].astype(str).apply(lambda x: x.strip())
-
-    act_list = list(df[ACTIVITY].unique())
-    act_list.sort()
-    
-    new_df_lst = []
-    for i in range(1, len(act_list), 2):
-        activity = ' '.join(act_list[i].split(' ')[:-1])
-        act_begin = act_list[i-1]
-        act_end = act_list[i]
-        assert activity in act_begin and activity in act_end
-           
-        # create subsets for begin and end of chosen activity
-        df_res = df[df[ACTIVITY] == act_begin].reset_index(drop=True)
-        df_end = df[df[ACTIVITY] == act_end].reset_index(drop=True)
-        #assert len(df_res) == len(df_end)
-        
-        # append sorted end_time to start_time as they should be
-        # pairwise together
-        df_res[ACTIVITY] = activity
-        df_res[END_TIME] = df_end[START_TIME]
-        new_df_lst.append(df_res)
-    
+    df = df.loc[df[ACTIVITY].notnull(), [START_TIME, ACTIVITY]]
+
+    # split each distinct label into the activity and its begin or end marker
+    codes, uniques = pd.factorize(df[ACTIVITY])
+    labels = pd.Series(uniques, dtype=object).astype(str).str.strip()\
+               .str.rsplit(' ', n=1, expand=True)
+    assert labels[1].isin(['begin', 'end']).all()
+
+    df = pd.DataFrame({
+        START_TIME: df[START_TIME].values,
+        ACTIVITY: labels[0].values[codes],
+        'marker': labels[1].values[codes],
+    })
+    # count the occurrences of the marker for each activity
+    df['nr'] = df.groupby([ACTIVITY, 'marker'], sort=False).cumcount()
+
+    begin = df[df['marker'] == 'begin']
+    end = df.loc[df['marker'] == 'end', [ACTIVITY, 'nr', START_TIME]]\
+            .rename(columns={START_TIME: END_TIME})
+    res = begin.merge(end, on=[ACTIVITY, 'nr'], how='left')
+
     # data preparation
-    res = pd.concat(new_df_lst)
     res = res.reindex(columns=[START_TIME, END_TIME, ACTIVITY])
-    res = res.sort_values(START_TIME)
+    res = res.sort_values(START_TIME, kind='stable')
     res = res.reset_index(drop=True)
     return res
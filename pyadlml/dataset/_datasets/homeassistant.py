@@ -1,19 +1,111 @@
+import hashlib
+import re
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 from pyadlml.constants import TIME, DEVICE, VALUE
-import datetime
 
-def load_homeassistant(db_url:str, start_time=None, end_time=None) -> pd.DataFrame:
+
+STATE_ID = 'state_id'
+ENTITY_ID = 'entity_id'
+STATE = 'state'
+LAST_CHANGED = 'last_changed_ts'
+IGNORED_STATES = ['unknown', 'unavailable']
+BINARY_STATES = {'on': True, 'off': False}
+_ENTITY_ID_PATTERN = re.compile(r'^[\w]+\.[\w]+$')
+
+
+def _sql_time(ts) -> str:
+    """ Formats a datetime as a recorder timestamp in seconds since the epoch.
+    """
+    return repr(pd.Timestamp(ts).timestamp())
+
+
+def _states_query(device_list=None, start_time=None, end_time=None, after_id=None) -> str:
+    """ Creates the query that selects the states of the recorder.
+
+    The entities are resolved through ``states_meta`` and all filters are applied
+    by the database. Rows without a last_changed timestamp were not changed
+    and take the last_updated timestamp instead. The state ids increase with every
+    committed row and select the rows that were recorded after ``after_id``.
+    """
+    conds = ["s.state NOT IN (%s)" % ', '.join(f"'{state}'" for state in IGNORED_STATES)]
+    if device_list is not None:
+        for entity in device_list:
+            if not _ENTITY_ID_PATTERN.match(entity):
+                raise ValueError(f'Invalid entity id: {entity}')
+        if not device_list:
+            conds.append('1 = 0')
+        else:
+            conds.append("m.entity_id IN (%s)" % ', '.join(f"'{e}'" for e in device_list))
+    if start_time is not None:
+        conds.append(f"s.last_updated_ts >= {_sql_time(start_time)}")
+    if end_time is not None:
+        conds.append(f"s.last_updated_ts < {_sql_time(end_time)}")
+    if after_id is not None:
+        conds.append(f"s.state_id > {int(after_id)}")
+
+    return f"""
+    SELECT s.state_id, m.entity_id, s.state,
+        COALESCE(s.last_changed_ts, s.last_updated_ts) AS last_changed_ts
+    FROM states s
+    JOIN states_meta m ON s.metadata_id = m.metadata_id
+    WHERE
+        {' AND '.join(conds)}
+    ORDER BY s.last_updated_ts, s.state_id
+    """
+
+
+def _read_states(db_url, query: str, chunksize: int) -> pd.DataFrame:
+    """ Streams the query result in chunks and types every chunk on arrival.
+    """
+    chunks = pd.read_sql_query(query, db_url, chunksize=chunksize,
+                               dtype={STATE_ID: 'int64', LAST_CHANGED: 'float64'})
+    entities, states, state_ids, last_changed = [], [], [], []
+    for chunk in chunks:
+        entities.append(pd.Categorical(chunk[ENTITY_ID]))
+        states.append(pd.Categorical(chunk[STATE]))
+        state_ids.append(chunk[STATE_ID].values)
+        last_changed.append(chunk[LAST_CHANGED].values)
+
+    if not entities:
+        return pd.DataFrame({
+            ENTITY_ID: pd.Categorical([]),
+            STATE: pd.Categorical([]),
+            LAST_CHANGED: pd.Series(dtype='datetime64[ns]'),
+            STATE_ID: pd.Series(dtype='int64'),
+        })
+
+    return pd.DataFrame({
+        ENTITY_ID: union_categoricals(entities),
+        STATE: union_categoricals(states),
+        LAST_CHANGED: pd.to_datetime(np.concatenate(last_changed), unit='s', origin='unix'),
+        STATE_ID: np.concatenate(state_ids),
+    })
+
+
+def load_homeassistant(db_url, start_time=None, end_time=None, device_list=None,
+                       chunksize=100000) -> pd.DataFrame:
     """
     Loads the Home Assistant database into a pandas dataframe.
 
+    The entity selection and the time range are evaluated by the database and
+    the result is read in chunks.
+
     Parameters
     ----------
-    db_url : str
-        A valid Home Assistant database url. Is used to establish the connection..
+    db_url : str or connection
+        A valid Home Assistant database url. Is used to establish the connection.
+        Any connection accepted by :func:`pandas.read_sql_query` works as well.
     start_time : str, optional
         Datetime string to exclude all rows before the specified start time.
     end_time : str, optional
         Datetime string to exclude all rows after the specified end time.
+    device_list : list of str, optional
+        The entities to load. Defaults to all entities.
+    chunksize : int, default=100000
+        The number of rows that are transferred at once.
 
     Examples
     --------
@@ -30,55 +122,35 @@ def load_homeassistant(db_url:str, start_time=None, end_time=None) -> pd.DataFra
     Returns
     -------
     df : pd.DataFrame
+        The entity and state columns are categorical.
     """
-    limit=5000000
+    query = _states_query(device_list, start_time, end_time)
+    df = _read_states(db_url, query, chunksize)
+    return df.drop(columns=STATE_ID)
 
-    """ weird new requirement 
-    """
-    if 'sqlite' in db_url:
-        lc_null_fix = ",iif(last_changed_ts is NULL,last_updated_ts,last_changed_ts) as last_changed_ts"
-    elif 'mariadb' in db_url:
-        lc_null_fix = ",if(last_changed_ts is NULL,last_updated_ts,last_changed_ts) as last_changed_ts"
-    elif 'postgresql' in db_url:
-        lc_null_fix = ',(case when last_changed_ts is NULL then last_updated_ts else last_changed_ts end)'
-    else:
-        print("WARNING: LAST_CHANGED may be null not substituted")
-        lc_null_fix = ''
-
-    # Convert timestamps to seconds
-    start_time_nx = pd.Timestamp(start_time).timestamp()
-    end_time_nx = pd.Timestamp(end_time).timestamp()
-
-    if start_time is None and end_time is None:
-        cond_time = ''
-    if start_time is None and end_time is not None:
-        raise NotImplementedError
-    if start_time is not None and end_time is None:
-        raise NotImplementedError
-    if start_time is not None and end_time is not None:
-        cond_time = f"AND last_updated_ts BETWEEN '{start_time_nx}' AND '{end_time_nx}'"
-    
-    query = f"""
-    SELECT entity_id, state, last_updated_ts
-    {lc_null_fix}
-    FROM states
-    WHERE
-        state NOT IN ('unknown', 'unavailable')
-        {cond_time}
-    LIMIT {limit}
+
+def _to_device_df(df: pd.DataFrame) -> pd.DataFrame:
+    """ Brings recorder states into the pyadlml structure.
     """
-    df = pd.read_sql_query(query, db_url)
-    df['last_changed_ts'] = pd.to_datetime(df['last_changed_ts'], unit='s', origin='unix')
-    df = df.drop(columns='last_updated_ts')
-    return df
+    # Map binary device values to -> True, False once per category
+    states = df[STATE].cat.categories
+    mapped = np.array([BINARY_STATES.get(s, s) for s in states] + [np.nan], dtype=object)
+
+    return pd.DataFrame({
+        TIME: df[LAST_CHANGED].values,
+        DEVICE: df[ENTITY_ID].astype(object).values,
+        VALUE: mapped[df[STATE].cat.codes.values],
+    })
 
-def load_homeassistant_devices(db_url, device_list, start_time=None, end_time=None):
+
+def load_homeassistant_devices(db_url, device_list, start_time=None, end_time=None,
+                               chunksize=100000):
     """
     Creates a device dataframe for selected devices within a certain timeframe.
 
     Parameters
     ----------
-    db_url : str
+    db_url : str or connection
         A valid Home Assistant database url. Is used to establish the connection.
     device_list : lst
         device selection to filter
@@ -86,13 +158,15 @@ def load_homeassistant_devices(db_url, device_list, start_time=None, end_time=No
         Datetime string to exclude all rows before the specified start time.
     end_time : str, optional
         Datetime string to exclude all rows after the specified end time.
+    chunksize : int, default=100000
+        The number of rows that are transferred at once.
 
     Examples
     --------
     >>> from pyadlml.dataset import load_homeassistant_devices
     >>> db_url = "sqlite:///config/homeassistant-v2.db"
     >>> lst_dev = ['binary_sensor.b1','switch.computer','light.l1','light.l2']
-    >>> df_devices = load_homeassistant(db_url, device_list=lst_dev)
+    >>> df_devices = load_homeassistant_devices(db_url, device_list=lst_dev)
 
     Returns
     -------
@@ -100,21 +174,76 @@ def load_homeassistant_devices(db_url, device_list, start_time=None, end_time=No
         All recorded devices from the Home Assistant dataset. For more information refer to
         :ref:`user guide<device_dataframe>`.
     """
-    
-    df = load_homeassistant(db_url, start_time=start_time, end_time=end_time)
+    query = _states_query(device_list, start_time, end_time)
+    df = _read_states(db_url, query, chunksize)
+    return _to_device_df(df)
 
 
-    # Bring into pyadlml structure
-    df = df[df['entity_id'].isin(device_list)]
-    df = df.rename(columns={'entity_id': DEVICE, 'state': VALUE, 'last_changed_ts': TIME})
-    df = df[[TIME, DEVICE, VALUE]]
+def sync_homeassistant_devices(db_url, device_list, folder=None, chunksize=100000):
+    """
+    Keeps a local copy of the recorded devices and fetches only new rows.
 
-    # Convert to proper datatypes
-    df[TIME] = pd.to_datetime(df[TIME])
+    The first call loads all states of the selected devices into the cache. Every
+    following call only transfers the rows with a state id above the largest cached
+    one. Contrary to the timestamps, the ids also capture rows that were committed
+    late with an earlier timestamp.
 
-    # Map binary device values to -> True, False
-    #      is on or off or if binary-device is not on or off
-    df[VALUE] = df[VALUE].replace(to_replace='on', value=True)
-    df[VALUE] = df[VALUE].replace(to_replace='off', value=False)
+    Parameters
+    ----------
+    db_url : str or connection
+        A valid Home Assistant database url. Is used to establish the connection.
+    device_list : lst
+        device selection to filter
+    folder : str or Path, optional
+        The cache folder. Defaults to a folder in the data home that is
+        unique for the database url and device selection.
+    chunksize : int, default=100000
+        The number of rows that are transferred at once.
+
+    Examples
+    --------
+    >>> from pyadlml.dataset import sync_homeassistant_devices
+    >>> db_url = "sqlite:///config/homeassistant-v2.db"
+    >>> lst_dev = ['binary_sensor.b1','switch.computer','light.l1','light.l2']
+    >>> df_devices = sync_homeassistant_devices(db_url, device_list=lst_dev)
+
+    Returns
+    -------
+    df_devs : pd.DataFrame
+        All recorded devices from the Home Assistant dataset. For more information refer to
+        :ref:`user guide<device_dataframe>`.
+    """
+    from pathlib import Path
+    from pyadlml.dataset.io.cache import cache_is_valid, dump_cache, load_cache
+    from pyadlml.dataset.io.local import get_data_home
+
+    # The state id marks cache entries with state ids as high-water mark
+    fingerprint = hashlib.md5('\n'.join(
+        [str(db_url), STATE_ID] + sorted(device_list)
+    ).encode('utf-8')).hexdigest()
+    if folder is None:
+        folder = Path(get_data_home()).joinpath('homeassistant', fingerprint)
+
+    if cache_is_valid(folder, fingerprint):
+        cached = load_cache(folder)
+        df_devs, high_water_mark = cached['devices'], cached['high_water_mark']
+    else:
+        df_devs, high_water_mark = None, None
+
+    query = _states_query(device_list, after_id=high_water_mark)
+    df_new = _read_states(db_url, query, chunksize)
+    if df_devs is not None and df_new.empty:
+        return df_devs
+
+    if not df_new.empty:
+        high_water_mark = int(df_new[STATE_ID].max())
+    df_new = _to_device_df(df_new)
+    if df_devs is not None:
+        # Late rows may be older than the cached ones
+        df_devs = pd.concat([df_devs, df_new], ignore_index=True)\
+                    .sort_values(by=TIME, kind='stable', ignore_index=True)
+    else:
+        df_devs = df_new
 
-    return df
\ No newline at end of file
+    dump_cache(dict(devices=df_devs, high_water_mark=high_water_mark), folder, fingerprint)
+    return df_devs
@@ -79,7 +79,8 @@ class KasterenFetcher(DataFetcher):
 #@correct_acts_and_devs
 def fetch_kasteren_2010(house:str ='A', keep_original=False, cache=True,
                         auto_corr_activities=True, load_cleaned=False,
-                        retain_corrections=False, folder_path=None) -> dict:
+                        retain_corrections=False, folder_path=None, tables=None,
+                        start_time=None, end_time=None) -> dict:
     """
     Fetches the amsterdam dataset from the internet. The original dataset or its cached version
     is stored in the :ref:`data home <storage>` folder.
@@ -106,6 +107,12 @@ def fetch_kasteren_2010(house:str ='A', keep_original=False, cache=True,
         about error correction refer to the :ref:`user guide <error_correction>`.
     folder_path : str, default=None
         If set the dataset is loaded from the specified folder.
+    tables : list of str, optional
+        The dataset keys to load, e.g. ['devices']. By default all keys are loaded.
+    start_time : str or pd.Timestamp, optional
+        If set, only events and activities ending at or after *start_time* are loaded.
+    end_time : str or pd.Timestamp, optional
+        If set, only events and activities starting before *end_time* are loaded.
 
     Examples
     --------
@@ -121,7 +128,8 @@ def fetch_kasteren_2010(house:str ='A', keep_original=False, cache=True,
     """
     return KasterenFetcher(auto_corr_acts=auto_corr_activities)(keep_original=keep_original, cache=cache, #load_cleaned=load_cleaned,
                               retain_corrections=retain_corrections, folder_path=folder_path,
-                              ident=house, load_cleaned=load_cleaned
+                              ident=house, load_cleaned=load_cleaned,
+                              tables=tables, start_time=start_time, end_time=end_time
     )
 
 def _load_activities(path, house):
@@ -144,8 +152,8 @@ def _load_activities(path, house):
         except IndexError:
             pass
     df_act = pd.DataFrame({START_TIME: acts[:,0], END_TIME: acts[:,1], ACTIVITY: acts[:,2]})
-    df_act[START_TIME] = df_act[START_TIME].apply(matlab_date_to_timestamp)
-    df_act[END_TIME] = df_act[END_TIME].apply(matlab_date_to_timestamp)
+    df_act[START_TIME] = matlab_datenums_to_datetimes(df_act[START_TIME].values)
+    df_act[END_TIME] = matlab_datenums_to_datetimes(df_act[END_TIME].values)
     df_act[ACTIVITY] = df_act[ACTIVITY].map(act_map)
 
     if house == 'B':
@@ -189,8 +197,8 @@ def _load_devices(path, house):
         dev_map = _dev_map_House_C()
 
     df_dev = pd.DataFrame({START_TIME: devs[:, 0], END_TIME: devs[:, 1], DEVICE: devs[:, 2]})
-    df_dev[START_TIME] = df_dev[START_TIME].apply(matlab_date_to_timestamp)
-    df_dev[END_TIME] = df_dev[END_TIME].apply(matlab_date_to_timestamp)
+    df_dev[START_TIME] = matlab_datenums_to_datetimes(df_dev[START_TIME].values)
+    df_dev[END_TIME] = matlab_datenums_to_datetimes(df_dev[END_TIME].values)
     df_dev[DEVICE] = df_dev[DEVICE].map(dev_map)
 
     if house == 'B':
@@ -220,6 +228,34 @@ def matlab_date_to_timestamp(matlab_datenum):
 assert pd.Timestamp('19-Jul-2006 10:50:52.800004') == matlab_date_to_timestamp(732877.4520)
 assert pd.Timestamp('19-Jul-2006 10:51:01.44') == matlab_date_to_timestamp(732877.4521)
 
+# The matlab datenum of the unix epoch 1970-01-01
+MATLAB_DATENUM_EPOCH = 719529
+
+
+def matlab_datenums_to_datetimes(matlab_datenums):
+    """ Converts an array of matlab datenums to datetimes.
+
+    The fraction of a day is rounded to microseconds in the same way as
+    :func:`matlab_date_to_timestamp` does for a single value.
+
+    Parameters
+    ----------
+    matlab_datenums : array like of float
+
+    Returns
+    -------
+    np.ndarray of datetime64[ns]
+    """
+    datenums = np.asarray(matlab_datenums, dtype=np.float64)
+    days = np.floor(datenums)
+    secs = (datenums - days)*86400.
+    whole_secs = np.floor(secs)
+    us = np.round((secs - whole_secs)*1e6)
+
+    us = ((days - MATLAB_DATENUM_EPOCH)*86400 + whole_secs).astype(np.int64)*10**6 \
+       + us.astype(np.int64)
+    return (us*1000).astype('datetime64[ns]')
+
 
 def _dev_map_House_C():
     """ translates dutch device names to english and drop the device type"""
@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 from pyadlml.constants import TIME, DEVICE, VALUE
+from pyadlml.dataset._representations.util import create_bins
 
 def create_changepoint(df_devs):
     """
@@ -24,9 +26,10 @@ def create_changepoint(df_devs):
     return df
 
 
-def resample_changepoint(cp, dt):
+def resample_changepoint(cp, dt, origin=None):
     """
-    Resamples the changepoint representation with a given resolution
+    Resamples the changepoint representation with a given resolution. A timeslice
+    is set to 1 for every device that produced at least one event inside the timeslice.
 
     Parameters
     ----------
@@ -35,37 +38,24 @@ def resample_changepoint(cp, dt):
 
     dt : str
 
+    origin : pd.Timestamp, optional
+        The timestamp the timeslices are aligned to. Defaults to the start of
+        the first day.
+
     Returns
     -------
     cp : pd.DataFrame
         Resampled dataframe in changepoint representation
     """
-    cp = cp.set_index(TIME)
-    resampler = cp.resample(dt, kind='timestamp')
-    cp = resampler.apply(_cp_evaluator)\
-        .reset_index()
-    return cp
+    bin_idx, bin_starts = create_bins(cp[TIME], dt, origin)
+    devs = cp.columns[1:]
 
+    # Scatter every event into the timeslice it falls into
+    rows, cols = np.nonzero(cp[devs].values)
+    res = np.zeros((len(bin_starts), len(devs)), dtype=int)
+    res[bin_idx[rows], cols] = 1
 
-def _cp_evaluator(series: pd.Series):
-    """ for each element return 1 if there was a change in the given interval or 0 otherwise
-    Parameters
-    ----------
-        series: pd.Series
-            contains name of the column the evaluator operates on
-            contains the timestamps for that change in set frame and the value 
-            that the specified column has at set timestamp.
-
-            is empty if all columns that have no changing entity
-
-        df: pd.DataFrame
-            contains device representation 3. Is for determining the states of other
-            device/columns for the timestamps
-
-    Returns: 0|1
-    """
-
-    if series.empty or series.sum() == 0:
-        return 0
-    else:
-        return 1
\ No newline at end of file
+    cp = pd.DataFrame(res, columns=devs)
+    cp.insert(0, TIME, bin_starts)
+    cp.columns.name = DEVICE
+    return cp
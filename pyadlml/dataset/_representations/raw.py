@@ -2,7 +2,9 @@ import numpy as np
 import pandas as pd
 
 from pyadlml.constants import DEVICE, TIME, VALUE, CAT, NUM, BOOL
-from pyadlml.dataset._core.devices import _create_devices, most_prominent_categorical_values
+from pyadlml.dataset._core.devices import _create_devices, most_prominent_categorical_values, \
+    create_device_info_dict, DeviceEvents
+from pyadlml.dataset._representations.util import create_bins, bin_bounds, to_ns
 from pyadlml.dataset.util import infer_dtypes
 
 ST_FFILL = 'ffill'
@@ -13,7 +15,7 @@ def create_raw(df_dev, dataset_info, dev_pre_values={}):
 
     Parameters
     ----------
-    df_dev : pd.DataFrame
+    df_dev : pd.DataFrame or DeviceEvents
 
     dataset_info : dict
         first key: devices (DEVICE)
@@ -30,10 +32,13 @@ def create_raw(df_dev, dataset_info, dev_pre_values={}):
         --------------------------------
         | ts1   |   1   | ....  | open |
     """
-    df_dev = df_dev.copy()
-
-    df = df_dev.pivot(index=TIME, columns=DEVICE, values=VALUE)
-    df = df.reset_index()
+    if isinstance(df_dev, DeviceEvents):
+        df = _pivot_events(df_dev)
+        devs = set(df_dev.devices)
+    else:
+        df = df_dev.pivot(index=TIME, columns=DEVICE, values=VALUE)
+        df = df.reset_index()
+        devs = set(df_dev[DEVICE].unique())
 
     # get all learned devices by data type
     dev_cat = [dev for dev in dataset_info.keys() if dataset_info[dev]['dtype'] == CAT]
@@ -41,7 +46,6 @@ def create_raw(df_dev, dataset_info, dev_pre_values={}):
     dev_num = [dev for dev in dataset_info.keys() if dataset_info[dev]['dtype'] == NUM]
 
     # filter for devices that appear in given dataset
-    devs = set(df_dev[DEVICE].unique())
     dev_cat = list(set(dev_cat).intersection(devs))
     dev_bool = list(set(dev_bool).intersection(devs))
     dev_num = list(set(dev_num).intersection(devs))
@@ -84,48 +88,178 @@ def create_raw(df_dev, dataset_info, dev_pre_values={}):
     return df
 
 
-def resample_raw(df_raw, df_dev, dt, most_likely_values=None, n_jobs=1):
+def _pivot_events(events: DeviceEvents) -> pd.DataFrame:
+    """ Creates the pivoted device dataframe of :func:`create_raw` from the events of
+    each device in the store.
+    """
+    times, inv = np.unique(events.times, return_inverse=True)
+    columns = {}
+    for dev in sorted(events.devices):
+        col = np.full(len(times), np.nan, dtype=object)
+        col[inv[events.device_index(dev)]] = events.device_values(dev)
+        columns[dev] = col
+
+    df = pd.DataFrame(columns)
+    df.insert(0, TIME, events.timestamps.unique())
+    df.columns.name = DEVICE
+    return df
+
+
+def resample_raw(df_raw, df_dev, dt, most_likely_values=None, n_jobs=1, engine='numpy'):
     """
     Resamples a raw representation
+
+    Parameters
+    ----------
+    df_raw : pd.DataFrame
+        A device dataframe in raw representation
+    df_dev : pd.DataFrame
+        The device dataframe the raw representation was created from
+    dt : str
+        The timeslices resolution, e.g '30s'
+    most_likely_values : dict or pd.DataFrame, optional
+        Maps each device to its most likely value ('ml_state'). Either the
+        device info dictionary or a dataframe indexed by device.
+    engine : {'numpy', 'pandas'}, default='numpy'
+        The resampling backend. The numpy engine resolves collisions with grouped
+        array reductions over the timeslice index of each event in a single pass.
+        The pandas engine applies the collision resolution per timeslice and device.
+
+    Returns
+    -------
+    df : pd.DataFrame
+        The resampled raw representation
     """
+    assert engine in ['numpy', 'pandas']
 
     # get dtypes in order for choosing different collision behavior
     dev_dtypes = infer_dtypes(df_dev)
     if most_likely_values is None:
-        from pyadlml.dataset.devices import get_most_likely_value
-        most_likely_values = get_most_likely_value(df_dev)
-        most_likely_values = pd.DataFrame(most_likely_values).T
-    variant = 'a'
-    if variant == 'a':
+        most_likely_values = create_device_info_dict(df_dev)
+
+    if engine == 'numpy':
+        return resample_numpy(df_raw, dt, df_dev, dev_dtypes, most_likely_values)
+    else:
         return resample_pandas(df_raw, dt, df_dev, dev_dtypes, most_likely_values)
-    elif variant == 'c':
-        return resample_pandas_and_pandarell_applymap(df_raw, dt, df_dev, dev_dtypes, most_likely_values)
-    elif variant == 'd':
-        return resample_dask_pandarell(df_raw, dt, dev_dtypes, df_dev, most_likely_values)
-    elif variant == 'b':
-        return resample_pure_dask(df_raw, dt, dev_dtypes, df_dev, most_likely_values)
 
 
-"""
-FROM HERE ON ARE THE DIFFERENT resample techniques. As of now pandas and pandarell applymap 
-is the fastest.
-"""
+def _get_ml_state(most_likely_values, dev):
+    """ Retrieves the most likely state of a device from either the device
+        info dictionary or a dataframe indexed by device
+    """
+    if isinstance(most_likely_values, dict):
+        return most_likely_values[dev]['ml_state']
+    return most_likely_values.at[dev, 'ml_state']
+
 
+def resample_numpy(df_raw, t_res, df_dev, dev_dtypes, most_likely_values, origin=None):
+    """ Resamples a raw representation by assigning each row an integer timeslice
+    index and resolving collisions with grouped array reductions.
 
-def parallel_resample_apply(resampler, func):
-    """
-    https://stackoverflow.com/questions/26187759/parallelize-apply-after-pandas-groupby
-    # TODO write manual parallelism
+    Produces the same result as :func:`resample_pandas`. For boolean and categorical
+    devices the value that covers most of a timeslice is chosen, for numerical
+    devices the value closest to the most likely value. Timeslices where a device
+    did not report a value hold the last known row before the timeslice.
+
+    The timeslices are aligned to the start of the first day or to the given origin.
     """
-    import pandas as pd
-    from joblib import Parallel, delayed
-    import multiprocessing
-    jobs = []
-    for name, group in resampler:
-        jobs.append(delayed(func)(group))
-    ret_lst = Parallel(n_jobs=multiprocessing.cpu_count())(jobs)
-    #retLst = Parallel(n_jobs=multiprocessing.cpu_count())(delayed(func)(group) for name, group in grouped)
-    return pd.concat(retLst)
+    dt = pd.Timedelta(t_res).value
+    bin_idx, bin_starts = create_bins(df_raw[TIME], t_res, origin)
+    n_bins = len(bin_starts)
+    t = to_ns(df_raw[TIME])
+    ts_bins = to_ns(bin_starts)
+
+    start, count = bin_bounds(bin_idx, n_bins)
+    nonempty = (count > 0)
+    first_row = start[nonempty]
+    collision = (count[nonempty] > 1)
+
+    # Index of the last row at or before each timeslices start
+    ff_idx = np.searchsorted(t, ts_bins, side='right') - 1
+
+    # Time each row holds its value inside its timeslice and the time from the
+    # start of the timeslice to the first row
+    t_next = np.append(t[1:], np.iinfo(np.int64).max)
+    row_dur = np.minimum(t_next, ts_bins[bin_idx] + dt) - t
+    lead_dur = t[first_row] - ts_bins[nonempty]
+
+    # Sort device events once to look up the value preceding each timeslice
+    dev_codes, dev_names = pd.factorize(df_dev[DEVICE])
+    order = np.argsort(dev_codes, kind='stable')
+    dev_offsets = np.searchsorted(dev_codes[order], np.arange(len(dev_names) + 1))
+    dev_times = to_ns(df_dev[TIME])[order]
+    dev_values = df_dev[VALUE].values[order]
+    dev_pos = {dev: i for i, dev in enumerate(dev_names)}
+
+    def prae_values(dev, values):
+        """ Returns the last value of the device before each non-empty timeslice.
+            Falls back to the first value inside the timeslice.
+        """
+        res = values[first_row]
+        if dev not in dev_pos:
+            return res
+        i = dev_pos[dev]
+        times = dev_times[dev_offsets[i]:dev_offsets[i+1]]
+        idx = np.searchsorted(times, ts_bins[nonempty], side='left') - 1
+        has_prae = (idx >= 0)
+        res[has_prae] = dev_values[dev_offsets[i]:dev_offsets[i+1]][idx[has_prae]]
+        return res
+
+    res = {TIME: bin_starts}
+    for dev in df_raw.columns[1:]:
+        if dev in dev_dtypes[NUM]:
+            values = df_raw[dev].values.astype(float)
+            rows = np.flatnonzero(~np.isnan(values))
+            bins = bin_idx[rows]
+
+            # Choose per timeslice the first value closest to the most likely value
+            dist = np.abs(values[rows] - _get_ml_state(most_likely_values, dev))
+            srt = np.lexsort((rows, dist, bins))
+            is_first = np.ones(len(srt), dtype=bool)
+            is_first[1:] = bins[srt][1:] != bins[srt][:-1]
+
+            col = np.full(n_bins, np.nan)
+            has_ff = (ff_idx >= 0)
+            col[has_ff] = values[ff_idx[has_ff]]
+            col[bins[srt][is_first]] = values[rows[srt][is_first]]
+
+        elif dev in dev_dtypes[BOOL]:
+            values = df_raw[dev].values.astype(bool)
+            prae = prae_values(dev, values.astype(object)).astype(bool)
+            dur_on = np.add.reduceat(row_dur*values, first_row) + lead_dur*prae
+
+            # Choose the state that is present for longer than half the timeslice
+            col = values[ff_idx]
+            col[nonempty] = np.where(collision, 2*dur_on > dt, values[first_row])
+
+        else:
+            values = df_raw[dev].values
+            prae = prae_values(dev, values.copy())
+
+            # Categories are enumerated in order of their occurrence to choose
+            # the first category on equal durations
+            if dev in dev_pos:
+                i = dev_pos[dev]
+                cats = dev_values[dev_offsets[i]:dev_offsets[i+1]]
+            else:
+                cats = values[:0]
+            cats = pd.unique(np.concatenate([cats, values, prae]))
+            codes = pd.Index(cats).get_indexer(values)
+            prae_codes = pd.Index(cats).get_indexer(prae)
+
+            K = len(cats)
+            dur = np.bincount(bin_idx*K + codes, weights=row_dur, minlength=n_bins*K)
+            dur += np.bincount(np.flatnonzero(nonempty)*K + prae_codes, weights=lead_dur,
+                               minlength=n_bins*K)
+            max_cat = cats[dur.reshape(n_bins, K).argmax(axis=1)]
+
+            col = values[ff_idx]
+            col[nonempty] = np.where(collision, max_cat[nonempty], values[first_row])
+
+        res[dev] = col
+
+    return pd.DataFrame(res)
+
 
 def resample_pandas(df_raw, t_res, df_dev, dev_dtypes, most_likely_values):
         df_raw = df_raw.set_index(TIME)
@@ -150,154 +284,6 @@ def resample_pandas(df_raw, t_res, df_dev, dev_dtypes, most_likely_values):
         return raw
 
 
-def resample_pandas_and_pandarell_applymap(df_raw, t_res, df_dev, dev_dtypes, most_likely_value):
-    """ use pandas with and pandarallel applymap """
-    from pandarallel import pandarallel
-    pandarallel.initialize(verbose=1)
-
-    df_raw = df_raw.set_index(TIME)
-    raw_ff = df_raw.resample(t_res, kind='timestamp').ffill()
-
-    # first make resampling and safe lists of choices inside each bin
-    raw_int = df_raw.resample(t_res).apply(lambda x: [x.name, x.tolist(), x.index.tolist()])
-
-    def _assign_timeslicesC(lst: list) -> pd.Series:
-        """
-        cc. kasteren
-
-        Parameters
-        ----------
-        series: pd.Series
-            the datapoints that are to be assigned for a timeslice for one column/device
-        t_res: the resolution of the intervals
-            e.g 30s ->  09:38:30, 09:39:00
-        devs: pd.DataFrame
-            used to identify when values changes
-
-        """
-        name = lst[0]
-        values = lst[1]
-        timestamps = lst[2]
-        series = pd.Series(values, index=timestamps)
-        series.name = lst[0]
-
-        # return nan if no element matchs, happens till first occurence of data
-        series = series.dropna()
-        if series.empty:
-            return np.nan
-
-        # if one element matches the interval slot, assign the one
-        elif series.size == 1:
-            return series
-
-        # if there are multiple elements falling into the same timeslice
-        else:
-            if series.name in dev_dtypes['boolean']:
-                tmp = resolve_collision_boolean(series, t_res, df_dev)
-
-            elif series.name in dev_dtypes['categorical']:
-                tmp = resolve_collision_categorical(series, t_res, df_dev)
-
-            elif series.name in dev_dtypes['numerical']:
-                tmp = resolve_collision_numerical(series, t_res, df_dev, most_likely_value)
-            else:
-                raise ValueError("The column/device didn't match either boolean, categorical or numerical type.")
-            return tmp
-
-    # on each field apply the collision resolvment
-    #raw_int = raw_int.applymap(_assign_timeslicesC)
-    #raw_int = raw_int.parallel_applymap(_assign_timeslicesC)
-
-    # combine both by filling gaps with the forward fills
-    raw = raw_int.where(~raw_int.isnull(), raw_ff)
-
-    raw = raw.reset_index()
-    return raw
-
-def resample_pure_dask(df_raw, t_res, dev_dtypes, df_dev, most_likely_values):
-        import dask.dataframe as dd
-        dd_raw = dd.from_pandas(df_raw, 4)
-
-        # TODO problem dask resampler doesn't implement function ffill
-        # solution 1
-        resampler_ffill = dd_raw.groupby(pd.Grouper(key=TIME, freq=t_res, origin='start'))
-        def func(x):
-            """ returns nan if list is empty and """
-            x = x.dropna()
-            if x.empty:
-                return np.nan
-            else:
-                return x.iloc[-1]
-
-        raw_ff = resampler_ffill.apply(func)
-        df = raw_ff.compute()
-        # solution 2: use rolling in combination with apply and a lambda
-        # function that mimics ffill to achieve parallelnes
-
-        resampler = dd_raw.resample(t_res)
-        raw_int = resampler.apply(_assign_timeslices, t_res=t_res, dev=df_dev,
-                              dev_dtypes=dev_dtypes, most_likely_values=most_likely_values)
-        raw = raw_int.where(~raw_int.isnull(), raw_ff)
-        raw = raw.reset_index().compute()
-        return raw
-
-
-def resample_dask_pandarell(df_raw, t_res, dev_dtypes, df_dev, most_likely_values):
-        import dask.dataframe as dd
-        n_jobs = 8
-        df_raw = df_raw.set_index(TIME)
-        raw_ff = df_raw.resample(t_res, kind='timestamp').ffill()
-
-        # first make resampling and safe lists of choices inside each bin
-        dd_raw_int = dd.from_pandas(df_raw, npartitions=n_jobs)
-        raw_count = dd_raw_int.resample(t_res).count().compute()
-        row_mask = (raw_count > 0).any(axis=1)
-        # first make resampling and safe lists of choices inside each bin
-        #raw_int = df_raw.resample(t_res).apply(lambda x: [x.name, x.tolist(), x.index.tolist()])
-        raw_int = parallel_resample_apply(df_raw.resample(t_res), lambda x: [x.name, x.tolist(), x.index.tolist()])
-        raw_int_subset = raw_int.loc[row_mask]
-
-        def _assign_timeslicesC(lst: list) -> pd.Series:
-            name = lst[0]
-            values = lst[1]
-            timestamps = lst[2]
-            series = pd.Series(values, index=timestamps)
-            series.name = name
-            # return nan if no element matchs, happens till first occurence of data
-            series = series.dropna()
-            if series.empty:
-                return np.nan
-
-            # if one element matches the interval slot, assign the one
-            elif series.size == 1:
-                return series
-
-            # if there are multiple elements falling into the same timeslice
-            else:
-                if series.name in dev_dtypes['boolean']:
-                    tmp = resolve_collision_boolean(series, t_res, df_dev)
-
-                elif series.name in dev_dtypes['categorical']:
-                    tmp = resolve_collision_categorical(series, t_res, df_dev)
-
-                elif series.name in dev_dtypes['numerical']:
-                    tmp = resolve_collision_numerical(series, t_res, df_dev, most_likely_values)
-                else:
-                    raise ValueError("The column/device didn't match either boolean, categorical or numerical type.")
-                return tmp
-
-        from pandarallel import pandarallel
-        pandarallel.initialize(verbose=2)
-        # on each field apply the collision resolvment
-        raw_int_subset = raw_int_subset.parallel_apply(_assign_timeslicesC)
-        raw_int = pd.concat(raw_int_subset, raw_int[~row_mask]).sort_values(by=TIME)
-
-        # combine both by filling gaps with the forward fills
-        raw = raw_int.where(~raw_int.isnull(), raw_ff)
-
-        raw = raw.reset_index()
-        return raw
-
 def _assign_timeslices(series: pd.Series, t_res, dev, dev_dtypes, most_likely_values) -> pd.Series:
     """
     cc. kasteren
@@ -343,7 +329,7 @@ def resolve_collision_numerical(series: pd.Series, t_res, dev, most_likely_value
     Discussion: maybe the value that is further away from the mean carries more information and
     should therefore be kept ???
     """
-    dev_mean = most_likely_values.at[series.name, 'ml_state']
+    dev_mean = _get_ml_state(most_likely_values, series.name)
     # get elements position with minimal distance to most likely value (mean/median)
     min_idx = abs(series - dev_mean).values.argmin()
     val = series.iloc[min_idx]
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+
+def to_ns(times) -> np.ndarray:
+    """ Converts timestamps into int64 nanoseconds since the epoch.
+
+    Parameters
+    ----------
+    times : pd.Series, pd.DatetimeIndex or np.ndarray
+        Timezone naive or aware timestamps. Timezone aware timestamps are
+        converted to UTC.
+
+    Returns
+    -------
+    np.ndarray of dtype int64
+    """
+    if isinstance(times, (pd.Series, pd.Index)):
+        times = times.values
+    return np.asarray(times, dtype='datetime64[ns]').view(np.int64)
+
+
+def bin_index(t, dt_ns, origin):
+    """ Computes the index of the left-closed timeslice each timestamp falls into.
+
+    Parameters
+    ----------
+    t : np.ndarray of dtype int64
+        Timestamps in nanoseconds.
+    dt_ns : int
+        The timeslices length in nanoseconds.
+    origin : int or np.ndarray of dtype int64
+        The start of the timeslice with index 0, either shared or given per timestamp.
+
+    Returns
+    -------
+    np.ndarray of dtype int64
+    """
+    return (t - origin)//dt_ns
+
+
+def create_bins(times, dt, origin=None):
+    """ Assigns each timestamp to the left-closed timeslice of length dt it falls into.
+
+    The timeslices are anchored at the start of the day of the first timestamp which
+    is identical to the bins produced by pandas `resample` with origin='start_day'.
+
+    Parameters
+    ----------
+    times : pd.Series
+        The sorted timestamps.
+    dt : str or pd.Timedelta
+        The timeslices length.
+    origin : pd.Timestamp, optional
+        A timestamp the timeslices are aligned to. Defaults to the start of the
+        day of the first timestamp.
+
+    Returns
+    -------
+    bin_idx : np.ndarray of dtype int64
+        For each timestamp the index of the timeslice relative to the first one.
+    bin_starts : pd.DatetimeIndex
+        The left bound of each timeslice from the first to the last timestamp.
+    """
+    times = pd.Series(times)
+    dt_ns = pd.Timedelta(dt).value
+    t = to_ns(times)
+
+    if origin is None:
+        origin = times.iloc[0].normalize()
+    origin = pd.Timestamp(origin).value
+    bin_idx = bin_index(t, dt_ns, origin)
+    first_bin = bin_idx[0]
+    bin_idx = bin_idx - first_bin
+
+    n_bins = bin_idx[-1] + 1
+    starts = origin + (first_bin + np.arange(n_bins, dtype=np.int64))*dt_ns
+    bin_starts = pd.DatetimeIndex(starts.view('datetime64[ns]'))
+    if times.dt.tz is not None:
+        bin_starts = bin_starts.tz_localize('UTC').tz_convert(times.dt.tz)
+    return bin_idx, bin_starts
+
+
+def bin_bounds(bin_idx: np.ndarray, n_bins: int):
+    """ Computes the row ranges of each timeslice for rows sorted by timeslice.
+
+    Parameters
+    ----------
+    bin_idx : np.ndarray
+        Sorted timeslice index for each row.
+    n_bins : int
+        The number of timeslices.
+
+    Returns
+    -------
+    start, count : np.ndarray
+        The first row and the number of rows for each timeslice.
+    """
+    bins = np.arange(n_bins)
+    start = np.searchsorted(bin_idx, bins, side='left')
+    count = np.searchsorted(bin_idx, bins, side='right') - start
+    return start, count
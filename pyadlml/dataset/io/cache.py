@@ -0,0 +1,336 @@
+"""
+A dataset cache is a folder containing one file per table and a manifest.
+The manifest records the fingerprint of the loader that produced the data and
+where each dataset key is stored. DataFrames are written as Parquet files such that
+they can be memory-mapped and read partially. Columns mixing python types, e.g.
+the values of boolean, categorical and numerical devices, are split into one column
+per type. When pyarrow is not installed all tables are dumped into one joblib file
+instead. Tables that Parquet can not represent are stored with the other objects.
+"""
+import json
+import numbers
+import shutil
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from pyadlml.constants import START_TIME, END_TIME, TIME
+from pyadlml.dataset._core.activities import ActivityDict
+
+
+FN_MANIFEST = 'manifest.json'
+FN_OBJECTS = 'objects.joblib'
+FN_TABLES = 'tables.joblib'
+FMT_PARQUET = 'parquet'
+FMT_JOBLIB = 'joblib'
+CACHE_VERSION = 2
+
+# The pandas dtypes of the columns a mixed column is split into
+MIXED_KINDS = {'bool': 'boolean', 'int': 'Int64', 'float': 'float64', 'str': 'object'}
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow
+        return True
+    except ImportError:
+        return False
+
+
+def _read_manifest(folder: Path):
+    fp = Path(folder).joinpath(FN_MANIFEST)
+    if not fp.is_file():
+        return None
+    with open(fp, 'r') as f:
+        return json.load(f)
+
+
+def cache_is_valid(folder: Path, fingerprint: str) -> bool:
+    """ Checks whether a cache exists that was created by the same loader.
+
+    Parameters
+    ----------
+    folder : Path
+        The cache folder.
+    fingerprint : str
+        The fingerprint of the loader and its corrections.
+
+    Returns
+    -------
+    bool
+    """
+    manifest = _read_manifest(folder)
+    return manifest is not None \
+        and manifest['version'] == CACHE_VERSION \
+        and manifest['fingerprint'] == fingerprint
+
+
+def _value_kind(value):
+    if isinstance(value, (bool, np.bool_)):
+        return 'bool'
+    if isinstance(value, numbers.Integral):
+        return 'int'
+    if isinstance(value, numbers.Real):
+        return 'float'
+    if isinstance(value, str):
+        return 'str'
+    raise TypeError(f'Values of type {type(value)} can not be split.')
+
+
+def split_mixed(df: pd.DataFrame):
+    """ Splits every column mixing python types into one column per type.
+
+    A column 'col' becomes the column 'col:kind' holding the position of the
+    values type in the returned kinds and the columns 'col:<kind>' holding the
+    values of that type and nulls elsewhere.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+
+    Returns
+    -------
+    df : pd.DataFrame
+        The frame with the split columns in place of the mixed ones.
+    mixed : dict
+        Maps the mixed columns to the kinds they are split into.
+    """
+    mixed = {}
+    for col in df.columns:
+        if df[col].dtype != object or pd.api.types.infer_dtype(df[col], skipna=False) \
+                not in ['mixed', 'mixed-integer', 'mixed-integer-float']:
+            continue
+        kind_of = [_value_kind(v) for v in df[col].values]
+        kinds = [k for k in MIXED_KINDS if k in kind_of]
+        codes = np.array([kinds.index(k) for k in kind_of], dtype=np.int8)
+
+        split = {f'{col}:kind': codes}
+        for i, kind in enumerate(kinds):
+            values = df[col].where(codes == i)
+            split[f'{col}:{kind}'] = values.astype(MIXED_KINDS[kind])
+        pos = df.columns.get_loc(col)
+        df = pd.concat([df.iloc[:, :pos], pd.DataFrame(split, index=df.index),
+                        df.iloc[:, pos+1:]], axis=1)
+        mixed[col] = kinds
+    return df, mixed
+
+
+def join_mixed(df: pd.DataFrame, mixed: dict) -> pd.DataFrame:
+    """ Joins the columns created by :func:`split_mixed` into the original columns.
+    """
+    for col, kinds in mixed.items():
+        codes = df[f'{col}:kind'].values
+        values = np.empty(len(df), dtype=object)
+        for i, kind in enumerate(kinds):
+            mask = (codes == i)
+            kind_values = df[f'{col}:{kind}'].values[mask]
+            if kind == 'bool':
+                kind_values = [bool(v) for v in kind_values]
+            elif kind == 'int':
+                kind_values = [int(v) for v in kind_values]
+            values[mask] = kind_values
+        pos = df.columns.get_loc(f'{col}:kind')
+        df = df.drop(columns=[f'{col}:kind'] + [f'{col}:{kind}' for kind in kinds])
+        df.insert(pos, col, values)
+    return df
+
+
+def delete_cache(folder: Path) -> None:
+    """ Removes the cache folder if it exists.
+    """
+    if Path(folder).exists():
+        shutil.rmtree(folder)
+
+
+def dump_cache(data: dict, folder: Path, fingerprint: str) -> None:
+    """ Writes each table of a dataset into its own file and creates a manifest.
+
+    Parameters
+    ----------
+    data : dict
+        The dataset as returned by a loader.
+    folder : Path
+        The cache folder. Existing content is overwritten.
+    fingerprint : str
+        The fingerprint of the loader and its corrections.
+    """
+    folder = Path(folder)
+    delete_cache(folder)
+    folder.mkdir(parents=True)
+
+    fmt = FMT_PARQUET if _has_pyarrow() else FMT_JOBLIB
+    manifest = dict(version=CACHE_VERSION, fingerprint=fingerprint, format=fmt,
+                    keys=list(data.keys()), tables={}, objects=[])
+
+    if fmt == FMT_JOBLIB:
+        joblib.dump(data, folder.joinpath(FN_TABLES))
+        manifest['objects'] = list(data.keys())
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        def write(df, fn):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            pq.write_table(table, folder.joinpath(fn))
+            return fn
+
+        objects = {}
+        for key, value in data.items():
+            if isinstance(value, ActivityDict):
+                # Every subject gets its own file so that they can be read individually
+                manifest['tables'][key] = dict(
+                    kind='activity_dict',
+                    subjects={subj: write(df, f'{key}_{i}.parquet')
+                              for i, (subj, df) in enumerate(value.items())}
+                )
+            elif isinstance(value, pd.DataFrame):
+                try:
+                    df, mixed = split_mixed(value)
+                    manifest['tables'][key] = dict(kind='frame', mixed=mixed,
+                                                   file=write(df, f'{key}.parquet'))
+                except (TypeError, pa.ArrowTypeError, pa.ArrowInvalid):
+                    # Columns holding arbitrary python objects can only be pickled
+                    objects[key] = value
+            else:
+                objects[key] = value
+
+        if objects:
+            joblib.dump(objects, folder.joinpath(FN_OBJECTS))
+        manifest['objects'] = list(objects.keys())
+
+    # The manifest is written last and marks the cache as complete
+    with open(folder.joinpath(FN_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _localize(ts, tz):
+    """ Converts a time range bound to the timezone of the column it is compared with.
+    """
+    ts = pd.Timestamp(ts)
+    if tz is not None:
+        return ts.tz_localize(tz) if ts.tz is None else ts.tz_convert(tz)
+    return ts.tz_localize(None) if ts.tz is not None else ts
+
+
+def _time_filters(columns, start_time, end_time, tz=None):
+    """ Creates predicates that select the rows overlapping [start_time, end_time).
+    Naive bounds are interpreted in the timezone tz of the time columns.
+    """
+    if TIME in columns:
+        st_col, et_col = TIME, TIME
+    elif START_TIME in columns and END_TIME in columns:
+        st_col, et_col = END_TIME, START_TIME
+    else:
+        return []
+
+    filters = []
+    if start_time is not None:
+        filters.append((st_col, '>=', _localize(start_time, tz)))
+    if end_time is not None:
+        filters.append((et_col, '<', _localize(end_time, tz)))
+    return filters
+
+
+def _select_rows(df, start_time=None, end_time=None):
+    """ Applies the time range predicates to an in-memory DataFrame.
+    """
+    time_cols = [c for c in [TIME, START_TIME] if c in df.columns]
+    tz = getattr(df[time_cols[0]].dt, 'tz', None) if time_cols else None
+    mask = pd.Series(True, index=df.index)
+    for col, op, value in _time_filters(df.columns, start_time, end_time, tz):
+        mask &= (df[col] >= value) if op == '>=' else (df[col] < value)
+    return df[mask].reset_index(drop=True)
+
+
+def select_tables(data: dict, tables=None, subjects=None, start_time=None, end_time=None) -> dict:
+    """ Restricts an in-memory dataset the same way :func:`load_cache` does.
+
+    Parameters
+    ----------
+    data : dict
+    tables : list of str, optional
+        The dataset keys to keep. Defaults to all keys.
+    subjects : list of str, optional
+        The subjects to keep from the activities. Defaults to all subjects.
+    start_time : str or pd.Timestamp, optional
+    end_time : str or pd.Timestamp, optional
+        Only events and activities overlapping [start_time, end_time) are kept.
+
+    Returns
+    -------
+    dict
+    """
+    res = {}
+    for key, value in data.items():
+        if tables is not None and key not in tables:
+            continue
+        if isinstance(value, ActivityDict):
+            value = ActivityDict({subj: _select_rows(df, start_time, end_time)
+                                  for subj, df in value.items()
+                                  if subjects is None or subj in subjects})
+        elif isinstance(value, pd.DataFrame):
+            value = _select_rows(value, start_time, end_time)
+        res[key] = value
+    return res
+
+
+def load_cache(folder: Path, tables=None, subjects=None, start_time=None, end_time=None) -> dict:
+    """ Reads a dataset from the cache.
+
+    Only the requested tables and subjects are read. The Parquet files are
+    memory-mapped and the time range is pushed down as predicate to the reader.
+
+    Parameters
+    ----------
+    folder : Path
+        The cache folder.
+    tables : list of str, optional
+        The dataset keys to load, e.g. ['devices']. Defaults to all keys.
+    subjects : list of str, optional
+        The subjects to load from the activities. Defaults to all subjects.
+    start_time : str or pd.Timestamp, optional
+    end_time : str or pd.Timestamp, optional
+        Only events and activities overlapping [start_time, end_time) are loaded.
+
+    Returns
+    -------
+    dict
+    """
+    folder = Path(folder)
+    manifest = _read_manifest(folder)
+
+    if manifest['format'] == FMT_JOBLIB:
+        data = joblib.load(folder.joinpath(FN_TABLES))
+        return select_tables(data, tables, subjects, start_time, end_time)
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def read(fn, mixed=None):
+        fp = folder.joinpath(fn)
+        schema = pq.read_schema(fp)
+        time_types = [schema.field(c).type for c in [TIME, START_TIME] if c in schema.names]
+        tz = time_types[0].tz if time_types and pa.types.is_timestamp(time_types[0]) else None
+        filters = _time_filters(schema.names, start_time, end_time, tz)
+        table = pq.read_table(fp, memory_map=True, filters=filters if filters else None)
+        return join_mixed(table.to_pandas(), mixed or {})
+
+    data = {}
+    objects = [k for k in manifest['objects'] if tables is None or k in tables]
+    if objects:
+        data.update(select_tables(joblib.load(folder.joinpath(FN_OBJECTS)), objects,
+                                  subjects, start_time, end_time))
+
+    for key, entry in manifest['tables'].items():
+        if tables is not None and key not in tables:
+            continue
+        if entry['kind'] == 'activity_dict':
+            data[key] = ActivityDict({subj: read(fn) for subj, fn in entry['subjects'].items()
+                                      if subjects is None or subj in subjects})
+        else:
+            data[key] = read(entry['file'], entry.get('mixed'))
+
+    # Restore the order of the keys as returned by the loader
+    return {k: data[k] for k in manifest['keys'] if k in data}
@@ -1,7 +1,11 @@
 from pyadlml.constants import DATA_DCT_KEY_ACTS, DATA_DCT_KEY_DEVS, DEVICE, ACTIVITY
 from pyadlml.dataset._core.activities import ActivityDict
 from .local import get_data_home, _ensure_dh_folder_exists, _delete_data
+from .cache import cache_is_valid, delete_cache, dump_cache, load_cache, select_tables
 from pathlib import Path
+import hashlib
+import inspect
+import sys
 import pandas as pd
 import joblib
 from abc import ABC, abstractmethod
@@ -11,7 +15,9 @@ from abc import ABC, abstractmethod
 
 class DataFetcher(ABC):
     FN_CLEANED = 'cleaned%s.joblib'
-    FN_CACHED = 'cached%s.joblib'
+    FN_CACHED = 'cached%s'
+    # Bump when a loader changes due to code outside of the fetcher's module
+    LOADER_VERSION = 1
 
     def __init__(self, dataset_name: str,
                        downloader,
@@ -68,7 +74,7 @@ class DataFetcher(ABC):
                 ...
             }
         """
-        if self.apply_act_corr:
+        if self.apply_act_corr and DATA_DCT_KEY_ACTS in data:
             acts = data[DATA_DCT_KEY_ACTS]
             unpack = isinstance(acts, pd.DataFrame)
             if unpack:
@@ -87,7 +93,7 @@ class DataFetcher(ABC):
                 if corrections:
                     data['correction_activities'] = data['correction_activities'][list(acts.keys())[0]]
 
-        if self.apply_dev_corr:
+        if self.apply_dev_corr and DATA_DCT_KEY_DEVS in data:
             from pyadlml.dataset._core.devices import correct_devices
             df_dev, correction_dev_dict = correct_devices(data[DATA_DCT_KEY_DEVS], 
                                 retain_correction=retain_corrections)
@@ -113,23 +119,70 @@ class DataFetcher(ABC):
                self.dataset_folder.joinpath(cleaned_name)
 
 
-    def __call__(self, cache=False, keep_original=False, retain_corrections=False, load_cleaned=False, folder_path=None, apply_corrections=True, 
-                *args, **kwargs):
+    def fingerprint(self, apply_corrections=False, retain_corrections=False) -> str:
+        """ Identifies the loader and corrections that produce a dataset.
 
+        A cached dataset is only reused when the fingerprint did not change, i.e.
+        the modules defining the fetcher, its parsers and the applied corrections
+        were not modified and the :attr:`LOADER_VERSION` is the same.
+
+        Parameters
+        ----------
+        apply_corrections : bool, default=False
+            Whether the cached tables are corrected.
+        retain_corrections : bool, default=False
+            Whether the cached tables hold the corrections.
+        """
+        cls = type(self)
+        correct_acts = apply_corrections and self.apply_act_corr
+        correct_devs = apply_corrections and self.apply_dev_corr
+        parts = [cls.__module__, cls.__qualname__, str(cls.LOADER_VERSION),
+                 str(correct_acts), str(correct_devs), str(apply_corrections and retain_corrections)]
+
+        # The whole modules are hashed since the loaders delegate to module level parsers
+        modules = [c.__module__ for c in cls.__mro__ if issubclass(c, DataFetcher)]
+        if correct_acts:
+            modules.append('pyadlml.dataset._core.activities')
+        if correct_devs:
+            modules.append('pyadlml.dataset._core.devices')
+        for name in dict.fromkeys(modules):
+            try:
+                parts.append(inspect.getsource(sys.modules[name]))
+            except (OSError, TypeError, KeyError):
+                parts.append(name)
+        return hashlib.md5('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def __call__(self, cache=False, keep_original=False, retain_corrections=False, load_cleaned=False, folder_path=None, apply_corrections=True, 
+                tables=None, subjects=None, start_time=None, end_time=None, *args, **kwargs):
+        """
+        Parameters
+        ----------
+        tables : list of str, optional
+            The dataset keys to return, e.g. ['devices']. Defaults to all.
+        subjects : list of str, optional
+            The subjects to return when the activities are an ActivityDict. Defaults to all.
+        start_time : str or pd.Timestamp, optional
+        end_time : str or pd.Timestamp, optional
+            Only events and activities overlapping [start_time, end_time) are returned.
+            When loading from the cache, the selection is done while reading.
+        """
 
         self.retain_corrections = retain_corrections
+        selection = dict(tables=tables, subjects=subjects, start_time=start_time, end_time=end_time)
 
         # Resolve folders
         self._create_exp_folder()
 
         ident = kwargs.get('ident')
         fp_cached_dataset, fp_cleaned_dataset = self._gen_filenames_cached(ident) 
+        fingerprint = self.fingerprint(apply_corrections, retain_corrections)
+        cache_valid = cache_is_valid(fp_cached_dataset, fingerprint)
 
 
         # Only download data if it was not already fetched
         # and no cached version exists that should be loaded
         # and the load_cleaned flag is not set
-        if not (self.original_folder.exists() or (fp_cached_dataset.is_file() and cache)
+        if not (self.original_folder.exists() or (cache_valid and cache)
                 or folder_path is not None) and not load_cleaned:
             self.original_folder.mkdir(parents=True, exist_ok=True)
             self.downloader.download(self.original_folder)
@@ -142,27 +195,30 @@ class DataFetcher(ABC):
         # Load from cached version if available and cache flag is set
             # or load from cleaned version
             # otherwise load from the function
-        if fp_cached_dataset.is_file() and cache and not load_cleaned:
-            data = joblib.load(fp_cached_dataset)
+        if cache_valid and cache and not load_cleaned:
+            data = load_cache(fp_cached_dataset, **selection)
         elif fp_cleaned_dataset.is_file() and load_cleaned:
-            data = joblib.load(fp_cleaned_dataset)
+            data = select_tables(joblib.load(fp_cleaned_dataset), **selection)
+            if apply_corrections:
+                self.apply_corrections(data, ident, retain_corrections)
         else:
             data = self.load_data(folder_path=self.original_folder, **kwargs)
 
-        # Save dataset if downloaded and not already cached
-        if cache and not fp_cached_dataset.is_file() and not load_cleaned:
-            joblib.dump(data, fp_cached_dataset)
+            # The corrected tables are cached such that loading skips the corrections
+            if apply_corrections:
+                self.apply_corrections(data, ident, retain_corrections)
+
+            # Save dataset if downloaded and not already cached
+            if cache and not load_cleaned:
+                dump_cache(data, fp_cached_dataset, fingerprint)
+            data = select_tables(data, **selection)
 
         # Clean up data
-        if not cache and fp_cached_dataset.is_file():
-            fp_cached_dataset.unlink()
+        if not cache:
+            delete_cache(fp_cached_dataset)
         if not keep_original and self.original_folder.exists():
             _delete_data(self.original_folder)
 
-        # Correct devices or activities
-        if apply_corrections:
-            self.apply_corrections(data, ident, retain_corrections)
-
         return data
 
 
@@ -5,7 +5,8 @@ import pandas as pd
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 
 from pyadlml.constants import ACTIVITY, DEVICE, VALUE, START_TIME, END_TIME, TIME, BOOL, CAT, NUM
-from pyadlml.dataset._core.devices import contains_non_binary, split_devices_binary, device_events_to_states
+from pyadlml.dataset._core.devices import contains_non_binary, split_devices_binary, device_events_to_states, \
+    accepts_device_events
 from pyadlml.dataset._core.activities import add_other_activity
 from pyadlml.dataset.stats import contingency_states as stat_cont_st, contingency_events as stat_cont_ev, cross_correlogram as stat_cc
 from .devices import _plot_device_states
@@ -23,6 +24,7 @@ DEV_CON_01_HM = {(8, 14): (12, 10), (11, 24): (12, 6), (11, 34): (16, 12)}
 DEV_CON_01_HM_WT = {(10, 24): (14, 7), (7, 28): (16, 10)}
 
 
+@accepts_device_events
 @save_fig
 def cross_correlogram(df_devices, df_actvities, corr_data=[None, None, None, None], binsize='1s', maxlag='2m',
                       axis='off', figsize=(5, 5), file_path=""):
@@ -47,6 +49,7 @@ def cross_correlogram(df_devices, df_actvities, corr_data=[None, None, None, Non
     return plot_cc(ccg, bins, title=title, x_label=activities, y_label=devices, axis=axis, figsize=figsize)
 
 
+@accepts_device_events
 @save_fig
 def contingency_events(df_devs=None, df_acts=None, df_con_tab=None, other=False, per_state=False, \
                        scale=None, numbers=True, figsize=None, file_path="", n_jobs=1):
@@ -147,6 +150,7 @@ def contingency_events(df_devs=None, df_acts=None, df_con_tab=None, other=False,
 
 
 
+@accepts_device_events
 @save_fig
 def plot_contingency_states(df_devs: pd.DataFrame = None, df_acts: pd.DataFrame = None, df_con_tab: pd.DataFrame = None,
                             figsize: tuple = None, z_scale: str = 'log', other: bool = False, numbers: bool = True,
@@ -243,6 +247,7 @@ def plot_contingency_states(df_devs: pd.DataFrame = None, df_acts: pd.DataFrame
              numbers=numbers)
 
 
+@accepts_device_events
 @save_fig
 def activities_and_device_events(df_devices, df_activities, start_time=None, end_time=None,
                                  figsize=(20, 8), grid=False, file_path=""):
@@ -328,6 +333,7 @@ def activities_and_device_events(df_devices, df_activities, start_time=None, end
 
 
 
+@accepts_device_events
 @save_fig
 def activities_and_device_states(df_devices: pd.DataFrame, df_activities: pd.DataFrame,
                                  start_time: str = None, end_time: str = None,
@@ -439,6 +445,7 @@ def plot_activity_bar(ax, df_acts: pd.DataFrame, acts: list, start_time, end_tim
 
 
 
+@accepts_device_events
 def plot_events_over_act_hist(df_acts: pd.DataFrame, df_devs: pd.DataFrame, activity: str, device: str, dt: str = '1s') -> plt.Figure:
     """ Plot a histogram when events happen centered around an activity
 
@@ -8,7 +8,7 @@ from pyadlml.stats import device_state_fraction
 from pyadlml.constants import DEVICE, TIME, VALUE, BOOL, CAT, START_TIME, END_TIME, NUM
 from pyadlml.dataset.stats.devices import state_cross_correlation as stat_scc, \
     inter_event_intervals as stat_iei, event_cross_correlogram as stat_event_cc, events_one_day, \
-    event_count as stats_event_count, event_cross_correlogram2
+    event_count as stats_event_count, event_cross_correlogram_slice
 
 from .util import heatmap_square, func_formatter_seconds2time, \
     heatmap, annotate_heatmap, savefig, _num_bars_2_figsize, save_fig, \
@@ -18,12 +18,14 @@ from .util import heatmap_square, func_formatter_seconds2time, \
     dev_raster_data_gen, xaxis_format_time2, get_qualitative_cmap, plot_grid
 
 from pyadlml.dataset.plot.plotly.util import format_device_labels
-from pyadlml.dataset._core.devices import _is_dev_rep2, device_events_to_states, split_devices_binary, contains_non_binary
+from pyadlml.dataset._core.devices import _is_dev_rep2, device_events_to_states, split_devices_binary, contains_non_binary, \
+    accepts_device_events
 from pyadlml.dataset.stats.util import comp_tds_sums, comp_tds_sums_mean, comp_tds_sums_median
 from pyadlml.dataset.util import select_timespan, infer_dtypes, str_to_timestamp, device_order_by
 from pyadlml.util import get_sequential_color, get_secondary_color, get_primary_color, get_diverging_color
 
 
+@accepts_device_events
 @save_fig
 def inter_event_intervals(df_devices=None, inter_event_intervals=None, scale='log',
                           nr_merged_events_at=[], n_bins=50, figsize=(10, 6),
@@ -91,9 +93,9 @@ def inter_event_intervals(df_devices=None, inter_event_intervals=None, scale='lo
 
     if nr_merged_events_at:
         from pyadlml.dataset.stats.devices import resampling_imputation_loss
-        imp_frac_y = np.zeros(len(nr_merged_events_at))
-        for i, dt in enumerate(nr_merged_events_at):
-            imp_frac_y[i] = resampling_imputation_loss(df_devices, dt, return_fraction=True)
+        df_loss = resampling_imputation_loss(df_devices, list(nr_merged_events_at))
+        imp_frac_y = df_loss.groupby('dt', sort=False)['lost_events'].sum()\
+                            .loc[list(nr_merged_events_at)].values/len(df_devices)
 
         # compute corresponding time in seconds
         imp_frac_x = [pd.Timedelta(dt).seconds for i, dt in enumerate(nr_merged_events_at)]
@@ -136,6 +138,7 @@ def inter_event_intervals(df_devices=None, inter_event_intervals=None, scale='lo
     return fig
 
 
+@accepts_device_events
 @save_fig
 def state_boxplot(df_devs, binary_state='on', categories=False, order='mean',
                   scale='log', figsize=None, file_path=None):
@@ -214,6 +217,7 @@ def state_boxplot(df_devs, binary_state='on', categories=False, order='mean',
     return fig
 
 
+@accepts_device_events
 @save_fig
 def event_density_one_day(df_devices=None, df_tod=None, dt='1h',
                           figsize=None, cmap=None, file_path=None):
@@ -295,6 +299,7 @@ def event_density_one_day(df_devices=None, df_tod=None, dt='1h',
     return fig
 
 
+@accepts_device_events
 @save_fig
 def event_correlogram(df_devs=None, lst_devs=None, df_tcorr=None, t_window='5s', figsize=None,
                              z_scale="linear", cmap=None, numbers=None, file_path=None):
@@ -356,7 +361,7 @@ def event_correlogram(df_devs=None, lst_devs=None, df_tcorr=None, t_window='5s',
 
 
     if df_tcorr is None:
-        df = event_cross_correlogram(df_devs, lst_devs=lst_devs, t_window=t_window)
+        df = event_cross_correlogram_slice(df_devs, lst_devs=lst_devs, t_window=t_window)
     else:
         df = df_tcorr
 
@@ -385,6 +390,7 @@ def event_correlogram(df_devs=None, lst_devs=None, df_tcorr=None, t_window='5s',
     return fig
 
 
+@accepts_device_events
 @save_fig
 def state_similarity(df_devs=None, df_state_sim=None, figsize=None, order='alphabetical',
                      numbers=None, file_path=None):
@@ -466,6 +472,7 @@ def state_similarity(df_devs=None, df_state_sim=None, figsize=None, order='alpha
 
     return fig
 
+@accepts_device_events
 @save_fig
 def state_fractions(df_devs=None, df_states=None, figsize=None,
                     color=None, color_sec=None, order='frac_on', file_path=None):
@@ -600,6 +607,7 @@ def state_fractions(df_devs=None, df_states=None, figsize=None,
     return fig
 
 
+@accepts_device_events
 @save_fig
 def event_count(df_devs=None, df_tc=None, figsize=None,
                 scale='linear', color=None, order='count', file_path=None):
@@ -674,6 +682,7 @@ def event_count(df_devs=None, df_tc=None, figsize=None,
     return fig
 
 
+@accepts_device_events
 @save_fig
 def event_raster(df_devices, figsize=(10, 6), start_time=None, end_time=None,
                  order='alphabetical', file_path=None):
@@ -758,6 +767,7 @@ def plot_time_spans_slicer(X, window_size, stride, unit='m', file_path=None):
     return fig
 
 
+@accepts_device_events
 @save_fig
 def event_cross_correlogram(df_devices=None, corr_data=(None, None, None), bin_size='1s', max_lag='2m', axis='off',
                             figsize=(5, 5), file_path=None, use_dask=False):
@@ -770,8 +780,8 @@ def event_cross_correlogram(df_devices=None, corr_data=(None, None, None), bin_s
     title = 'Event cross-correlogram'
 
     if corr_data[0] is None or corr_data[1] is None:
-        ccg, bins = event_cross_correlogram2(df_devices, binsize=bin_size, maxlag=max_lag)
-        devices = df_devices[DEVICE].unique()
+        ccg, bins, devices, _ = stat_event_cc(df_devices, binsize=bin_size, maxlag=max_lag,
+                                              n_jobs=-1 if use_dask else 1)
     else:
         ccg = corr_data[0]
         bins = corr_data[1]
@@ -782,6 +792,7 @@ def event_cross_correlogram(df_devices=None, corr_data=(None, None, None), bin_s
     return fig
 
 
+@accepts_device_events
 @save_fig
 def states(df_devices, start_time=None,end_time=None, figsize=(20, 8),
            order='alphabetical', grid=False, file_path=""):
@@ -3,7 +3,6 @@ from collections import OrderedDict
 import plotly.express as px
 from pyadlml.dataset.stats.activities import _get_freq_func
 
-from pyadlml.dataset.stats.devices import event_cross_correlogram3
 from .util import dyn_event_marker_size, legend_current_items, _style_colorbar, dyn_y_label_size, remove_whitespace_around_fig
 import plotly
 import pandas as pd
@@ -23,11 +22,12 @@ from pyadlml.constants import DEVICE, TIME, ACTIVITY, START_TIME, END_TIME, VALU
     CAT, STRFTIME_DATE
 import plotly.express as px
 
-from pyadlml.dataset._core.devices import device_events_to_states
+from pyadlml.dataset._core.devices import device_events_to_states, accepts_device_events
 from pyadlml.dataset._core.activities import ActivityDict, create_empty_activity_df
 from pyadlml.dataset.plot.plotly.util import format_device_labels
 from pyadlml.dataset.plot.plotly.activities import _set_compact_title
-from pyadlml.dataset.stats.acts_and_devs import contingency_table_states, contingency_table_events
+from pyadlml.dataset.stats.acts_and_devs import contingency_table_states, contingency_table_events, \
+    cross_correlogram
 from pyadlml.dataset.util import select_timespan, df_difference, activity_order_by, device_order_by, infer_dtypes
 
 
@@ -518,6 +518,7 @@ def _plot_selected_device_marker(fig, df, df_devs, states=False, label='Sel devi
 
 
 
+@accepts_device_events
 def activities_and_devices(df_devs, df_acts, states=False, st=None, et=None,
                            act_order='alphabetical', dev_order='alphabetical', dev2area=None,
                            df_acts_usel=None, df_devs_usel=None, devs_usel_state=None,
@@ -819,6 +820,7 @@ def _plot_activities_into_fig(fig, df_acts: pd.DataFrame, df_acts_usel: pd.DataF
 
 
 
+@accepts_device_events
 def contingency_events(df_devs=None, df_acts=None, con_tab=None, scale='linear', height=350,
                        act_order='alphabetical', dev_order='alphabetical', n_jobs=1,
                        ) -> plotly.graph_objects.Figure:
@@ -864,6 +866,7 @@ def contingency_events(df_devs=None, df_acts=None, con_tab=None, scale='linear',
     return fig
 
 
+@accepts_device_events
 def contingency_states(df_devs=None, df_acts=None, con_tab=None, scale='linear', height=350,
                        act_order='alphabetical', dev_order='alphabetical', n_jobs=1
                        ) -> plotly.graph_objects.Figure:
@@ -936,6 +939,7 @@ def contingency_states(df_devs=None, df_acts=None, con_tab=None, scale='linear',
     return fig
 
 
+@accepts_device_events
 def event_correlogram(df_devs: pd.DataFrame, df_acts: pd.DataFrame, fix=[], to=[], maxlag='2min', binsize='2s', use_dask=False):
 
     from pyadlml.dataset.plot.plotly.devices import plotly_event_correlogram
@@ -954,42 +958,23 @@ def event_correlogram(df_devs: pd.DataFrame, df_acts: pd.DataFrame, fix=[], to=[
         assert np.array([e in devices for e in to]).all()
         devices = to
 
-    df_acts[VALUE] = 1
-    df_acts = df_acts.rename(columns={ACTIVITY: DEVICE})
+    ccg, bins = cross_correlogram(df_devs, df_acts, maxlag=maxlag, binsize=binsize,
+                                  n_jobs=-1 if use_dask else 1)
 
-    df_act_st = df_acts[[START_TIME, DEVICE, VALUE]].copy()
-    df_act_st = df_act_st.rename(columns={START_TIME:TIME})
-    df_act_et = df_acts[[END_TIME, DEVICE, VALUE]].copy()
-    df_act_et = df_act_et.rename(columns={END_TIME:TIME})
-
-    df_comb_st = pd.concat([df_devs, df_act_st], axis=0)\
-                    .sort_values(by=TIME)\
-                    .reset_index(drop=True)
-    df_comb_et = pd.concat([df_devs, df_act_et], axis=0)\
-                    .sort_values(by=TIME)\
-                    .reset_index(drop=True)
-
-    cc_st, bins, rows, cols = event_cross_correlogram3(
-        df_comb_st, fix=activities, to=devices, maxlag=maxlag, binsize=binsize,
-        use_dask=use_dask
-    )
-    cc_et, bins, rows, cols = event_cross_correlogram3(
-        df_comb_et, fix=activities, to=devices, maxlag=maxlag, binsize=binsize,
-        use_dask=use_dask
-    )
-    mid_point = int(np.floor(len(bins)/2))
-    for i in range(len(devices)):
-        for j in range(len(activities)):
-            # Overwrite right half of st not including the odd zero bin
-            cc_st[i,j, mid_point+1:] = cc_et[i,j,mid_point+1:]
-            cc_st[i,j, mid_point] += cc_et[i,j, mid_point]
+    # Select the requested devices and activities from the (devices, activities) grid
+    all_devs = df_devs[DEVICE].unique().tolist()
+    all_acts = df_acts[ACTIVITY].unique().tolist()
+    dev_idx = [all_devs.index(d) for d in devices]
+    act_idx = [all_acts.index(a) for a in activities]
+    ccg = ccg[np.ix_(dev_idx, act_idx)]
 
     return plotly_event_correlogram(
-        cc_data=[cc_st, bins, rows, cols]
+        cc_data=[ccg, bins, devices, activities]
     )
 
 
 
+@accepts_device_events
 @remove_whitespace_around_fig
 def activity_vs_device_events_hist(df_devs, df_acts, device, activity, n_bins=20, normalize=False, height=600):
     fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.9, 0.1],
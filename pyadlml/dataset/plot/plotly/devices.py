@@ -12,12 +12,14 @@ import numpy as np
 from pyadlml.constants import DEVICE, TIME, VALUE, STRFTIME_HOUR, STRFTIME_DATE, PRIMARY_COLOR, SECONDARY_COLOR
 from pyadlml.dataset.plot.plotly.activities import _set_compact_title, _scale_xaxis
 from pyadlml.dataset.plot.plotly.util import CatColMap
-from pyadlml.dataset.stats.devices import event_count, event_cross_correlogram, event_cross_correlogram3, events_one_day, \
+from pyadlml.dataset.stats.devices import event_count, event_cross_correlogram, events_one_day, \
                                           inter_event_intervals
 from pyadlml.dataset.util import check_scale, activity_order_by, device_order_by, infer_dtypes
+from pyadlml.dataset._core.devices import accepts_device_events
 from pyadlml.dataset.stats.devices import state_times
 from plotly.graph_objects import Figure
 
+@accepts_device_events
 @check_scale
 def bar_count(df_dev, scale='linear', height=350, order='count') -> Figure:
     """ Plots the activities durations against each other
@@ -48,6 +50,7 @@ def bar_count(df_dev, scale='linear', height=350, order='count') -> Figure:
 
     return fig
 
+@accepts_device_events
 @check_scale
 def device_iei(df_devs, scale='linear', height=350, n_bins=20, per_device=False, order='alphabetical') -> Figure:
     """
@@ -95,6 +98,7 @@ def device_iei(df_devs, scale='linear', height=350, n_bins=20, per_device=False,
     return fig
 
 
+@accepts_device_events
 def fraction(df_dev, height=350, order='alphabetical', show_y_labels=True) -> Figure:
     """
         plots the fraction a device is on vs off over the whole time
@@ -170,6 +174,7 @@ def fraction(df_dev, height=350, order='alphabetical', show_y_labels=True) -> Fi
     return fig
 
 
+@accepts_device_events
 def event_density(df_dev, dt='1h', height=350, scale='linear', show_colorbar=True, order='alphabetical'):
     """
     Computes the heatmap for one day where all the device triggers are showed
@@ -218,6 +223,7 @@ def event_density(df_dev, dt='1h', height=350, scale='linear', show_colorbar=Tru
 
 
 
+@accepts_device_events
 def boxplot_state(df_devs, scale='linear', height=350, binary_state='on',
                   order='alphabetical') -> Figure:
     """ Plot a boxplot of activity durations (mean) max min
@@ -262,13 +268,14 @@ def boxplot_state(df_devs, scale='linear', height=350, binary_state='on',
 
 
 
+@accepts_device_events
 def plotly_device_event_correlogram(df_devs, corr_data=(None, None, None), height=600):
 
-    from pyadlml.dataset.stats.devices import event_cross_correlogram2
-    if corr_data:
+    if corr_data and corr_data[0] is not None:
         cc, bins, devs = corr_data
     else:
-        cc, bins, devs = event_cross_correlogram2(df_devs, v1=False, use_dask=True)
+        cc, bins, devs, _ = event_cross_correlogram(df_devs, n_jobs=-1)
+        devs = np.array(devs)
 
     fig = make_subplots(rows=len(devs), cols=len(devs), horizontal_spacing=0.005,
                         vertical_spacing=0.005, column_titles=devs.tolist(), row_titles=devs.tolist(),
@@ -310,6 +317,7 @@ def plotly_device_event_correlogram(df_devs, corr_data=(None, None, None), heigh
     return fig
 
 
+@accepts_device_events
 def plotly_event_correlogram(df_devs=None, cc_data=None, fix=[], to=[], max_lag='2min', binsize='1s', use_dask=False, height=600):
 
         
@@ -318,9 +326,9 @@ def plotly_event_correlogram(df_devs=None, cc_data=None, fix=[], to=[], max_lag=
         to = [to] if isinstance(to, str) else to
             
         if cc_data is None:
-            cc, bins, rows, cols = event_cross_correlogram3(
+            cc, bins, rows, cols = event_cross_correlogram(
                 df_devs, fix=fix, to=to, maxlag=max_lag, binsize=binsize,
-                use_dask=use_dask
+                n_jobs=-1 if use_dask else 1
             )
         else:
             cc, bins, rows, cols = cc_data[0], cc_data[1], cc_data[2], cc_data[3]
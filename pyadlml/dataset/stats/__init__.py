@@ -1,7 +1,8 @@
 from pyadlml.dataset.stats.acts_and_devs import (
     contingency_table_events as contingency_events,
     contingency_table_states as contingency_states,
-    cross_correlogram as cross_correlogram
+    cross_correlogram as cross_correlogram,
+    time_dependent_firing_rates as time_dependent_firing_rates
 )
 
 from pyadlml.dataset.stats.activities import (
@@ -2,8 +2,11 @@ import pandas as pd
 import numpy as np
 from pyadlml.constants import START_TIME, END_TIME, ACTIVITY, TIME
 from pyadlml.dataset._core.activities import add_other_activity, ActivityDict
+from pyadlml.dataset._core.devices import accepts_device_events
 from pyadlml.dataset.stats.util import df_density_binned
-from datetime import timezone, datetime
+
+NS_PER_SEC = pd.Timedelta('1s').value
+NS_PER_DAY = pd.Timedelta('1D').value
 
 
 def activity_order_by_duration(df_acts: pd.DataFrame) -> list:
@@ -74,6 +77,7 @@ def _get_freq_func(freq):
     else:
         return lambda x: x.total_seconds()/3600
 
+@accepts_device_events
 def coverage(df_activities, df_devices, datapoints=False):
     """ Computes the activity coverage for the devices.
 
@@ -307,7 +311,7 @@ def activities_transitions(df_acts):
     return df
 
 
-def activities_dist(df_acts, n=1000, dt=None, relative=False):
+def activities_dist(df_acts, n=1000, dt=None, relative=False, exact=False, rng=None):
     """
     Approximate the activity densities for one day by
     using monte-carlo sampling from the activity intervals.
@@ -320,7 +324,17 @@ def activities_dist(df_acts, n=1000, dt=None, relative=False):
     n : int, optional
         The number of samples to draw from each activity. Defaults to 1000.
     dt : str of { 'xm', }, default=None
-        if set
+        If set, the samples are counted in bins of the given size over one day.
+    relative : bool, default=False
+        If set, the sampled times are returned as seconds since midnight instead
+        of strings.
+    exact : bool, default=False
+        If set, no samples are drawn. Instead the exact probability mass of the
+        sampling distribution is computed for each bin of size *dt* from the
+        coverage of the activity intervals. The counts obtained by sampling
+        divided by *n* approximate this density.
+    rng : int or np.random.Generator, default=None
+        The seed or generator used for drawing samples.
 
     Examples
     --------
@@ -337,78 +351,140 @@ def activities_dist(df_acts, n=1000, dt=None, relative=False):
     df : pd.Dataframe
         Each row represents density point.
     """
-
-    # todo
-    #        principle: ancestral sampling
-    #        select an interval at random
-    #        sample uniform value of the interval
-    #        sample from gaussian dist centered at interval instead
-    #        of uniform dist
-    #        solves the problem that beyond interval limits there can't be
-    #        any sample
-    # Todo include range for day or week
-
-    df = df_acts.copy()
     activities = df_acts[ACTIVITY].unique()
 
-    #res = pd.DataFrame(index=range(n), columns=activities, data=0)
-    res = pd.DataFrame(index=range(len(activities)*n), columns=[TIME, ACTIVITY], dtype=object)
+    if exact:
+        if dt is None:
+            raise ValueError('The exact density requires a bin size dt.')
+        return _coverage_density(df_acts, activities, dt)
 
-    # sample for each column separately
-    for i, activity in enumerate(activities):
-        series = _sample_ts(df.loc[df[ACTIVITY] == activity, [START_TIME, END_TIME]], n)
-        res.loc[n*i:n*i+n-1, TIME] = series.values
-        res.loc[n*i:n*i+n-1, ACTIVITY] = activity
+    rng = np.random.default_rng(rng)
+    tod = _sample_times_of_day(df_acts, activities, n, rng)
 
-    if relative and dt is None:
-        res[TIME] = pd.to_datetime('1/1/2000 - ' + res[TIME])
-        res[TIME] = res[TIME] - np.datetime64("2000-01-01 00:00:00")
-        res[TIME] = res[TIME] / np.timedelta64(1, 's')
+    # Samples are reported with a resolution of one second
+    tod = tod.ravel() - tod.ravel() % NS_PER_SEC
+    res = pd.DataFrame({TIME: tod, ACTIVITY: np.repeat(activities, n)})
 
     if dt is not None:
-        res[TIME] = pd.to_datetime('1/1/2000 - ' + res[TIME])
-        res = df_density_binned(res, column_str=ACTIVITY, dt=dt)
+        res[TIME] = pd.Timestamp('2000-01-01') + pd.to_timedelta(res[TIME], unit='ns')
+        return df_density_binned(res, column_str=ACTIVITY, dt=dt)
 
+    if relative:
+        res[TIME] = tod/NS_PER_SEC
+    else:
+        res[TIME] = _format_time_of_day(tod)
     return res
-    
 
 
+def _wall_time_ns(times):
+    """ Returns the local wall clock times in nanoseconds. The values of timezone
+    aware columns are in UTC and would shift the time of day.
+    """
+    times = pd.to_datetime(times)
+    if times.dt.tz is not None:
+        times = times.dt.tz_localize(None)
+    return times.values.astype('datetime64[ns]').astype(np.int64)
+
+
+def _activity_intervals(df_acts, activities):
+    """ Returns the intervals in nanoseconds grouped by activity and the number of
+    intervals per activity.
+    """
+    codes = pd.Categorical(df_acts[ACTIVITY], categories=activities).codes
+    mask = codes >= 0
+    codes = codes[mask]
+    order = np.argsort(codes, kind='stable')
+    st = _wall_time_ns(df_acts[START_TIME])[mask][order]
+    et = _wall_time_ns(df_acts[END_TIME])[mask][order]
+    counts = np.bincount(codes, minlength=len(activities))
+    return st, et, codes[order], counts
+
 
-def _sample_ts(df, n):
-    """ Samples one column of activities. First chooses one activity at random and then samples a timepoint from
-        within that activities interval
+def _sample_times_of_day(df_acts, activities, n, rng):
+    """ Samples n time points for each activity. First an interval of the activity is
+    chosen uniformly at random and then a time point uniformly from within that interval.
 
     Parameters
     ----------
-    df: pd.DataFrame
-            dataframe with two time intervals
-            | start_time    | end_time  | .... |
-            ------------------------------------
-            | ts            | ts        | ...
+    df_acts : pd.DataFrame
+        An activity dataframe
+    activities : array like
+        The activities to sample from. Each activity must have at least one interval.
+    n : int
+        The number of samples per activity
+    rng : np.random.Generator
 
     Returns
     -------
-    pd.Series
-        The sampled timestamps
+    np.ndarray of dtype int64 and shape (#activities, n)
+        The sampled times as nanoseconds since midnight
     """
-    assert START_TIME in df.columns and END_TIME in df.columns
-
-    xs = np.empty(shape=(n,), dtype=object)
-    for i in range(n):
-        interval = df.iloc[np.random.randint(0, df.shape[0])]
-
-        # convert to unix timestamp
-        unx_min = interval.start_time.replace(tzinfo=timezone.utc).timestamp()
-        unx_max = interval.end_time.replace(tzinfo=timezone.utc).timestamp()
-
-        # sample uniform and convert back to timestamp
-        try:
-            unx_sample = np.random.uniform(low=unx_min, high=unx_max)
-        except ValueError:
-            if unx_min == unx_max:
-                unx_sample = unx_min
-            else:
-                raise ValueError('Sampling interval went wrong')
-        xs[i] = datetime.utcfromtimestamp(unx_sample).strftime('%H:%M:%S')
-
-    return pd.Series(xs)
+    st, et, _, counts = _activity_intervals(df_acts, activities)
+    offsets = np.cumsum(counts) - counts
+
+    idx = offsets[:, None] + (rng.random((len(activities), n))*counts[:, None]).astype(np.int64)
+    samples = st[idx] + (rng.random(idx.shape)*(et - st)[idx]).astype(np.int64)
+    return samples % NS_PER_DAY
+
+
+def _format_time_of_day(tod):
+    """ Formats nanoseconds since midnight as 'HH:MM:SS' strings.
+    """
+    secs = tod//NS_PER_SEC
+    parts = [np.char.zfill(x.astype(str), 2) for x in (secs//3600, secs//60 % 60, secs % 60)]
+    return np.char.add(np.char.add(np.char.add(parts[0], ':'), np.char.add(parts[1], ':')), parts[2])\
+             .astype(object)
+
+
+def _coverage_density(df_acts, activities, dt):
+    """ Computes the probability mass the sampler of :func:`activities_dist` assigns to
+    each bin of one day.
+
+    An interval is chosen with probability 1/#intervals and its duration is spread
+    uniformly over the bins it covers, wrapping around at midnight. The time an interval
+    [s, e) covers in bin b is (e//day - s//day)*w_b + F(e % day)_b - F(s % day)_b, where
+    F(x) covers the bins before x fully and the bin containing x partially. The
+    indicators of the fully covered bins are accumulated as a difference array, such
+    that the cost is linear in the number of intervals plus the number of bins.
+
+    Returns
+    -------
+    pd.DataFrame
+        The bins in the first column and one column per activity, ordered as
+        :func:`pyadlml.dataset.stats.util.df_density_binned`.
+    """
+    bins = pd.date_range(start='1/1/2000', end='1/2/2000', freq=dt)
+    edges = (bins - bins[0]).values.astype(np.int64)
+    widths = np.diff(edges).astype(np.float64)
+    n_bins = len(widths)
+    st, et, codes, counts = _activity_intervals(df_acts, activities)
+
+    def bin_of(t):
+        return np.searchsorted(edges, t % NS_PER_DAY, side='right') - 1
+
+    dur = (et - st).astype(np.float64)
+    is_point = (dur == 0)
+    weight = 1/(counts[codes]*np.where(is_point, 1, dur))
+
+    # Each interval adds +1 at the bin of its start and -1 at the bin of its end
+    mask = ~is_point
+    s, e, c, w = st[mask], et[mask], codes[mask], weight[mask]
+    k_s, k_e = bin_of(s), bin_of(e)
+    full = np.zeros((len(activities), n_bins + 1))
+    np.add.at(full, (c, k_s), w)
+    np.add.at(full, (c, k_e), -w)
+    partial = np.zeros((len(activities), n_bins + 1))
+    np.add.at(partial, (c, k_e), w*(e % NS_PER_DAY - edges[k_e]))
+    np.add.at(partial, (c, k_s), -w*(s % NS_PER_DAY - edges[k_s]))
+    days = np.bincount(c, weights=w*(e//NS_PER_DAY - s//NS_PER_DAY), minlength=len(activities))
+
+    # Intervals without duration put their whole mass into one bin
+    np.add.at(partial, (codes[is_point], bin_of(st[is_point])), weight[is_point])
+
+    density = days[:, None]*widths + np.cumsum(full, axis=1)[:, :n_bins]*widths \
+              + partial[:, :n_bins]
+
+    res = pd.DataFrame(density.T, columns=activities)
+    res = res[sorted(activities)]
+    res.insert(0, TIME, bins[:-1].time)
+    return res
@@ -1,89 +1,74 @@
 import pandas as pd
 import numpy as np
 from pyadlml.dataset._core.acts_and_devs import label_data
-from pyadlml.dataset._core.devices import create_device_info_dict
+from pyadlml.dataset._core.devices import create_device_info_dict, accepts_device_events, DeviceEvents
 from pyadlml.dataset.stats.activities import _get_freq_func
 from pyadlml.util import get_npartitions, get_parallel
-from pyadlml.constants import START_TIME, END_TIME, TIME, DEVICE, VALUE, ACTIVITY, CAT, NUM, BOOL
+from pyadlml.constants import START_TIME, END_TIME, TIME, DEVICE, VALUE, ACTIVITY, CAT, NUM, BOOL, OTHER
 from pyadlml.dataset.util import infer_dtypes, categorical_2_binary
 import dask.dataframe as dd
 from pyadlml.dataset._representations.raw import create_raw
 #import __logger__
 
 
-def cross_correlogram(df_devices, df_activities, maxlag, binsize, other=False):
+def cross_correlogram(df_devices, df_activities, maxlag='2m', binsize='1s', other=False, n_jobs=1):
     """
     Computes the cross-correlogram between activity beginning and ending and device events.
 
     Parameters
     ----------
-    df_devices : pd.DataFrame
+    df_devices : pd.DataFrame or DeviceEvents
         All recorded devices from a dataset. For more information refer to
         :ref:`user guide<device_dataframe>`.
     df_activities : pd.DataFrame
         All recorded activities from a dataset. Fore more information refer to the
         :ref:`user guide<activity_dataframe>`.
+    maxlag : str, default='2m'
+        The size of the window for which events should be considered.
+    binsize : str, default='1s'
+        The size of one bin in the correlogram
     other : bool, default=False
         Determines whether gaps between activities should be assigned
         the activity *other* or be ignored.
+    n_jobs : int, default=1
+        The number of processes the device activity pairs are distributed to.
 
     Returns
     -------
-    pd.DataFrame
-
+    ccg : np.ndarray of shape (#devices, #activities, #bins)
+        The negative lags count the device events before an activity starts and the
+        positive lags the device events after an activity ends.
+    bins : np.ndarray of shape (#bins,)
+        Bin times in seconds relative to the center
     """
-    ET = 'event_times'
-    df_dev = df_devices.copy()
-    df_act = df_activities.copy()
-
-    devices = df_devices[DEVICE].unique()
-    activities = df_activities[ACTIVITY].unique()
-
-    maxlag = pd.Timedelta(maxlag).seconds
-    binsize = pd.Timedelta(binsize).seconds
-
-    n_bins = int((maxlag / binsize) * 2) + 1    # add +1 for symmetric histogram
-    n_dev = len(devices)
-    n_act = len(activities)
-
-    ccg = np.zeros((n_dev, n_act, n_bins))
-    bins = np.linspace(-maxlag, maxlag, n_bins)
-
-
-    df_act_st = df_act.loc[:, [START_TIME, ACTIVITY]]
-    df_act_et = df_act.loc[:, [END_TIME, ACTIVITY]]
-
-    # get times in milliseconds relative to the first event
-    start_time = min(df_act_st[START_TIME].iloc[0], df_dev[TIME].iloc[0])
+    from pyadlml.dataset.stats.devices import _correlogram_params, _correlogram_pairs, _device_times
+    from pyadlml.dataset._core.activities import add_other_activity
 
-    df_dev[ET] = (df_dev[TIME] - start_time).dt.seconds
-    df_act_st[ET] = (df_act_st[START_TIME] - start_time).dt.seconds
-    df_act_et[ET] = (df_act_et[END_TIME] - start_time).dt.seconds
+    if other:
+        df_activities = add_other_activity(df_activities)
 
-    def calc_hist(df_dev, df_act, device, activity):
-        # select reference and target device
-        t_ref = df_dev[df_dev[DEVICE] == device][ET].values
-        t_tar = df_act[df_act[ACTIVITY] == activity][ET].values
-
-        tar_matrix = np.tile(t_tar, (len(t_ref), 1))
-        shift = np.repeat(t_ref.reshape(-1, 1), len(t_tar), axis=1)
-        shifted_target = tar_matrix - shift
-
-        tmp = np.apply_along_axis(np.histogram, axis=1, arr=shifted_target,
-                                  bins=n_bins, range=(-maxlag, maxlag), density=False)
-        hist_sum = tmp[:, 0].sum()
+    t_devs = _device_times(df_devices)
+    devices = list(t_devs.keys())
+    activities = df_activities[ACTIVITY].unique()
 
-        return hist_sum
+    maxlag, n_bins, bins = _correlogram_params(binsize, maxlag)
 
+    df_act = df_activities.sort_values(by=START_TIME, kind='stable')
+    t_st = {act: grp[START_TIME].values.astype(np.int64) for act, grp in df_act.groupby(ACTIVITY, sort=False)}
+    t_et = {act: np.sort(grp[END_TIME].values.astype(np.int64)) for act, grp in df_act.groupby(ACTIVITY, sort=False)}
 
-    for i, j in zip(range(n_dev), range(n_act)):
-        result_right = calc_hist(df_dev, df_act_st, devices[i], activities[j])
-        result_left = calc_hist(df_dev, df_act_et, devices[i], activities[j])
+    # Fix activity boundaries and count the device events around them
+    pairs = [(act, dev) for dev in devices for act in activities]
+    cc_st = np.stack(_correlogram_pairs(t_st, t_devs, pairs, maxlag, n_bins, n_jobs))
+    cc_et = np.stack(_correlogram_pairs(t_et, t_devs, pairs, maxlag, n_bins, n_jobs))
 
-        split = int(np.floor(n_bins/2))
-        ccg[i, j, :] = np.concatenate([result_right[:split], [0], result_left[split+1:]])
+    # Events before the activity start and after the activity end
+    mid_point = int(np.floor(n_bins/2))
+    ccg = cc_st.copy()
+    ccg[:, mid_point+1:] = cc_et[:, mid_point+1:]
+    ccg[:, mid_point] += cc_et[:, mid_point]
 
-    return ccg, bins
+    return ccg.reshape(len(devices), len(activities), n_bins), bins
 
 
 def contingency_table_events(df_devices, df_activities, per_state=False, other=False, n_jobs=1):
@@ -92,7 +77,7 @@ def contingency_table_events(df_devices, df_activities, per_state=False, other=F
 
     Parameters
     ----------
-    df_devices : pd.DataFrame
+    df_devices : pd.DataFrame or DeviceEvents
         All recorded devices from a dataset. For more information refer to
         :ref:`user guide<device_dataframe>`.
     df_activities : pd.DataFrame
@@ -126,7 +111,10 @@ def contingency_table_events(df_devices, df_activities, per_state=False, other=F
     OFF = 'off'
 
     # Save original devices and activities
-    devs = df_devices[DEVICE].unique()
+    if isinstance(df_devices, DeviceEvents):
+        devs = df_devices.devices.values
+    else:
+        devs = df_devices[DEVICE].unique()
     acts = df_activities[ACTIVITY].unique()
 
     df = label_data(df_devices, df_activities, other=other, n_jobs=n_jobs)
@@ -348,6 +336,54 @@ def contingency_table_states_old(df_devs, df_acts, other=False, distributed=Fals
 
 
 
+def _activity_coverage(times, st, et):
+    """ Sweeps over the activity boundaries and computes for each time the total
+        duration that is covered by activities up to that time.
+
+    Parameters
+    ----------
+    times : np.ndarray of dtype int64
+        The query times in nanoseconds.
+    st, et : np.ndarray of dtype int64
+        The start and end times of the activities in nanoseconds.
+
+    Returns
+    -------
+    np.ndarray of dtype int64
+    """
+    bounds = np.unique(np.concatenate([st, et]))
+
+    # Number of activities that are active between two successive boundaries
+    n_active = np.searchsorted(np.sort(st), bounds, side='right') \
+             - np.searchsorted(np.sort(et), bounds, side='right')
+    cum_cov = np.concatenate([[0], np.cumsum(n_active[:-1]*np.diff(bounds))])
+
+    res = np.zeros(len(times), dtype=np.int64)
+    j = np.searchsorted(bounds, times, side='right') - 1
+    mask = j >= 0
+    j = j[mask]
+    res[mask] = cum_cov[j] + n_active[j]*(times[mask] - bounds[j])
+    return res
+
+
+def _contingency_states_shard(state_st, state_et, state_codes, n_states, act_st, act_et, act_codes, n_acts):
+    """ Accumulates the overlap durations of device states and activities into a
+        (#states, #activities) matrix of nanoseconds.
+    """
+    res = np.zeros((n_states, n_acts), dtype=np.int64)
+    order = np.argsort(state_codes, kind='stable')
+    codes, grp_start = np.unique(state_codes[order], return_index=True)
+    for a in range(n_acts):
+        mask = (act_codes == a)
+        if not mask.any():
+            continue
+        cov_st = _activity_coverage(state_st, act_st[mask], act_et[mask])
+        cov_et = _activity_coverage(state_et, act_st[mask], act_et[mask])
+        overlap = (cov_et - cov_st)[order]
+        res[codes, a] = np.add.reduceat(overlap, grp_start)
+    return res
+
+
 def contingency_table_states(df_devs, df_acts, other=False, n_jobs=1):
     """
     Compute the time a device is "on" or "off" respectively
@@ -355,7 +391,7 @@ def contingency_table_states(df_devs, df_acts, other=False, n_jobs=1):
 
     Parameters
     ----------
-    df_devs : pd.DataFrame
+    df_devs : pd.DataFrame or DeviceEvents
         All recorded devices from a dataset. For more information refer to
         :ref:`user guide<device_dataframe>`.
     df_acts : pd.DataFrame
@@ -364,6 +400,9 @@ def contingency_table_states(df_devs, df_acts, other=False, n_jobs=1):
     other : bool
         Determines whether gaps between activities should be assigned
         the activity *other* or be ignored.
+    n_jobs : int, default=1
+        The number of parallel jobs. The device states are split into
+        consecutive time ranges that are processed independently.
 
     Examples
     --------
@@ -380,21 +419,24 @@ def contingency_table_states(df_devs, df_acts, other=False, n_jobs=1):
     -------
     df : pd.DataFrame
     """
-    TD = 'td'
     ON_praefix = 'on'
     OFF_praefix = 'off'
     SEP = ':'
 
-    df_devs = df_devs.copy().reset_index(drop=True).sort_values(by=TIME)
+    if not isinstance(df_devs, DeviceEvents):
+        df_devs = df_devs.copy().reset_index(drop=True).sort_values(by=TIME)
     df_acts = df_acts.copy().reset_index(drop=True).sort_values(by=START_TIME)
-    df_acts[TD] = df_acts[END_TIME] - df_acts[START_TIME]
 
     dtypes = infer_dtypes(df_devs)
     start_time = df_acts.iat[0, 0] - pd.Timedelta('1s')
     end_time = df_acts.iat[-1, 1] + pd.Timedelta('1s')
+
     from pyadlml.dataset._core.devices import device_events_to_states
     df_devs = device_events_to_states(df_devs, extrapolate_states=True,
                                       start_time=start_time, end_time=end_time)
+
+    # Numerical devices have no states that last over time
+    df_devs = df_devs[~df_devs[DEVICE].isin(dtypes[NUM])]
     bool_mask_true = (df_devs[DEVICE].isin(dtypes[BOOL])) & (df_devs[VALUE] == True)
     bool_mask_false = (df_devs[DEVICE].isin(dtypes[BOOL])) & (df_devs[VALUE] == False)
     mask_cat = (df_devs[DEVICE].isin(dtypes[CAT]))
@@ -402,77 +444,36 @@ def contingency_table_states(df_devs, df_acts, other=False, n_jobs=1):
     df_devs.loc[bool_mask_true, DEVICE] = df_devs.loc[bool_mask_true, DEVICE] + SEP + ON_praefix
     df_devs.loc[bool_mask_false, DEVICE] = df_devs.loc[bool_mask_false, DEVICE] + SEP + OFF_praefix
     df_devs.loc[mask_cat, DEVICE] = df_devs.loc[mask_cat, DEVICE] + SEP + df_devs.loc[mask_cat, VALUE]
-    df = df_devs.drop(columns=VALUE)
-
-    for act in df_acts[ACTIVITY].unique():
-        df[act] = pd.Timedelta('0ns')
-
-    def func(row, df_acts):
-        assert row.end_time - row.start_time > pd.Timedelta('0ns')
-        mask_inside = (row.start_time <= df_acts[START_TIME]) & (df_acts[END_TIME] <= row.end_time)
-        mask_right_ov = (df_acts[START_TIME] < row.end_time) & (row.end_time < df_acts[END_TIME])\
-                      & (row.start_time < df_acts[START_TIME])
-        mask_left_ov = (df_acts[START_TIME] < row.start_time) & (row.start_time < df_acts[END_TIME])\
-                      & (df_acts[END_TIME] < row.end_time)
-        mask_total_ov = (df_acts[START_TIME] <= row.start_time) & (row.end_time <= df_acts[END_TIME])
-
-        overlap_ins = df_acts[mask_inside]
-        overlap_left = df_acts[mask_left_ov]
-        overlap_right = df_acts[mask_right_ov]
-        overlap_total = df_acts[mask_total_ov]
-
-        if not overlap_total.empty:
-            assert overlap_ins.empty and overlap_left.empty and overlap_right.empty
-            assert len(overlap_total) == 1, 'trouble double dup dup.'
-            # One activity overlaps the whole state
-            ol = overlap_total.iloc[0]
-            row[ol[ACTIVITY]] = row.end_time - row.start_time
-            return row
-
-        if overlap_ins.empty and overlap_right.empty and overlap_left.empty:
-            # No matching activity return row
-            return row
-
-        if not overlap_left.empty:
-            assert len(overlap_left) == 1, 'trouble double dup dup.'
-            ol = overlap_left.iloc[0]
-            row[ol[ACTIVITY]] += ol[END_TIME] - row.start_time
-
-        if not overlap_right.empty:
-            assert len(overlap_right) == 1, 'trouble double dup dup.'
-            ol = overlap_right.iloc[0]
-            row[ol[ACTIVITY]] += row.end_time - ol[START_TIME]
-
-        assert len(overlap_right) < 2 and len(overlap_left) < 2, 'Trouble trouble double dup.'
-
-        if not overlap_ins.empty:
-            ins_acts = overlap_ins[ACTIVITY].unique()
-            state_agg = overlap_ins[[TD, ACTIVITY]].groupby(by=[ACTIVITY])[TD].sum()
-            for act in ins_acts:
-                row.at[act] += state_agg[act]
-
-        return row
-
-    if n_jobs > 1:
-        import dask.dataframe as dd
-        ddf = dd.from_pandas(df, npartitions=n_jobs)
 
-        meta = {**{START_TIME: 'datetime64[ns]', END_TIME: 'timedelta64[ns]', DEVICE: 'object'}, 
-                **{name: 'object' for name in df.columns[3:]}}
+    # Encode states and activities as integers and times as nanoseconds
+    state_codes, states = pd.factorize(df_devs[DEVICE], sort=True)
+    act_codes, acts = pd.factorize(df_acts[ACTIVITY])
+    state_st = df_devs[START_TIME].values.astype(np.int64)
+    state_et = np.maximum(df_devs[END_TIME].values.astype(np.int64), state_st)
+    act_st = df_acts[START_TIME].values.astype(np.int64)
+    act_et = df_acts[END_TIME].values.astype(np.int64)
 
-        ddf = ddf.map_partitions(lambda dff: dff.apply(func, args=[df_acts], axis=1), meta=meta)
+    # Shard the device states by time into consecutive ranges
+    order = np.argsort(state_st, kind='stable')
+    shards = [idx for idx in np.array_split(order, max(n_jobs, 1)) if len(idx) > 0]
+    args = [(state_st[idx], state_et[idx], state_codes[idx], len(states),
+             act_st, act_et, act_codes, len(acts)) for idx in shards]
 
-        ddf = ddf.drop(columns=[START_TIME, END_TIME])
-        ddf = ddf.groupby(DEVICE).sum()
+    if n_jobs > 1:
+        from joblib import Parallel, delayed
+        mats = Parallel(n_jobs=n_jobs)(delayed(_contingency_states_shard)(*a) for a in args)
+    else:
+        mats = [_contingency_states_shard(*a) for a in args]
+    mat = np.sum(mats, axis=0)
 
-        # Visualize as graph
-        #ddf.visualize(filename='test.svg')
-        df = ddf.compute()
+    df = pd.DataFrame(mat.astype('timedelta64[ns]'), index=pd.Index(states, name=DEVICE),
+                      columns=acts)
 
-    else:
-        df = df.apply(func, args=[df_acts], axis=1)
-        df = df.drop(columns=[START_TIME, END_TIME])
-        df = df.groupby(DEVICE).sum()
+    if other:
+        # Time of a state that is not covered by any activity
+        durations = pd.Series(state_et - state_st).groupby(state_codes).sum()
+        durations = durations.reindex(np.arange(len(states)), fill_value=0).values
+        df[OTHER] = (durations - mat.sum(axis=1)).clip(min=0).astype('timedelta64[ns]')
 
     # Add row for categories for binary devices that are not present 
     devices_in_index = df.index.values
@@ -488,10 +489,12 @@ def contingency_table_states(df_devs, df_acts, other=False, n_jobs=1):
     return df
 
 
+@accepts_device_events
 def mutual_info_states(df_devs, df_acts):
     raise NotImplementedError
 
 
+@accepts_device_events
 def mutual_info_events(df_devs: pd.DataFrame, df_acts: pd.DataFrame, kind='pointwise', other=True) -> pd.DataFrame:
     """ Compute the mututal information between events and activities. How much does the 
         occurence, pattern of events from a certain device reduce the uncertainty in observing 
@@ -565,6 +568,81 @@ def mutual_info_events(df_devs: pd.DataFrame, df_acts: pd.DataFrame, kind='point
 
 
 
+@accepts_device_events
+def time_dependent_firing_rates(df_devs, df_acts, bin_width='10s', devices=None, activities=None):
+    r"""
+    Computes the peri-stimulus time histograms for every device and activity.
+
+    A trial is when an activity is performed and the time t is measured w.r.t. the start
+    of the activity. For each device the number of events :math:`n_K(t; t+\delta t)`
+    happening in all K trials of an activity is counted and the firing rate is given by
+    :math:`p(t) = \frac{1}{\delta t} \frac{n_K(t; t+\delta t)}{K}`.
+
+    Each event is assigned to the trial it falls into by a binary search over the
+    activity start times and all offsets are counted with a single bincount.
+
+    Parameters
+    ----------
+    df_devs : pd.DataFrame
+        All recorded devices from a dataset. For more information refer to
+        :ref:`user guide<device_dataframe>`.
+    df_acts : pd.DataFrame
+        All recorded activities from a dataset. Activities are assumed to be
+        non-overlapping. Fore more information refer to the
+        :ref:`user guide<activity_dataframe>`.
+    bin_width : str, default='10s'
+        The bin width :math:`\delta t`
+    devices : list, optional
+        The devices to compute the rates for. Defaults to all devices.
+    activities : list, optional
+        The activities to compute the rates for. Defaults to all activities.
+
+    Returns
+    -------
+    rates : np.ndarray of shape (#devices, #activities, #bins)
+        The firing rates in events per second. The bins cover the longest trial.
+    bins : np.ndarray of shape (#bins + 1,)
+        The bin edges in seconds relative to the start of the activity.
+    devices : list
+    activities : list
+    """
+    devices = list(devices) if devices is not None else list(df_devs[DEVICE].unique())
+    activities = list(activities) if activities is not None else list(df_acts[ACTIVITY].unique())
+    bw = pd.Timedelta(bin_width).value
+
+    df_acts = df_acts[df_acts[ACTIVITY].isin(activities)].sort_values(by=START_TIME)
+    df_devs = df_devs[df_devs[DEVICE].isin(devices)]
+    st = df_acts[START_TIME].values.astype('datetime64[ns]').astype(np.int64)
+    et = df_acts[END_TIME].values.astype('datetime64[ns]').astype(np.int64)
+    act_codes = pd.Index(activities).get_indexer(df_acts[ACTIVITY])
+    dev_codes = pd.Index(devices).get_indexer(df_devs[DEVICE])
+    t = df_devs[TIME].values.astype('datetime64[ns]').astype(np.int64)
+
+    n_bins = int(np.ceil((et - st).max()/bw)) if len(st) else 0
+    n_bins = max(n_bins, 1)
+
+    # Assign each event to the trial starting last before it
+    trial = np.searchsorted(st, t, side='right') - 1
+    valid = (trial >= 0)
+    valid[valid] = (t[valid] > st[trial[valid]]) & (t[valid] < et[trial[valid]])
+    trial = trial[valid]
+
+    offset_bin = (t[valid] - st[trial])//bw
+    flat_idx = (dev_codes[valid]*len(activities) + act_codes[trial])*n_bins + offset_bin
+    counts = np.bincount(flat_idx, minlength=len(devices)*len(activities)*n_bins)\
+               .reshape(len(devices), len(activities), n_bins)
+
+    # Normalize by the number of trials and the bin width
+    n_trials = np.bincount(act_codes, minlength=len(activities))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = counts/n_trials[None, :, None]/(bw/1e9)
+    rates[:, n_trials == 0] = 0
+
+    bins = np.arange(n_bins + 1)*(bw/1e9)
+    return rates, bins, devices, activities
+
+
+@accepts_device_events
 def time_dependent_firing_rate(df_devs, df_acts, device, activity, bin_width='10s'):
     """
     A trial is when an activity is performed.
@@ -575,42 +653,22 @@ def time_dependent_firing_rate(df_devs, df_acts, device, activity, bin_width='10
 
     Parameters
     ----------
-
+    df_devs : pd.DataFrame
+        All recorded devices from a dataset.
+    df_acts : pd.DataFrame
+        All recorded activities from a dataset.
+    device : str
+    activity : str
     bin_width : str one of ['xs', ]
         The bin width :math:`delta_t`
 
-
+    Returns
+    -------
+    rates : np.ndarray of shape (#bins,)
+        The firing rate in events per second.
+    bins : np.ndarray of shape (#bins + 1,)
+        The bin edges in seconds relative to the start of the activity.
     """
-
-    df_acts = df_acts[df_acts[ACTIVITY] == activity].sort_values(by=START_TIME)\
-                                                    .reset_index(drop=True)
-    df_devs = df_devs[df_devs[DEVICE] == device].sort_values(by=TIME)\
-                                                .reset_index(drop=True)
-    bin_width = pd.Timedelta(bin_width)
-    
-    n_bins = np.ceil(max((df_acts[END_TIME] - df_acts[START_TIME])/bin_width))
-    max_dt = n_bins*bin_width
-
-    # the number of occurrences of event n_K(t; t+\Delta t)
-    counts = np.zeros(n_bins)
-
-    # Number of trials
-    K = df_acts.shape[0]
-
-    for _, act_ser in df_acts.iterrows():
-
-        dev_mask = (act_ser[START_TIME] < df_devs[TIME]) \
-                    & (df_devs[TIME] < act_ser[END_TIME])
-        devs = df_devs[dev_mask].copy() 
-
-        if devs.empty:
-            continue
-        vals = (devs[TIME] - act_ser[START_TIME]).apply(_get_freq_func('minutes')).values
-
-        add, bins = np.histogram(vals, bins=n_bins, range=(0,max_dt), density=False)
-        counts += add
-
-    # Compute event density as p(t) = 1/(\delta t) (n_k(t;t+\deltat))/K
-    counts = (1/bin_width)*counts/K
-
-    return counts, bins
\ No newline at end of file
+    rates, bins, _, _ = time_dependent_firing_rates(df_devs, df_acts, bin_width,
+                                                    devices=[device], activities=[activity])
+    return rates[0, 0], bins
@@ -1,33 +1,89 @@
+import os
+
 import numpy as np
 import pandas as pd
 from pyadlml.constants import START_TIME, END_TIME, TIME, NAME, VALUE, DEVICE, NUM, CAT, BOOL
 from pyadlml.dataset.stats.util import df_density_binned
 from pyadlml.dataset.util import time2int, timestr_2_timedeltas, infer_dtypes, categorical_2_binary
 from pyadlml.dataset._core.devices import device_events_to_states, _create_devices, \
-    is_device_df, _is_dev_rep2, contains_non_binary, split_devices_binary, create_device_info_dict
+    is_device_df, _is_dev_rep2, contains_non_binary, split_devices_binary, create_device_info_dict, \
+    DeviceEvents, accepts_device_events
 
 from pyadlml.dataset.util import timestr_2_timedeltas
-from pyadlml.dataset._representations.raw import create_raw
 from pyadlml.util import get_npartitions
 from dask import delayed
 
+@accepts_device_events
 def device_order_by_count(df_devices):
     return event_count(df_devices)\
         .sort_values(by='event_count', ascending=False)[DEVICE].tolist()
 
 
-def state_cross_correlation(df_devices,  n_jobs=-1):
+def _binary_state_matrix(df_devs, dev_lst):
+    """ Encodes the states of binary devices for each interval between events.
+
+    Parameters
+    ----------
+    df_devs : pd.DataFrame
+        A device dataframe of boolean devices sorted by time.
+    dev_lst : array like
+        The devices corresponding to the columns.
+
+    Returns
+    -------
+    S : np.ndarray of dtype int8 and shape (#intervals, #devices)
+        The state 1 for *on* and -1 for *off* during each interval. Before its first
+        event a device is assumed to be in the opposite state.
+    w : np.ndarray of shape (#intervals,)
+        The duration of each interval in nanoseconds. The last interval has no duration.
+    """
+    times, rows = np.unique(df_devs[TIME].values, return_inverse=True)
+    S = np.empty((len(times), len(dev_lst)), dtype=np.int8)
+    values = np.where(df_devs[VALUE].values.astype(bool), 1, -1).astype(np.int8)
+    codes = pd.Index(dev_lst).get_indexer(df_devs[DEVICE])
+    order = np.argsort(codes, kind='stable')
+    splits = np.searchsorted(codes[order], np.arange(1, len(dev_lst)))
+    for j, idx in enumerate(np.split(order, splits)):
+        dev_rows, dev_vals = rows[idx], values[idx]
+        # Each state lasts from its event until the next event of the device
+        S[:, j] = np.repeat(np.concatenate([[-dev_vals[0]], dev_vals]),
+                            np.diff(np.concatenate([[0], dev_rows, [len(times)]])))
+
+    w = np.zeros(len(times), dtype=np.float64)
+    w[:-1] = np.diff(times).astype(np.int64)
+    return S, w
+
+
+def _weighted_gram(S, w, chunksize):
+    """ Accumulates S^T diag(w) S over consecutive row chunks of S.
+    """
+    G = np.zeros((S.shape[1], S.shape[1]), dtype=np.float64)
+    for i in range(0, len(S), chunksize):
+        S_chunk = S[i:i+chunksize].astype(np.float64)
+        G += S_chunk.T @ (S_chunk*w[i:i+chunksize, None])
+    return G
+
+
+@accepts_device_events
+def state_cross_correlation(df_devices, n_jobs=-1, chunksize=2**16):
     """
     Compute the similarity between devices by comparing the binary values
     for every interval.
 
+    The states are encoded as a matrix S of shape (#intervals, #devices) with
+    1 for *on* and -1 for *off*. The duration weighted similarity is then
+    S^T diag(dt) S normalized by the total duration.
+
     Parameters
     ----------
     df_devices : pd.DataFrame
         All recorded devices from a dataset. For more information refer to
         :ref:`user guide<device_dataframe>`.
     n_jobs : int, default=-1
-
+        The number of threads the intervals are split across. -1 uses all processors.
+    chunksize : int, default=2**16
+        The number of intervals that are multiplied at once. Bounds the memory
+        of the intermediate float matrices.
 
     Examples
     --------
@@ -45,10 +101,9 @@ def state_cross_correlation(df_devices,  n_jobs=-1):
     -------
     df : pd.DataFrame
         A dataframe of every device against another device. The values range from -1 to 1
-        where higher values represent more similarity.
+        where higher values represent more similarity. The rows and columns are sorted
+        by the device names, categories are named 'device:category'.
     """
-    td = 'td'
-
     df_devs = df_devices.copy()
     dtypes = infer_dtypes(df_devs)
 
@@ -57,61 +112,37 @@ def state_cross_correlation(df_devices,  n_jobs=-1):
     if dtypes[CAT]:
         df_devs = categorical_2_binary(df_devs, dtypes[CAT])
 
-    def func(row):
-        """ gets two rows and returns a crosstab
-        """
-        try:
-            td = row.td.to_timedelta64()
-        except:
-            return None
-        states = row.iloc[1:len(row)-1].values.astype(int)
-
-        for j in range(len(states)):
-            row.iloc[1+j] = states[j]*states*td
-        return row
-
-    def create_meta(raw):
-        return {TIME: 'datetime64[ns]',
-                **{name: object for name in raw.columns[1:-1]},
-                td: 'timedelta64[ns]'}
-
-    dev_lst = df_devs[DEVICE].unique()
-    df_devs = df_devs.sort_values(by=TIME)
-    info_dict = create_device_info_dict(df_devs)
-    # make off to -1 and on to 1 and then calculate cross correlation between signals
-    raw = create_raw(df_devs, info_dict)
-    raw.loc[:, dev_lst] = raw.loc[:, dev_lst].applymap(lambda x: 1 if x else -1)
-    raw[td] = raw[TIME].shift(-1) - raw[TIME]
-    n = get_npartitions()
-
-    # TODO apply leads to to COPY on slice warnings. check out why this is happenign
-    with pd.option_context('mode.chained_assignment', None):
-
-        import dask.dataframe as dd
-        df = dd.from_pandas(raw.copy(), npartitions=n)\
-               .apply(func, axis=1, meta=create_meta(raw))\
-               .drop(columns=[TIME, td])\
-               .sum(axis=0)\
-               .compute(scheduler='threads')
-
-    res = pd.DataFrame(data=np.vstack(df.values), columns=df.index, index=df.index)
-    # normalize
-    res = res/res.iloc[0, 0]
+    dev_lst = sorted(df_devs[DEVICE].unique())
+    df_devs = df_devs.sort_values(by=TIME, kind='stable')
+    S, w = _binary_state_matrix(df_devs, dev_lst)
 
-    #if lst_devs is not None:
-    #    for dev in set(lst_devs).difference(set(list(res.index))):
-    #        res[dev] = pd.NA
-    #        res = res.append(pd.DataFrame(data=pd.NA, columns=res.columns, index=[dev]))
-    return res
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    n_jobs = max(1, min(n_jobs, len(S)//chunksize + 1))
+
+    if n_jobs == 1:
+        G = _weighted_gram(S, w, chunksize)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        # The BLAS product releases the GIL, hence the time axis is split across threads
+        bounds = np.linspace(0, len(S), n_jobs + 1).astype(int)
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            G = sum(pool.map(lambda b: _weighted_gram(S[b[0]:b[1]], w[b[0]:b[1]], chunksize),
+                             zip(bounds[:-1], bounds[1:])))
 
+    # normalize by the total duration
+    G = G/w.sum()
+    return pd.DataFrame(data=G, columns=dev_lst, index=dev_lst)
 
+
+@accepts_device_events
 def state_times(df_devices: pd.DataFrame, binary_state: str = 'on', categorical: bool = True) -> pd.DataFrame:
     """
     Compute times a device is in a certain state.
 
     Parameters
     ----------
-    df_devices : pd.DataFrame
+    df_devices : pd.DataFrame or DeviceEvents
         All recorded devices from a dataset. For more information refer to
         :ref:`user guide<device_dataframe>`.
     binary_state : str one of {'on', 'off'},  default='on'
@@ -150,23 +181,21 @@ def state_times(df_devices: pd.DataFrame, binary_state: str = 'on', categorical:
 
     # invert binary devices values if the 'off' state is desired
     if binary_state == 'off':
-        mask_true = (df[DEVICE].isin(dtypes[BOOL]) & df[VALUE] == True)
-        mask_false = (df[DEVICE].isin(dtypes[BOOL]) & df[VALUE] == False)
+        mask_true = df[DEVICE].isin(dtypes[BOOL]) & (df[VALUE] == True)
+        mask_false = df[DEVICE].isin(dtypes[BOOL]) & (df[VALUE] == False)
         df.loc[mask_true, VALUE] = False
         df.loc[mask_false, VALUE] = True
 
     df = df.sort_values(by=TIME)
-    df[td] = pd.NaT
     last_ts = df[TIME].iloc[-1]
-    for dev in df[DEVICE].unique():
-        diff = df.loc[df[DEVICE] == dev, TIME].shift(-1).copy() \
-               - df.loc[df[DEVICE] == dev, TIME].copy()
-        diff.iloc[-1] = last_ts - df.loc[df[DEVICE] == dev, TIME].iloc[-1]
-        df.loc[(df[DEVICE] == dev), 'td'] = diff
-    df[td] = pd.to_timedelta(df[td])
+
+    # Each state lasts until the devices next event, the last one until the end
+    next_ts = df.groupby(DEVICE, sort=False)[TIME].shift(-1)
+    df[td] = next_ts.fillna(last_ts) - df[TIME]
     return df.iloc[:-1, :].loc[(df[VALUE] == True), [TIME, DEVICE, td]]
 
 
+@accepts_device_events
 def state_fractions(df_devices: pd.DataFrame) -> pd.DataFrame:
     """ Computes the fraction a device is in a certain state.
     Categorical devices
@@ -233,7 +262,7 @@ def event_count(df_devices: pd.DataFrame) -> pd.DataFrame:
 
     Parameters
     ----------
-    df_devices : pd.DataFrame
+    df_devices : pd.DataFrame or DeviceEvents
         All recorded devices from a dataset. For more information refer to
         :ref:`user guide<device_dataframe>`.
 
@@ -252,10 +281,15 @@ def event_count(df_devices: pd.DataFrame) -> pd.DataFrame:
     pd.DataFrame
         The devices and their respective triggercounts.
     """
-    assert is_device_df(df_devices)
-
     col_label = 'event_count'
 
+    if isinstance(df_devices, DeviceEvents):
+        return pd.DataFrame({DEVICE: df_devices.devices, col_label: df_devices.counts()})\
+                 .sort_values(by=DEVICE)\
+                 .reset_index(drop=True)
+
+    assert is_device_df(df_devices)
+
     ser = df_devices.groupby(DEVICE)[DEVICE].count()
     df_devices = pd.DataFrame({DEVICE: ser.index, col_label: ser.values})
 
@@ -273,7 +307,7 @@ def inter_event_intervals(df_devices: pd.DataFrame) -> np.ndarray:
 
     Parameters
     ----------
-    df_devices : pd.DataFrame
+    df_devices : pd.DataFrame or DeviceEvents
         All recorded devices from a dataset. For more information refer to
         :ref:`user guide<device_dataframe>`.
 
@@ -289,6 +323,8 @@ def inter_event_intervals(df_devices: pd.DataFrame) -> np.ndarray:
     np.ndarray
         Array of time deltas in seconds.
     """
+    if isinstance(df_devices, DeviceEvents):
+        return np.diff(df_devices.times)/pd.Timedelta(seconds=1).value
 
     # Create timediff to the previous event
     diff_seconds = 'ds'
@@ -299,47 +335,80 @@ def inter_event_intervals(df_devices: pd.DataFrame) -> np.ndarray:
     return df_devices[diff_seconds].values[:-1]
 
 
-def resampling_imputation_loss(df_devices: pd.DataFrame, dt: str, return_fraction: bool = False):
+@accepts_device_events
+def resampling_imputation_loss(df_devices: pd.DataFrame, dt, return_fraction: bool = False):
     """
     Computes the amount of events neglected when resampling the device dataframe with
     a certain bin size (dt)
 
+    When resampling, all but one event of a device falling into the same timeslice
+    are lost. The timeslices of a device are anchored at the start of the day of its
+    first event, as with pandas resample.
+
     Parameters
     ----------
     df_devices : pd.DataFrame
         A device dataframe
-    dt : str, one of ['m','h','s','ms']
-        The resolution at which  the data is resampled.
+    dt : str or list of str, e.g. ['1s', '30s', '1min']
+        The resolution at which the data is resampled. If a list of resolutions is
+        given, the events are sorted once and the losses are computed for all
+        resolutions.
     return_fraction : boolean, default=False
-        Whether the fraction of imputed events is returned or the total number
+        Whether the fraction of imputed events is returned or the total number. Only
+        applies to a single resolution.
+
+    Examples
+    --------
+    >>> from pyadlml.dataset.stats.devices import resampling_imputation_loss
+    >>> resampling_imputation_loss(data.df_devices, ['1s', '1min'])
+          dt            device  lost_events      frac
+    0     1s     Cups cupboard            0  0.000000
+    ..   ...               ...          ...       ...
+    27  1min    Washingmachine            3  0.088235
 
     Returns
     -------
-    float or int
-        Either the fraction or the total amount of lost events depending on the `return_fraction` parameter
+    float, int or pd.DataFrame
+        For a single resolution either the fraction or the total amount of lost events
+        depending on the `return_fraction` parameter. For a list of resolutions a table
+        with the lost events and their fraction per resolution and device.
     """
-    df_devs = df_devices.copy()\
-                        .drop(columns=[VALUE])\
-                        .set_index(TIME)
-    nr_events_disregarded = 0
-    
-    # For each device count the #events that excessively fall into one bin
-    for dev in df_devs[DEVICE].unique():
-        # Resample and count the number of events that fall into one bin
-        tmp = df_devs[df_devs[DEVICE] == dev].copy()\
-                          .resample(dt, kind='timestamp')\
-                          .count()
-
-        # Subtract one event for that no imputation woudl be necessary
-        val_imp = tmp[(tmp[DEVICE] >= 1)] - 1
-        nr_events_disregarded += val_imp.sum()
-
-    if return_fraction:
-        return nr_events_disregarded/len(df_devices)
-    else:
-        return nr_events_disregarded
-
-
+    from pyadlml.dataset._representations.util import bin_index, to_ns
+
+    dts = dt if isinstance(dt, (list, tuple, np.ndarray)) else [dt]
+
+    df = df_devices[[TIME, DEVICE]].sort_values(by=TIME, kind='stable')
+    codes, devices = pd.factorize(df[DEVICE])
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    t = to_ns(df[TIME])[order]
+
+    # Align the timeslices of each device to the start of the day of its first event
+    first = np.searchsorted(codes, np.arange(len(devices)))
+    origin = to_ns(df[TIME].iloc[order[first]].dt.normalize())[codes]
+
+    n_events = np.bincount(codes, minlength=len(devices))
+    same_dev = (codes[1:] == codes[:-1])
+    lost = np.empty((len(dts), len(devices)), dtype=np.int64)
+    for i, d in enumerate(dts):
+        bins = bin_index(t, pd.Timedelta(d).value, origin)
+        # Every event that falls into the timeslice of its predecessor is lost
+        run_cont = same_dev & (bins[1:] == bins[:-1])
+        lost[i] = np.bincount(codes[1:][run_cont], minlength=len(devices))
+
+    if not isinstance(dt, (list, tuple, np.ndarray)):
+        total = int(lost.sum())
+        return total/len(df_devices) if return_fraction else total
+
+    return pd.DataFrame({
+        'dt': np.repeat(dts, len(devices)),
+        DEVICE: np.tile(devices, len(dts)),
+        'lost_events': lost.ravel(),
+        'frac': (lost/n_events).ravel(),
+    })
+
+
+@accepts_device_events
 def event_cross_correlogram_slice(df_devs: pd.DataFrame, lst_devs=None, t_window: str ='20s') -> pd.DataFrame:
     """
     Count the prevalence of devices that trigger within the same time frame.
@@ -408,6 +477,7 @@ def event_cross_correlogram_slice(df_devs: pd.DataFrame, lst_devs=None, t_window
         .replace(pd.NA, 0)
 
 
+@accepts_device_events
 def events_one_day(df_devices: pd.DataFrame, dt: str=None) -> pd.DataFrame:
     """
     Divide a day into time bins and compute how many device triggers fall into
@@ -445,194 +515,113 @@ def events_one_day(df_devices: pd.DataFrame, dt: str=None) -> pd.DataFrame:
         return df_density_binned(df_devices, column_str=DEVICE, dt=dt)
 
 
-def event_cross_correlogram(df_devices: pd.DataFrame, binsize: str = '1s', maxlag: str = '2m') -> pd.DataFrame:
-    """  Calculate cross correlogram
+def _device_times(df_devices) -> dict:
+    """ Maps every device to its sorted event times in nanoseconds.
+    """
+    if isinstance(df_devices, DeviceEvents):
+        return {dev: df_devices.device_times(dev) for dev in df_devices.devices}
+    df = df_devices[[TIME, DEVICE]].sort_values(by=TIME, kind='stable')
+    return {dev: grp[TIME].values.astype(np.int64) for dev, grp in df.groupby(DEVICE, sort=False)}
+
+
+def _correlogram(t_ref, t_tar, maxlag, n_bins, exclude_self=False, max_pairs=2**22):
+    """ Counts the lags between reference and target events into equally sized bins.
 
-      ccg = correlogram(t, assignment, binsize, maxlag) calculates the
-      cross- and autocorrelograms for all device pairs.
-      For device on y axis, the events of device on x-axis happen around that device 
+    For every reference event only the target events within [-maxlag, maxlag] are
+    visited. Their bounds are found by searching the sorted target times and the lags
+    are accumulated chunk-wise such that at most *max_pairs* lags are held in memory.
 
     Parameters
     ----------
-    df_devices :
-        device dataframe
-    binsize : str, default='1s'
-        The size of one bin in the correlogram
-    maxlag : str, default='2m'
-        The size of the window for which spikes should be considered.
+    t_ref : np.ndarray of dtype int64
+        The sorted reference event times in nanoseconds.
+    t_tar : np.ndarray of dtype int64
+        The sorted target event times in nanoseconds.
+    maxlag : int
+        The maximum lag in nanoseconds.
+    n_bins : int
+        The number of bins dividing the range [-maxlag, maxlag].
+    exclude_self : bool, default=False
+        If the reference and target events are the same, do not count the pairing of
+        each event with itself. Otherwise the 0-bin of autocorrelograms has #events
+        additional counts.
+    max_pairs : int, default=2**22
+        The maximum number of lags computed at once.
 
     Returns
     -------
-    ccg             computed correlograms   #device x #device x #bins 
-    bins            bin times relative to center    #bins x 1
+    counts : np.ndarray of shape (n_bins,)
+        The number of target events happening at the lag w.r.t. a reference event.
     """
+    counts = np.zeros(n_bins, dtype=np.int64)
+    if len(t_ref) == 0 or len(t_tar) == 0:
+        return counts
 
-    import dask
-    ET = 'event_times'
-    df_dev = df_devices.copy()
-
-    devices = df_devices[DEVICE].unique()
-    n_devs = len(devices)
-    maxlag = pd.Timedelta(maxlag).seconds
-    binsize = pd.Timedelta(binsize).seconds
-
-    n_bins = int((maxlag / binsize) * 2) + 1    # add +1 for symmetric histogram
-
-    ccg = np.zeros((n_devs, n_devs, n_bins))
-    bins = np.linspace(-maxlag, maxlag, n_bins)
-
-    # get times in milliseconds relative to the first event
-    start_time = df_dev[TIME].iloc[0]
-    df_dev[ET] = (df_dev[TIME] - start_time).dt.seconds
-
-    def calc_hist(df_dev, ref, tar):
-        # select reference and target device
-        t_ref = df_dev[df_dev[DEVICE] == ref][ET].values
-        t_tar = df_dev[df_dev[DEVICE] == tar][ET].values
+    lo = np.searchsorted(t_tar, t_ref - maxlag, side='left')
+    hi = np.searchsorted(t_tar, t_ref + maxlag, side='right')
+    n_pairs = hi - lo
+    first_pair = np.cumsum(n_pairs) - n_pairs
 
-        hist_sum = np.zeros(n_bins)
+    # Split the reference events into chunks of at most max_pairs lags
+    chunk_ids = first_pair//max_pairs
+    splits = np.concatenate([[0], np.flatnonzero(np.diff(chunk_ids)) + 1, [len(t_ref)]])
 
-        # Fix event of reference and do histogram of target events around that fixation
-        for k, event in enumerate(t_ref):
+    bin_width = 2*maxlag/n_bins
+    for start, stop in zip(splits[:-1], splits[1:]):
+        n = n_pairs[start:stop]
+        ref_idx = np.repeat(np.arange(start, stop), n)
+        tar_idx = np.arange(n.sum()) - np.repeat(first_pair[start:stop] - first_pair[start], n) \
+                + np.repeat(lo[start:stop], n)
+        if exclude_self:
+            keep = (ref_idx != tar_idx)
+            ref_idx, tar_idx = ref_idx[keep], tar_idx[keep]
 
-            # In case of auto-correlogram delete the reference event from the target array
-            # otherwise the 0-bin will have additional #len(tar) events 
-            t_tar_prime = np.delete(t_tar, k) if ref == tar else t_tar
+        lags = t_tar[tar_idx] - t_ref[ref_idx]
 
-            # create histograms
-            hist, _ = np.histogram(t_tar_prime, bins=n_bins, range=(event - maxlag,  event + maxlag), density=False)
-            hist_sum += hist
-        return hist_sum
+        # The last bin is closed on the right as in np.histogram
+        bins = np.floor((lags + maxlag)/bin_width).astype(np.int64)
+        bins = np.minimum(bins, n_bins - 1)
+        counts += np.bincount(bins, minlength=n_bins)
 
-    # make dask delayed computation for each field
-    result = []
-    for i, ref in enumerate(devices):
-        for j, tar in enumerate(devices):
-            result.append(calc_hist(df_dev, ref, tar))
-            #result.append(dask.delayed(calc_hist)(df_dev, ref, tar))
-    #result = dask.compute(result, scheduler='threads')[0]
+    return counts
 
-    # reintegrate into array
-    for i, ref in enumerate(devices):
-        for j, tar in enumerate(devices):
-            ccg[i, j, :] = result[i*len(devices)+j] # (n_bins,) -> (n_bins, dev, dev)
-
-    return ccg, bins
-
-
-def _calc_hist(df_dev, ref, tar, n_bins, maxlag):
-
-    # Select reference and target device
-    t_ref = df_dev.loc[df_dev[DEVICE] == ref, 'event_times'].copy().values
-    t_tar = df_dev.loc[df_dev[DEVICE] == tar, 'event_times'].copy().values
-    # Duplicate target #ref times on 0-axis
-    tar_matrix = np.tile(t_tar, (len(t_ref), 1))                # (TA,) -> (RE, TA)
-    # Duplicate ref #target times on 1-axis
-    shift = np.repeat(t_ref.reshape(-1, 1), len(t_tar), axis=1) # (RE, ) -> (RE, TA)
-
-    # Shift every target (row) by reference fix point => zero-centering
-    # i.e. first target tm[0,:] is shifted by 0, since shift[0,:] = 0 pointwise, loop
-    shifted_target = tar_matrix - shift     # (RE, TA) -> (RE, TA)
-
-    # Compute histograms around 0, (RE, TA) -> (RE, n_bins, 2) containing hist and edges
-    if True:
-        tmp2 = np.apply_along_axis(lambda *x, **y: np.histogram(*x, **y)[0], axis=1, arr=shifted_target, 
-                                bins=n_bins, range=(-maxlag, maxlag), density=False)
-        hist_sum2 = tmp2.sum(axis=0)
-        return hist_sum2
-
-    tmp = np.apply_along_axis(np.histogram, axis=1, arr=shifted_target,
-                            bins=n_bins, range=(-maxlag, maxlag), density=False)
-
-    # Count over hists (0)
-    hist_sum = tmp[:, 0].sum(axis=0)
-    return hist_sum
 
+def _correlogram_params(binsize, maxlag):
+    """ Returns the maximum lag in nanoseconds, the number of bins and the bin positions in seconds.
+    """
+    maxlag = pd.Timedelta(maxlag)
+    binsize = pd.Timedelta(binsize)
 
+    n_bins = int((maxlag/binsize)*2) + 1    # add +1 for symmetric histogram
+    bins = np.linspace(-maxlag.total_seconds(), maxlag.total_seconds(), n_bins)
+    return maxlag.value, n_bins, bins
 
-def event_cross_correlogram2(df_devices, binsize='1s', maxlag='2m', v1=True, use_dask=False):
-    """  Calculate cross correlogram
 
-      ccg = correlogram(t, assignment, binsize, maxlag) calculates the
-      cross- and autocorrelograms for all pairs of clusters with input
+def _correlogram_pairs(t_refs, t_tars, pairs, maxlag, n_bins, n_jobs=1):
+    """ Computes the correlogram for each (reference, target) pair
 
     Parameters
     ----------
-    df_devices :
-        device dataframe
-    binsize : str, default='1s'
-        The size of one bin in the correlogram
-    maxlag : str, default='2m'
-        The size of the window for which spikes should be considered.
+    t_refs, t_tars : dict
+        Sorted event times in nanoseconds for each reference and target.
+    pairs : list of tuples
+        The (reference, target) pairs.
 
     Returns
     -------
-    ccg             computed correlograms   #bins x #device x #device
-    bins            bin times relative to center    #bins x 1
+    list of np.ndarray
     """
-    ET = 'event_times'
-    df_dev = df_devices.copy()
-
-    devices = df_devices[DEVICE].unique()
-    n_devs = len(devices)
-    maxlag = pd.Timedelta(maxlag).seconds
-    binsize = pd.Timedelta(binsize).seconds
-
-    n_bins = int((maxlag / binsize) * 2) + 1    # add +1 for symmetric histogram
-
-    ccg = np.zeros((n_devs, n_devs, n_bins))
-    bins = np.linspace(-maxlag, maxlag, n_bins)
-
-    # get times in milliseconds relative to the first event
-    start_time = df_dev[TIME].iloc[0]
-    df_dev[ET] = (df_dev[TIME] - start_time).dt.seconds
-    """
-    Normally a correlogram between two devices is computed by fixing one event of device 1, computing 
-    the histogram of the device 2 eventrain, zero-centered around the fixed event and repeat the procedure 
-    for every event of device 1.
-    
-    The fast implementation repeats the event stream of device 1. Then subtract for devices 2 event stream
-    is computed. By subtracting each event  from devices 1 vectorized event stream  all events are zero centered
-    
-    
-    """
-
-
-    # make dask delayed computation for each field
-    result = []
-    import itertools
-    import dask
-    if use_dask:
-        df_dev = dask.delayed(df_dev)
-
-    k = 0
-    for i, j in itertools.combinations_with_replacement(range(0, len(devices)), 2):
-        #print(f'({i},{j}) -> {k}')
-        if use_dask:
-            result.append(dask.delayed(_calc_hist)(df_dev, devices[i], devices[j], n_bins, maxlag))
-        else:
-            result.append(_calc_hist(df_dev, devices[i], devices[j], n_bins, maxlag))
-        k+=1
+    args = [(t_refs[ref], t_tars[tar], maxlag, n_bins, t_refs[ref] is t_tars[tar])
+            for ref, tar in pairs]
+    if n_jobs != 1:
+        from joblib import Parallel, delayed
+        return Parallel(n_jobs=n_jobs)(delayed(_correlogram)(*a) for a in args)
+    return [_correlogram(*a) for a in args]
 
-    if use_dask:
-        result = dask.compute(*result)
 
-    # reintegrate into array
-    for k, (i, j) in enumerate(itertools.combinations_with_replacement(range(0, len(devices)), 2)):
-        #print(f'{k} -> ({i}, {j})')
-        if i != j:
-            ccg[i, j, :] = result[k]
-            ccg[j, i, :] = np.flip(result[k])
-        else:
-            ccg[i, i, :] = result[k]
-
-    return ccg, bins, devices
-
-
-
-
-def event_cross_correlogram3(df_devices, binsize='1s', maxlag='2m', fix=[], to=[], use_dask=False):
-    """  Calculate event cross correlogram. 
+def event_cross_correlogram(df_devices: pd.DataFrame, binsize: str = '1s', maxlag: str = '2m',
+                            fix=None, to=None, n_jobs=1):
+    """  Calculate event cross correlogram.
         Device A event is fixed and the events of another device B are counted happening in the range of
         maxlag around the fixed events of device A. 
         Therefore, the histgoram c_ij displays the events of device i happening around the device j. 
@@ -641,188 +630,43 @@ def event_cross_correlogram3(df_devices, binsize='1s', maxlag='2m', fix=[], to=[
 
     Parameters
     ----------
-    df_devices :
-        device dataframe
-    fix : list
-
-    to: list
-
+    df_devices : pd.DataFrame or DeviceEvents
+        A device dataframe
     binsize : str, default='1s'
         The size of one bin in the correlogram
     maxlag : str, default='2m'
         The size of the window for which spikes should be considered.
+    fix : list, optional
+        The devices whose events are fixed, i.e. the columns. Defaults to all devices.
+    to : list, optional
+        The devices whose events are counted, i.e. the rows. Defaults to all devices.
+    n_jobs : int, default=1
+        The number of processes the device pairs are distributed to.
 
     Returns
     -------
-    ccg             computed correlograms   #bins x #device x #device
-    bins            bin times relative to center    #bins x 1
-    """
-    ET = 'event_times'
-    df_dev = df_devices.copy()
-
-    devices = df_devices[DEVICE].unique()
-    n_devs = len(devices)
-
-    if not fix and not to:
-        n_rows, n_cols = [n_devs]*2
-        rows, cols = [devices]*2
-    if fix:
-        n_cols, cols = len(fix), fix
-    if to:
-        n_rows, rows = len(to), to
-
-
-    maxlag = pd.Timedelta(maxlag).seconds
-
-    binsize = pd.Timedelta(binsize).seconds
-
-    n_bins = int((maxlag / binsize) * 2) + 1    # add +1 for symmetric histogram
-
-    ccg = np.zeros((n_rows, n_cols, n_bins))
-    bins = np.linspace(-maxlag, maxlag, n_bins)
-
-    # get times in milliseconds relative to the first event
-    start_time = df_dev[TIME].iloc[0]
-    df_dev[ET] = (df_dev[TIME] - start_time).dt.seconds
-    """
-    Normally a correlogram between two devices is computed by fixing one event of device 1, computing 
-    the histogram of the device 2 eventrain, zero-centered around the fixed event and repeat the procedure 
-    for every event of device 1.
-    
-    The fast implementation repeats the event stream of device 1. Then subtract for devices 2 event stream
-    is computed. By subtracting each event  from devices 1 vectorized event stream  all events are zero centered
-    
-    
+    ccg : np.ndarray of shape (#rows, #cols, #bins)
+        The computed correlograms. For autocorrelograms an event is not counted
+        w.r.t. itself.
+    bins : np.ndarray of shape (#bins,)
+        Bin times in seconds relative to the center
+    rows : list
+    cols : list
     """
-    def combination_with_replacement(l1, l2, r=2):
-        lst = []
-        hm = set()
-        for e1 in l1:
-            for e2 in l2:
-                p = frozenset([e1, e2])
-                if p not in hm:
-                    hm.add(p)
-                    lst.append((e1, e2))
-        return lst
-    class CombHM():
-        def __init__(self, rows, cols):
-            self.iter_lst = []
-            self.value_dict = dict()
-            k=0
-            for e1 in rows:
-                for e2 in cols:
-                    key = (e1, e2)
-                    if not self._has_item(key):
-                        self.value_dict[key] = None
-                        self.iter_lst.append(key)
-                        k+=1
-
-        def _has_item(self, key):
-            if key in self.value_dict.keys():
-                return True
-            elif (key[1], key[0]) in self.value_dict.keys():
-                return True
-            else:
-                return False
-
-        def _is_rev_key(self, key):
-            if key in self.value_dict.keys():
-                return False
-            elif (key[1], key[0]) in self.value_dict.keys():
-                return True
-            else:
-                raise AttributeError
-
-        def __iter__(self): 
-            return self.iter_lst.__iter__()
-
-        def __next__(self):
-            return self.iter_lst.__next__()
-
-        def __setitem__(self, idxs, value):
-            if isinstance(idxs, int):
-                idxs = self.iter_lst[idxs]
-            else:
-                assert len(idxs) == 2
-                idxs = (idxs[0], idxs[1])
-
-            self.value_dict[idxs] = value
-
-        def __getitem__(self, idxs):
-            """
-            For a single index return the order in which the elements were added. For
-            multiple indices 
-            """
-            if isinstance(idxs, int):
-                idxs = self.iter_lst[idxs]
-            else:
-                assert len(idxs) == 2
-                idxs = (idxs[0], idxs[1])
-
-            if self._has_item(idxs):
-                if self._is_rev_key(idxs):
-                    return np.flip(self.value_dict[(idxs[1], idxs[0])])
-                else:
-                    return self.value_dict[idxs]
-            else:
-                raise AttributeError
-
-
-    # make dask delayed computation for each field
-    result = []
-    import itertools
-    import dask
-    if use_dask:
-        df_dev = dask.delayed(df_dev)
-
-    combis = CombHM(rows, cols)
-
-    #if rows != cols:
-    if True:
-        for r, c in combis:
-            # TODO REMOVE Compute when the column events happen w.r.t. to a fixed row event
-            # Compute when the row events happen w.r.t. to a fixed column event
-            if use_dask:
-                combis[r,c] = dask.delayed(_calc_hist)(df_dev, c, r, n_bins, maxlag)
-            else:
-                combis[r,c] = _calc_hist(df_dev, c, r, n_bins, maxlag)
-
-        if use_dask:
-            keys = list(combis)
-            for k, v in zip(keys, dask.compute(*[combis[k] for k in keys])):
-                combis[k] = v 
-
-        for r, c in itertools.product(range(len(rows)), range(len(cols))):
-            ccg[r, c, :] = combis[rows[r], cols[c]]
-
-        return ccg, bins, rows, cols 
-
-    else:
-        k = 0
-        for i, j in itertools.combinations_with_replacement(range(0, len(devices)), 2):
-            #print(f'({i},{j}) -> {k}')
-            if use_dask:
-                result.append(dask.delayed(_calc_hist)(df_dev, devices[i], devices[j], n_bins, maxlag))
-            else:
-                result.append(_calc_hist(df_dev, devices[i], devices[j], n_bins, maxlag))
-            k+=1
-
-        if use_dask:
-            result = dask.compute(*result)
+    times = _device_times(df_devices)
+    cols = list(fix) if fix else list(times.keys())
+    rows = list(to) if to else list(times.keys())
 
-        # reintegrate into array
-        for k, (i, j) in enumerate(itertools.combinations_with_replacement(range(0, len(devices)), 2)):
-            #print(f'{k} -> ({i}, {j})')
-            if i != j:
-                ccg[i, j, :] = result[k]
-                ccg[j, i, :] = np.flip(result[k])
-            else:
-                ccg[i, i, :] = result[k]
+    maxlag, n_bins, bins = _correlogram_params(binsize, maxlag)
 
-    return ccg, bins, rows, cols 
+    pairs = [(c, r) for r in rows for c in cols]
+    result = _correlogram_pairs(times, times, pairs, maxlag, n_bins, n_jobs)
 
+    ccg = np.stack(result).reshape(len(rows), len(cols), n_bins)
+    return ccg, bins, rows, cols
 
 
+@accepts_device_events
 def fano_factor(df_devs: pd.DataFrame, dt=None, inplace=False) -> float:
     """
     Repeat experiment serveral times -> measured spke count varies between one trial and the next.
@@ -844,6 +688,7 @@ def fano_factor(df_devs: pd.DataFrame, dt=None, inplace=False) -> float:
 
 
 
+@accepts_device_events
 def firing_rate_moments(df_devs: pd.DataFrame, dt=None, times=None, inplace=False):
     """ Calculates mean and variance 
 
@@ -865,6 +710,7 @@ def firing_rate_moments(df_devs: pd.DataFrame, dt=None, times=None, inplace=Fals
 
 
 
+@accepts_device_events
 def firing_rate(df_devs: pd.DataFrame, dt=None, times=None, inplace=False):
     """
     Compute the mean firing rate 
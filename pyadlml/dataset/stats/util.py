@@ -2,7 +2,7 @@ from pyadlml.constants import TIME, VALUE
 import numpy as np
 import pandas as pd
 
-from pyadlml.preprocessing import EventWindows
+from pyadlml.preprocessing import EventWindow
 
 
 def get_tds_per_batch(X, window_size, stride, seq_type):
@@ -20,38 +20,22 @@ def get_tds_per_batch(X, window_size, stride, seq_type):
 
     Returns
     -------
-    df : pd.DataFrame
-        A dataframe of the format (N) where for each batch the time differences
-        are given
+    diffs : np.ndarray of shape (S, window_size-1)
+        For each batch the time differences between successive datapoints
+        as a read-only view.
     """
-    # extract time to index mapping
-    time = X[TIME]
-    index = X.index.values[:, np.newaxis]
-
-    # print(index.shape)
-    # slice and dice data
-    ss = EventWindows(rep=seq_type, window_size=window_size, stride=stride)
-    tmp, _ = ss.fit_transform(index)
-
-    diffs = []
-    for i in range(tmp.shape[0]):
-        batch = time[tmp[i].squeeze()]
-
-        # compute td difference to successor
-        batch_shifted = batch.shift(-1)
-        batch_diff = (batch_shifted - batch)[:-1]
+    # The time deltas between successive datapoints are computed once and
+    # shared by all overlapping batches
+    time = X[TIME].to_numpy()
+    tds = time[1:] - time[:-1]
 
-        diffs.append(batch_diff)
-    return diffs
+    ss = EventWindow(rep=seq_type, window_size=window_size-1, stride=stride, copy=False)
+    return ss._window_view(tds)
 
 
 def comp_tds_sums(X, window_size, stride, seq_type):
-    sums = []
     diffs = get_tds_per_batch(X, window_size, stride, seq_type)
-    for d in diffs:
-        sums.append(d.sum())
-    sums = np.array(sums)
-    return sums
+    return diffs.sum(axis=1)
 
 
 def comp_tds_sums_mean(X, window_size, stride, seq_type):
@@ -7,7 +7,7 @@ import pandas as pd
 import numpy as np
 
 from pyadlml.constants import DATASET_STRINGS, TIME, END_TIME, START_TIME, DEVICE, VALUE, BOOL, \
-    CAT, ACTIVITY
+    CAT, NUM, ACTIVITY
 from pandas.api.types import infer_dtype
 from pyadlml.dataset._core.activities import ActivityDict, _is_activity_overlapping, \
     correct_activity_overlap, is_activity_df
@@ -144,33 +144,65 @@ def categorical_2_binary(df_devices, cat_list):
     """
     mask_cat = df_devices[DEVICE].isin(cat_list)
     df_cat = df_devices[mask_cat].copy()
-    df_cat.loc[:, 'new_device'] = df_cat[DEVICE] + ':' + df_cat[VALUE]
+    new_device = df_cat[DEVICE] + ':' + df_cat[VALUE]
+    dev_codes = pd.factorize(df_cat[DEVICE])[0]
+    has_prev = (df_cat.groupby(DEVICE, sort=False).cumcount() > 0).values
+
+    # Each category is switched off when the device changes to the next category
+    df_off = df_cat.copy()
+    df_off.loc[:, DEVICE] = new_device.groupby(df_cat[DEVICE], sort=False).shift(1)
+    df_off.loc[:, VALUE] = False
+    df_off.loc[:, TIME] += pd.Timedelta('1ns')
+
+    # Order the off events by device as if they were appended one device at a time
+    df_off = df_off[has_prev].iloc[np.argsort(dev_codes[has_prev], kind='stable')]
+
+    df_cat.loc[:, DEVICE] = new_device
     df_cat.loc[:, VALUE] = True
-    for dev in df_cat[DEVICE].unique():
-        df = df_cat[df_cat[DEVICE] == dev]
-        df_new = df.copy()
-        df_new.loc[:, DEVICE] = df['new_device'].shift(1)
-        df_new = df_new[1:]
-        df_new.loc[:, VALUE] = False
-        df_new.loc[:, TIME] += pd.Timedelta('1ns')
-        df_cat = pd.concat([df_cat, df_new])
-
-    mask = df_cat[DEVICE].isin(cat_list)
-    df_cat.loc[mask, DEVICE] = df_cat.loc[mask, 'new_device']
-    df_cat = df_cat.drop(columns='new_device')
-
-    df_devices = pd.concat([df_devices[~mask_cat], df_cat])\
+
+    df_devices = pd.concat([df_devices[~mask_cat], df_cat, df_off])\
                     .sort_values(by=TIME)\
                     .reset_index(drop=True)
     return df_devices
 
+def _infer_device_dtype(vals):
+    """ Infers the datatype of a single device from its values
+
+    Parameters
+    ----------
+    vals : pd.Series
+        The values of one device
+
+    Returns
+    -------
+    str
+        One of 'categorical', 'boolean' or 'numerical'
+    """
+    inf = infer_dtype(vals, skipna=True)
+    if inf == 'string' or inf == 'object' or inf == 'mixed':
+        try:
+            pd.to_numeric(vals.dropna().unique())
+            return NUM
+        except:
+            return CAT
+    elif inf == 'boolean':
+        return BOOL
+    elif inf == 'floating' or 'integer':
+        return NUM
+    else:
+        raise ValueError('could not infer correct dtype for device values {}'.format(vals))
+
+
 def infer_dtypes(df_devices):
     """ Infers automatically the datatypes for each device of a device dataframe
     and returns a dictionary containing data types mapped to device names
 
+    The datatypes are inferred once per dataframe content and read from the
+    device metadata registry afterwards.
+
     Parameters
     ----------
-    df_devices : pd.DataFrame
+    df_devices : pd.DataFrame or DeviceEvents
         A device dataframe
 
     Returns
@@ -179,28 +211,12 @@ def infer_dtypes(df_devices):
         Dictionary with keys: {'categorical' : [...], 'boolean': [...] , 'numerical' : [...]}
 
     """
-    dev_cat = []
-    dev_bool = []
-    dev_num = []
-
-    dev_lst = df_devices[DEVICE].unique()
-    for dev in dev_lst:
-        vals = df_devices[df_devices[DEVICE] == dev][VALUE]
-        inf = infer_dtype(vals, skipna=True)
-        if inf == 'string' or inf == 'object' or inf == 'mixed':
-            try:
-                pd.to_numeric(vals.dropna().unique())
-                dev_num.append(dev)
-            except:
-                dev_cat.append(dev)
-        elif inf == 'boolean':
-            dev_bool.append(dev)
-        elif inf == 'floating' or 'integer':
-            dev_num.append(dev)
-        else:
-            raise ValueError('could not infer correct dtype for device {}'.format(dev))
+    from pyadlml.dataset._core.devices import DeviceEvents, device_metadata
+    if isinstance(df_devices, DeviceEvents):
+        return df_devices.dtypes
 
-    return {'categorical': dev_cat, 'boolean': dev_bool, 'numerical': dev_num}
+    dtypes = device_metadata(df_devices).dtypes
+    return {k: list(v) for k, v in dtypes.items()}
 
 
 def select_timespan(df_devs=None, df_acts=None, start_time=None, end_time=None, clip_activities=False):
@@ -290,12 +306,9 @@ def get_last_states(df_devs: pd.DataFrame, left_bound=-1) -> dict:
     res : dict
         A device mapping to initial values
     """
+    from pyadlml.dataset._core.devices import device_metadata
     left_bound = len(df_devs) if left_bound == -1 else left_bound
-    return df_devs.iloc[:left_bound, :]\
-            .sort_values(by=TIME)\
-            .groupby(DEVICE)\
-            .last()[VALUE]\
-            .to_dict()
+    return dict(device_metadata(df_devs.iloc[:left_bound, :]).last_state)
 
 def get_first_states(df_devs: pd.DataFrame) -> dict:
     """ Creates a dictionary where every device maps to its first known value.
@@ -310,11 +323,8 @@ def get_first_states(df_devs: pd.DataFrame) -> dict:
     res : dict
         A device mapping to initial values
     """
-    return df_devs.copy()\
-        .sort_values(by=TIME)\
-        .groupby(DEVICE)\
-        .first()[VALUE]\
-        .to_dict()
+    from pyadlml.dataset._core.devices import device_metadata
+    return dict(device_metadata(df_devs).first_state)
 
 
 
@@ -8,119 +8,216 @@ metrics oriented at torch.metrics
 
 """
 
-def online_accuracy(y_true: np.ndarray, y_pred: np.ndarray, times: np.ndarray, n_classes: int, average: str = None):
-    """
+AVERAGES = [None, 'micro', 'macro', 'weighted']
 
-    Parameters
-    ----------
 
-    average: str one of ['micro', 'macro', 'weighted']
+def _to_class_ids(y: np.ndarray, n_classes: int) -> np.ndarray:
+    """ Flattens encoded labels and checks that they are valid class ids.
+    """
+    y = np.asarray(y).ravel()
+    if y.dtype.kind == 'f' and np.array_equal(y, np.rint(y)):
+        y = y.astype(np.int64)
+    if y.dtype.kind not in 'iub':
+        raise ValueError(f'The labels have to be encoded as class ids. Got dtype {y.dtype}.')
+    y = y.astype(np.int64, copy=False)
+    if len(y) and (y.min() < 0 or y.max() >= n_classes):
+        raise ValueError(f'The class ids have to be within [0, {n_classes}).')
+    return y
+
+
+def _to_ns(times: np.ndarray) -> np.ndarray:
+    """ Returns the times as int64 nanoseconds.
+    """
+    times = np.asarray(times).ravel()
+    if times.dtype.kind != 'M':
+        times = pd.to_datetime(times).values
+    return times.astype('datetime64[ns]').view(np.int64)
+
 
+class OnlineConfusionAccumulator():
     """
-    assert average in [None, 'micro', 'macro', 'weighted']
+    Accumulates the duration weighted confusion matrix over batches of predictions.
 
-    # An array where for each class the specified quantities are computed
+    Every prediction lasts until the next prediction. The duration of the most
+    recent prediction is only known once the next batch arrives. When the
+    scores are computed before, it lasts the mean duration of the
+    predictions with the same true class. Accumulating batches yields the same
+    matrix as :func:`online_confusion_matrix` on the concatenated batches.
 
-    if average == 'micro':
-        df_confmat = online_confusion_matrix(y_true, y_pred, times, n_classes)
-        confmat = df_confmat.values
-        tp = np.diag(confmat)
+    Parameters
+    ----------
+    n_classes : int
+        The number of classes. The labels are the class ids 0, ..., n_classes-1.
 
-        preds = y_pred.flatten()
-        target = y_true.flatten()
-        tp = (preds == target).sum()
+    Attributes
+    ----------
+    confmat_ : np.ndarray of shape (n_classes, n_classes)
+        The accumulated nanoseconds. c_ij is the time class i was predicted when
+        the true class was j. Excludes the most recent prediction.
+
+    Examples
+    --------
+    >>> from pyadlml.metrics import OnlineConfusionAccumulator
+    >>> acc = OnlineConfusionAccumulator(n_classes=3)
+    >>> for y_true, y_pred, times in stream:
+    ...     acc.update(y_true, y_pred, times)
+    >>> acc.compute(average='macro')
+    0.72
+    """
+    def __init__(self, n_classes: int):
+        self.n_classes = n_classes
+        self.reset()
 
+    def reset(self):
+        """ Removes all accumulated predictions.
+        """
+        self.confmat_ = np.zeros((self.n_classes, self.n_classes), dtype=np.int64)
+        self._n_true = np.zeros(self.n_classes, dtype=np.int64)
+        self._last = None
+        return self
+
+    def update(self, y_true: np.ndarray, y_pred: np.ndarray, times: np.ndarray):
+        """ Adds a batch of predictions.
+
+        Parameters
+        ----------
+        y_true : np.ndarray of shape (N,) or (N, 1)
+            The encoded true classes.
+        y_pred : np.ndarray of shape (N,) or (N, 1)
+            The encoded predicted classes.
+        times : np.ndarray of shape (N,) or (N, 1)
+            The sorted times of the predictions.
+
+        Returns
+        -------
+        self
         """
-        Normally:
-            A FP for class i counts when i is not (j), but i was predicted (j!=i)
-            A FN for class i counts when i is but j was predicted (j!=i)
-            If there is a FP for class i it counts as FN for class j and vice versa,
-            therefore FP = FN in multiclass settings
-        Since each sample has a weight, a specific duration a FN 
+        K = self.n_classes
+        y_true, y_pred = _to_class_ids(y_true, K), _to_class_ids(y_pred, K)
+        times = _to_ns(times)
+        if not len(y_true) == len(y_pred) == len(times):
+            raise ValueError('The labels and times have to be of equal length.')
+        if len(times) == 0:
+            return self
+
+        # Prepend the last prediction of the previous batch as its duration is now known
+        if self._last is not None:
+            y_true = np.concatenate([[self._last[0]], y_true])
+            y_pred = np.concatenate([[self._last[1]], y_pred])
+            times = np.concatenate([[self._last[2]], times])
+        self._last = (y_true[-1], y_pred[-1], times[-1])
+
+        dt = np.diff(times)
+        y_true, y_pred = y_true[:-1], y_pred[:-1]
+        self.confmat_ += np.rint(np.bincount(y_pred*K + y_true, weights=dt, minlength=K*K))\
+                           .astype(np.int64).reshape(K, K)
+        self._n_true += np.bincount(y_true, minlength=K)
+        return self
+
+    def _confmat_ns(self) -> np.ndarray:
+        """ Returns the confusion matrix including the most recent prediction.
         """
-        fp = (preds != target).sum()
-        fn = (preds != target).sum()
-        #tn = n_classes * preds.numel() - (fp + fn + tp)
-        return tp.sum() / (tp.sum() + fn.sum())
+        confmat = self.confmat_.copy()
+        if self._last is not None:
+            true, pred, _ = self._last
+            if self._n_true[true] > 0:
+                confmat[pred, true] += self.confmat_[:, true].sum() // self._n_true[true]
+        return confmat
+
+    def confusion_matrix(self) -> pd.DataFrame:
+        """
+        Rows are predictions and columns are true values
+        c_ij = predicted class is i at i-th row and true class j
 
-    elif average == 'macro':
-        df_confmat = online_confusion_matrix(y_true, y_pred, times, n_classes)
+        Returns
+        -------
+        cm : pd.DataFrame
+            The durations of all class pairs.
+        """
+        classes = pd.RangeIndex(self.n_classes)
+        return pd.DataFrame(self._confmat_ns().view('timedelta64[ns]'),
+                            index=classes.rename('y_pred'), columns=classes.rename('y_true'))
+
+    def compute(self, average: str = None):
+        """ Returns the duration weighted accuracy.
+
+        Parameters
+        ----------
+        average : str one of [None, 'micro', 'macro', 'weighted'], default=None
+            None returns the accuracy of each class, where classes without true
+            duration have an accuracy of 0. 'micro' and 'weighted' weight each class
+            by its true duration and are therefore identical. 'macro' weights each
+            class that has a true duration equally, such that classes that were
+            not seen yet do not lower the score.
+
+        Returns
+        -------
+        score : float or np.ndarray of shape (n_classes,)
+        """
+        if average not in AVERAGES:
+            raise ValueError(f'The average has to be one of {AVERAGES}. Got {average}.')
 
-        # Extract true as columns and pred as rows in nanosecond resolution
-        # c_ij = predicted class i when true class is j
-        confmat = df_confmat.values
+        confmat = self._confmat_ns()
         tp = np.diag(confmat)
+        support = confmat.sum(0)
 
-        # Sum over is sth. else but was mistaken as c
-        fp = confmat.sum(1) - tp
+        if average in ['micro', 'weighted']:
+            # The support weighted class accuracies sum up to the trace
+            return tp.sum() / support.sum() if support.sum() > 0 else 0.
 
-        # Sum over is c but was predicted as sth. else
-        # recovers y_true with df.groupby('y_true')['diff'].sum()
-        fn = confmat.sum(0) - tp
+        score = np.divide(tp, support, out=np.zeros(self.n_classes), where=support > 0)
+        if average == 'macro':
+            # Like sklearn only the classes that are present are averaged
+            n_present = (support > 0).sum()
+            return score.sum() / n_present if n_present > 0 else 0.
+        return score
 
-        # All predictions that do not include c
-        tn = confmat.sum() - (fp + fn + tp)
 
-        # Array of per class precisions? 
-        score =  tp / (tp + fn)
+def online_accuracy(y_true: np.ndarray, y_pred: np.ndarray, times: np.ndarray, n_classes: int, average: str = None):
+    """
+    Computes the accuracy where every prediction is weighted by its duration.
 
-        # Normalize by each class by its 
-        normalized_score = (score*(1/n_classes)).sum(-1)
-        return normalized_score
+    Every prediction lasts until the next prediction and the last prediction
+    lasts the mean duration of the predictions with the same true class.
 
+    Parameters
+    ----------
+    y_true : np.ndarray of shape (N,) or (N, 1)
+        The encoded true classes.
+    y_pred : np.ndarray of shape (N,) or (N, 1)
+        The encoded predicted classes.
+    times : np.ndarray of shape (N,) or (N, 1)
+        The sorted times of the predictions.
+    n_classes : int
+        The number of classes.
+    average : str one of [None, 'micro', 'macro', 'weighted'], default=None
+        None returns the accuracy of each class. 'micro' is the fraction of the
+        total duration that was predicted correctly. Since the durations of the
+        classes sum up to the total duration, 'weighted' is identical to 'micro'.
+        'macro' is the mean accuracy of the classes with a true duration.
 
-def online_confusion_matrix(y_true: np.ndarray, y_pred: np.ndarray, times: np.ndarray, 
+    Returns
+    -------
+    score : float or np.ndarray of shape (n_classes,)
+    """
+    acc = OnlineConfusionAccumulator(n_classes)
+    return acc.update(y_true, y_pred, times).compute(average)
+
+
+def online_confusion_matrix(y_true: np.ndarray, y_pred: np.ndarray, times: np.ndarray,
                             n_classes: int, average=''):
     """
     Rows are predictions and columns are true values
     c_ij = predicted class is i at i-th row and true class j
 
+    The last prediction lasts the mean duration of the predictions with the
+    same true class.
+
     Returns
     -------
     cm : pd.DataFrame
+        A full n_classes x n_classes matrix of durations.
 
     """
-    # TODO refactor, check why y_true has shape (N, 1)
-    y_true, y_pred, times = y_true.squeeze(), y_pred.squeeze(), times.squeeze()
-
-    df = pd.DataFrame(data=[y_true, y_pred, times], index=['y_true', 'y_pred', 'times']).T
-    df['times'] = pd.to_datetime(df['times'])
-    df['diff'] = df['times'].shift(-1) - df['times']
-
-    # Impute last unknown time difference with mean
-    last_activity = df.at[df.shape[0]-1, 'y_true']
-    last_act_mean = df.groupby(y_true).mean().at[last_activity, 'diff']
-    df.at[df.shape[0]-1, 'diff'] = last_act_mean
-
-    cm = pd.crosstab(index=df['y_pred'], columns=df['y_true'], values=df['diff'], aggfunc=np.sum)
-    cm = cm.replace({pd.NaT: pd.Timedelta('0s')})
-
-    missing_row = set(cm.columns) - set(cm.index)
-    missing_col = set(cm.index) - set(cm.columns)
-    if missing_row:
-        # y_pred did not contain classes present in y_true
-        for m_row in missing_row:
-            new_row = pd.Series(name=m_row, 
-                                data=[pd.Timedelta('0s')]*len(cm.columns), 
-                                index=cm.columns
-            )
-            cm = pd.concat([cm, new_row.to_frame().T], axis=0)
-
-    if missing_col:
-        # y_true did not contain classes present in y_pred
-        for m_col in missing_col:
-            new_col = pd.Series(name=m_col, 
-                                data=[pd.Timedelta('0s')]*len(cm.rows), 
-                                index=cm.rows
-            )
-            cm = pd.concat([cm, new_col.to_frame().T], axis=1)
-
-        # TODO if this happens check if it works
-        raise NotImplementedError
-
-    # Rearange columns and for diagonal to again matchup 
-    # when col or row was inserted above
-    cm = cm.sort_index(ascending=True)
-    cm = cm[cm.index.values]
-
-    return cm 
\ No newline at end of file
+    acc = OnlineConfusionAccumulator(n_classes)
+    return acc.update(y_true, y_pred, times).confusion_matrix()
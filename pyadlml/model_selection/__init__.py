@@ -1 +1,2 @@
-from ._split import train_test_split, TimeSeriesSplit, LeaveKDayOutSplit, CrossValSelector
\ No newline at end of file
+from ._split import train_test_split, TimeSeriesSplit, LeaveKDayOutSplit, CrossValSelector
+from ._search import GridSearchCV, HalvingTimeSearchCV
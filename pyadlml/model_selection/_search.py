@@ -2,26 +2,32 @@ import numbers
 import time
 import warnings
 from abc import ABCMeta, abstractmethod
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from contextlib import suppress
 from functools import partial
 from traceback import format_exc
 import numpy as np
+import pandas as pd
 
+import joblib
 from joblib import Parallel, delayed, logger
 from itertools import product
+from math import ceil, floor, log
 from sklearn.base import MetaEstimatorMixin, BaseEstimator, is_classifier, clone
 from sklearn.exceptions import NotFittedError, FitFailedWarning
 from sklearn.metrics import check_scoring
 from sklearn.metrics._scorer import _check_multimetric_scoring, _MultimetricScorer
 from sklearn.model_selection import check_cv
 from sklearn.model_selection._search import ParameterGrid, _normalize_score_results
+from sklearn.model_selection._search_successive_halving import _top_k
 from sklearn.model_selection._validation import _aggregate_score_dicts, _score
 from sklearn.utils import _message_with_time, _safe_indexing
 from sklearn.utils.metaestimators import if_delegate_has_method# ,_safe_split
 from sklearn.utils.validation import check_is_fitted, indexable, _check_fit_params, _num_samples
 
 from pyadlml.pipeline import EvalOnlyWrapper, TrainOnlyWrapper, Pipeline, TrainOrEvalOnlyWrapper
+from pyadlml.constants import TIME
+from pyadlml.model_selection._split import CrossValSelector, IndexRanges, _range_length
 from sklearn.model_selection._search import BaseSearchCV as SklearnBaseSearchCV
 
 class BaseSearchCV(SklearnBaseSearchCV):
@@ -30,7 +36,7 @@ class BaseSearchCV(SklearnBaseSearchCV):
 
     @abstractmethod
     def __init__(self, estimator, *, scoring=None, n_jobs=None,
-                 online_train_val_split=False,
+                 online_train_val_split=False, share_transforms=True,
                  refit=True, cv=None, verbose=0,
                  pre_dispatch='2*n_jobs', error_score=np.nan,
                  return_train_score=True):
@@ -41,6 +47,7 @@ class BaseSearchCV(SklearnBaseSearchCV):
                  return_train_score=return_train_score)
 
         self.online_train_val_split = online_train_val_split
+        self.share_transforms = share_transforms
 
     def score(self, X, y=None):
         """Returns the score on the given data, if the estimator has been refit.
@@ -229,6 +236,9 @@ class BaseSearchCV(SklearnBaseSearchCV):
                                     error_score=self.error_score,
                                     verbose=self.verbose)
         results = {}
+        share_transforms = self.online_train_val_split and self.share_transforms \
+            and isinstance(base_estimator, Pipeline) and len(base_estimator.steps) > 1
+
         with parallel:
             all_candidate_params = []
             all_out = []
@@ -245,7 +255,13 @@ class BaseSearchCV(SklearnBaseSearchCV):
                           " totalling {2} fits".format(
                               n_splits, n_candidates, n_candidates * n_splits))
 
-                if self.online_train_val_split:
+                if share_transforms:
+                    out = _fit_and_score_shared(
+                        parallel, base_estimator, X, y,
+                        candidate_params=candidate_params,
+                        splits=list(cv.split(X, None, groups)),
+                        **fit_and_score_kwargs)
+                elif self.online_train_val_split:
                     can = enumerate(candidate_params)
                     spl = enumerate(cv.split(X, None, groups))
                     lst = []
@@ -334,8 +350,8 @@ class BaseSearchCV(SklearnBaseSearchCV):
                    self.best_index_ >= len(results["params"])):
                     raise IndexError('best_index_ index out of range')
             else:
-                self.best_index_ = results["rank_test_%s"
-                                           % refit_metric].argmin()
+                self.best_index_ = self._select_best_index(
+                    self.refit, refit_metric, results)
                 self.best_score_ = results["mean_test_%s" % refit_metric][
                                            self.best_index_]
             self.best_params_ = results["params"][self.best_index_]
@@ -351,11 +367,7 @@ class BaseSearchCV(SklearnBaseSearchCV):
                 self.best_estimator_.train()
                 # set the cross val splitter training range to the whole dataset
                 if self.online_train_val_split:
-                    for estim in self.best_estimator_:
-                        if isinstance(estim, CrossValSplitter) and isinstance(estim, TrainOnlyWrapper):
-                            tmp = np.arange(len(X))
-                            estim.set_range(tmp)
-                            break
+                    _set_train_val_ranges(self.best_estimator_, np.arange(len(X)))
 
             if y is not None:
                 self.best_estimator_.fit(X, y, **fit_params)
@@ -377,16 +389,29 @@ class BaseSearchCV(SklearnBaseSearchCV):
 
 class GridSearchCV(BaseSearchCV):
     """Exhaustive search over specified parameter values for an estimator.
+
+    When the folds are selected inside a pipeline (``online_train_val_split=True``)
+    the candidates are grouped by the parameters of the transformer steps. Each
+    group transforms a fold once and only the final estimator is fitted per
+    candidate.
+
+    Parameters
+    ----------
+    share_transforms : bool, default=True
+        Whether candidates that only differ in parameters of the final estimator
+        share the transformed folds. Only used with ``online_train_val_split``.
     """
     _required_parameters = ["estimator", "param_grid"]
 
     def __init__(self, estimator, param_grid, *, online_train_val_split=False,
+                 share_transforms=True,
                  scoring=None, n_jobs=None, refit=True, cv=None,
                  verbose=0, pre_dispatch='2*n_jobs',
                  error_score=np.nan, return_train_score=False):
         super().__init__(
             estimator=estimator, scoring=scoring,
             online_train_val_split=online_train_val_split,
+            share_transforms=share_transforms,
             n_jobs=n_jobs, refit=refit, cv=cv, verbose=verbose,
             pre_dispatch=pre_dispatch, error_score=error_score,
             return_train_score=return_train_score)
@@ -398,6 +423,163 @@ class GridSearchCV(BaseSearchCV):
         evaluate_candidates(ParameterGrid(self.param_grid))
 
 
+class HalvingTimeSearchCV(BaseSearchCV):
+    """Search over specified parameter values with successive halving on days.
+
+    The number of recorded days is the resource. The first round evaluates all
+    candidates with the training range of every fold restricted to its most
+    recent *min_days* days. After each round only the best ``1/factor`` of the
+    candidates are kept and the number of days is multiplied by *factor*, such
+    that the last round trains the remaining candidates on the full training
+    ranges. The validation ranges are never restricted, hence the scores of all
+    rounds are comparable.
+
+    The folds may be given as indices or, together with ``online_train_val_split``,
+    as time ranges that are selected by the ``CrossValSelector`` steps of the
+    pipeline.
+
+    Parameters
+    ----------
+    factor : int, default=3
+        The proportion of candidates that are kept after each round and the
+        rate at which the number of days grows.
+    min_days : int or 'exhaust', default='exhaust'
+        The number of days every candidate is trained on in the first round.
+        When 'exhaust' the number is chosen such that the last round uses the
+        full training ranges.
+    max_days : int or 'auto', default='auto'
+        The maximum number of days. Defaults to the number of recorded days.
+    share_transforms : bool, default=True
+        Whether candidates that only differ in parameters of the final estimator
+        share the transformed folds. Only used with ``online_train_val_split``.
+
+    Attributes
+    ----------
+    n_days_ : list of int
+        The number of days used in each round.
+    n_candidates_ : list of int
+        The number of candidates evaluated in each round.
+    n_iterations_ : int
+        The number of rounds.
+    round_times_ : list of float
+        The seconds spent on each round. The ``cv_results_`` contain the round
+        as ``iter``, its number of days as ``n_days`` and its duration as ``round_time``.
+
+    Examples
+    --------
+    >>> from pyadlml.model_selection import HalvingTimeSearchCV, LeaveKDayOutSplit
+    >>> search = HalvingTimeSearchCV(pipe, param_grid, cv=LeaveKDayOutSplit(n_splits=3),
+    ...                              online_train_val_split=True, factor=2)
+    >>> search.fit(df_devs, df_acts)
+    """
+    _required_parameters = ["estimator", "param_grid"]
+
+    def __init__(self, estimator, param_grid, *, factor=3, min_days='exhaust',
+                 max_days='auto', online_train_val_split=False,
+                 share_transforms=True,
+                 scoring=None, n_jobs=None, refit=True, cv=None,
+                 verbose=0, pre_dispatch='2*n_jobs',
+                 error_score=np.nan, return_train_score=False):
+        super().__init__(
+            estimator=estimator, scoring=scoring,
+            online_train_val_split=online_train_val_split,
+            share_transforms=share_transforms,
+            n_jobs=n_jobs, refit=refit, cv=cv, verbose=verbose,
+            pre_dispatch=pre_dispatch, error_score=error_score,
+            return_train_score=return_train_score)
+        self.param_grid = param_grid
+        self.factor = factor
+        self.min_days = min_days
+        self.max_days = max_days
+        _check_param_grid(param_grid)
+
+    def _check_input_parameters(self, X):
+        if not isinstance(self.scoring, (str, type(None))) and not callable(self.scoring):
+            raise ValueError('Successive halving supports only a single metric.')
+        if not isinstance(self.factor, numbers.Integral) or self.factor < 2:
+            raise ValueError(f'The factor has to be an integer greater than 1. Got {self.factor}.')
+        if not isinstance(X, pd.DataFrame) or TIME not in X.columns:
+            raise ValueError(f"X has to be a dataframe with a column '{TIME}'.")
+
+        self._sample_days = X[TIME].dt.floor('D').values
+        self.max_days_ = len(np.unique(self._sample_days)) \
+            if self.max_days == 'auto' else self.max_days
+        self.min_days_ = 1 if self.min_days == 'exhaust' else self.min_days
+        if not 0 < self.min_days_ <= self.max_days_:
+            raise ValueError(f'The number of days has to satisfy 0 < min_days <= max_days. '
+                             f'Got min_days={self.min_days_} and max_days={self.max_days_}.')
+
+    def fit(self, X, y=None, *, groups=None, **fit_params):
+        """Run successive halving with all sets of parameters.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            The device dataframe. The days are counted by the column 'time'.
+        y : array-like, default=None
+            Target relative to X.
+        groups : array-like of shape (n_samples,), default=None
+            Group labels for the samples used while splitting the dataset into
+            train/test set.
+        **fit_params : dict of str -> object
+            Parameters passed to the ``fit`` method of the estimator
+        """
+        self._check_input_parameters(X)
+        self._cv_orig = check_cv(self.cv, y, classifier=is_classifier(self.estimator))
+        self.round_times_ = []
+        super().fit(X, y, groups=groups, **fit_params)
+        self.cv_results_['round_time'] = np.asarray(self.round_times_)[self.cv_results_['iter']]
+        del self._sample_days
+        return self
+
+    def _run_search(self, evaluate_candidates):
+        """Search the candidates in rounds of increasing days"""
+        candidate_params = list(ParameterGrid(self.param_grid))
+
+        # The last required round evaluates less than *factor* candidates
+        n_required_iterations = 1 + floor(log(len(candidate_params), self.factor))
+        if self.min_days == 'exhaust':
+            self.min_days_ = max(self.min_days_,
+                                 self.max_days_ // self.factor**(n_required_iterations - 1))
+        n_possible_iterations = 1 + floor(log(self.max_days_ // self.min_days_, self.factor))
+        self.n_iterations_ = min(n_possible_iterations, n_required_iterations)
+
+        self.n_days_ = []
+        self.n_candidates_ = []
+        for itr in range(self.n_iterations_):
+            n_days = min(int(self.factor**itr*self.min_days_), self.max_days_)
+            if itr == self.n_iterations_ - 1:
+                # The remaining candidates are trained on the full training ranges
+                n_days = self.max_days_
+            n_candidates = len(candidate_params)
+            self.n_days_.append(n_days)
+            self.n_candidates_.append(n_candidates)
+
+            if self.verbose:
+                print(f'iter: {itr}, n_candidates: {n_candidates}, n_days: {n_days}')
+
+            cv = _DaySubsampleSplitter(self._cv_orig, n_days, self._sample_days)
+            more_results = {
+                'iter': [itr]*n_candidates,
+                'n_days': [n_days]*n_candidates,
+            }
+            start_time = time.time()
+            results = evaluate_candidates(candidate_params, cv, more_results=more_results)
+            self.round_times_.append(time.time() - start_time)
+
+            candidate_params = _top_k(results, ceil(n_candidates/self.factor), itr)
+
+    @staticmethod
+    def _select_best_index(refit, refit_metric, results):
+        """ Selects the best candidate of the last round.
+        """
+        last_iter_indices = np.flatnonzero(results['iter'] == np.max(results['iter']))
+        test_scores = results['mean_test_score'][last_iter_indices]
+        if np.isnan(test_scores).all():
+            return last_iter_indices[0]
+        return last_iter_indices[np.nanargmax(test_scores)]
+
+
 
 def _fit_and_score(estimator, X, y, scorer, train, test, verbose,
                    parameters, fit_params, return_train_score=False,
@@ -518,26 +700,7 @@ def _fit_and_score(estimator, X, y, scorer, train, test, verbose,
 
     if online_train_val_split:
         # inject the train and test data into the corresponding Subset selectors
-        set_train_estim = False
-        set_test_estim = False
-        for estim in estimator:
-            if set_train_estim and set_test_estim:
-                break
-            if isinstance(estim, CrossValSplitter) and isinstance(estim, EvalOnlyWrapper):
-                estim.set_range(test)
-                set_test_estim = True
-            if isinstance(estim, CrossValSplitter) and isinstance(estim, TrainOnlyWrapper):
-                estim.set_range(train)
-                set_train_estim = True
-            # TODO delete unti 906 above
-            if isinstance(estim, CVOnlineSplitter) and isinstance(estim, TrainOrEvalOnlyWrapper):
-                estim.set_train_range(train)
-                estim.set_test_range(test)
-                set_train_estim = True
-                set_test_estim = True
-                break
-        if not set_train_estim or not set_test_estim:
-            raise ValueError("when specifying online learning a KeepTrain and KeepTest have to be in the pipeline")
+        _set_train_val_ranges(estimator, train, test)
     else:
         X_train, y_train = _safe_split(estimator, X, y, train)
         X_test, y_test = _safe_split(estimator, X, y, test, train)
@@ -574,7 +737,7 @@ def _fit_and_score(estimator, X, y, scorer, train, test, verbose,
                           (error_score, format_exc()),
                           FitFailedWarning)
         result["fit_failed"] = True
-        y_sample_len = len(test)
+        y_sample_len = _range_length(test)
     else:
         result["fit_failed"] = False
 
@@ -601,10 +764,10 @@ def _fit_and_score(estimator, X, y, scorer, train, test, verbose,
             if online_train_val_split:
                 estimator.train()
 
-                _, y_prime = estimator[:-1].transform(X, y)
+                X_prime, y_prime = estimator[:-1].transform(X, y)
                 if isinstance(y_prime, pd.DataFrame) and len(y_prime.columns) == 1:
                     y_prime = y_prime.T.values.squeeze()
-                train_scores = _score(estimator, X, y_prime, scorer)
+                train_scores = _score(estimator[-1], X_prime, y_prime, scorer)
 
                 estimator.eval()
             else:
@@ -722,7 +885,14 @@ def _safe_split(estimator, X, y, indices, train_indices=None):
         Indexed targets.
 
     """
+    # Ranges are concatenated without their offsets, which only a CrossValSelector applies
+    if isinstance(indices, IndexRanges):
+        indices = indices.to_indices()
     if _is_pairwise(estimator):
+        if isinstance(indices, slice):
+            indices = np.arange(indices.start, indices.stop)
+        if isinstance(train_indices, slice):
+            train_indices = np.arange(train_indices.start, train_indices.stop)
         if not hasattr(X, "shape"):
             raise ValueError("Precomputed kernels or affinity matrices have "
                              "to be passed as arrays or sparse matrices.")
@@ -741,4 +911,281 @@ def _safe_split(estimator, X, y, indices, train_indices=None):
     else:
         y_subset = None
 
-    return X_subset, y_subset
\ No newline at end of file
+    return X_subset, y_subset
+
+def _is_pairwise(estimator):
+    """ Returns whether the estimator expects a precomputed kernel as input.
+    """
+    return getattr(estimator, '_get_tags', lambda: {})().get('pairwise', False)
+
+
+def _check_param_grid(param_grid):
+    """ Raises an error if the parameter grid is malformed.
+    """
+    ParameterGrid(param_grid)
+
+
+def _set_train_val_ranges(estimator, train, test=None):
+    """ Injects the fold into the CrossValSelector steps that are only active
+    in train or eval mode.
+
+    Parameters
+    ----------
+    estimator : Pipeline
+    train : array-like
+        The training range.
+    test : array-like, optional
+        The validation range. Is not set when omitted.
+    """
+    set_train_estim = False
+    set_test_estim = test is None
+    for estim in estimator:
+        if isinstance(estim, CrossValSelector) and isinstance(estim, TrainOnlyWrapper):
+            estim.wr.data_range = train
+            set_train_estim = True
+        elif isinstance(estim, CrossValSelector) and isinstance(estim, EvalOnlyWrapper) \
+                and test is not None:
+            estim.wr.data_range = test
+            set_test_estim = True
+    if not set_train_estim or not set_test_estim:
+        raise ValueError("when specifying online learning a KeepTrain and KeepTest have to be in the pipeline")
+
+
+def _split_params(estimator, parameters):
+    """ Splits candidate parameters into the parameters of the transformer steps
+    and the parameters of the final estimator.
+    """
+    final_name = estimator.steps[-1][0]
+    prefix, suffix = {}, {}
+    for key, value in parameters.items():
+        if key.split('__', 1)[0] == final_name:
+            suffix[key] = value
+        else:
+            prefix[key] = value
+    return prefix, suffix
+
+
+def _error_scores(scorer, error_score, return_train_score):
+    if error_score == 'raise':
+        raise
+    warnings.warn("Estimator fit failed. The score on this train-test"
+                  " partition for these parameters will be set to %f. "
+                  "Details: \n%s" % (error_score, format_exc()),
+                  FitFailedWarning)
+    if isinstance(scorer, dict):
+        test_scores = {name: error_score for name in scorer}
+    else:
+        test_scores = error_score
+    train_scores = test_scores.copy() if isinstance(test_scores, dict) else test_scores
+    return test_scores, (train_scores if return_train_score else None)
+
+
+def _transform_fold(estimator, X, y, train, test, prefix_params, fit_params):
+    """ Fits the transformer steps on the training range of a fold and transforms
+    the training and the validation range.
+
+    Returns
+    -------
+    transformed : tuple
+        (X_train, y_train, X_val, y_val, fit_time)
+    """
+    if prefix_params:
+        estimator.set_params(**{k: clone(v, safe=False) for k, v in prefix_params.items()})
+    _set_train_val_ranges(estimator, train, test)
+
+    start_time = time.time()
+    estimator.train()
+    fit_params_steps = estimator._check_fit_params(**fit_params)
+    X_train, y_train = estimator._fit(X, y, **fit_params_steps)
+    fit_time = time.time() - start_time
+
+    estimator.eval()
+    X_val, y_val = estimator[:-1].transform(X, y)
+    return X_train, y_train, X_val, y_val, fit_time
+
+
+def _fit_and_score_prefix(estimator, X, y, scorer, train, test, prefix_params,
+                          suffix_params, fit_params, return_train_score=False,
+                          return_n_test_samples=False, return_times=False,
+                          return_parameters=False, error_score=np.nan, verbose=0):
+    """ Evaluates all candidates that share the parameters of the transformer steps
+    on one fold.
+
+    The transformer steps are fitted once and only the final estimator is fitted
+    for each candidate.
+
+    Returns
+    -------
+    results : list of dict
+        One result per candidate as returned by ``_fit_and_score``.
+    """
+    fit_params = fit_params if fit_params is not None else {}
+    final_name = estimator.steps[-1][0]
+
+    try:
+        transformed = _transform_fold(clone(estimator), X, y, train, test,
+                                      prefix_params, fit_params)
+        prefix_time = transformed[-1]
+    except Exception:
+        test_scores, train_scores = _error_scores(scorer, error_score, return_train_score)
+        transformed, prefix_time = None, 0.
+    X_train, y_train, X_val, y_val, _ = transformed if transformed is not None \
+        else (None,)*5
+
+    results = []
+    for params in suffix_params:
+        result = {}
+        start_time = time.time()
+        if transformed is None:
+            result["fit_failed"] = True
+            fit_time, score_time, n_test_samples = 0., 0., _range_length(test)
+        else:
+            n_test_samples = len(y_val)
+            try:
+                est = clone(estimator)
+                if params:
+                    est.set_params(**{k: clone(v, safe=False) for k, v in params.items()})
+                final = est.steps[-1][1]
+                final_fit_params = est._check_fit_params(**fit_params)[final_name]
+                final.fit(X_train, y_train, **final_fit_params)
+            except Exception:
+                test_scores, train_scores = _error_scores(scorer, error_score, return_train_score)
+                result["fit_failed"] = True
+                fit_time = time.time() - start_time
+                score_time = 0.
+            else:
+                result["fit_failed"] = False
+                fit_time = time.time() - start_time
+                test_scores = _score(final, X_val, y_val, scorer, error_score)
+                score_time = time.time() - start_time - fit_time
+                if return_train_score:
+                    train_scores = _score(final, X_train, y_train, scorer, error_score)
+
+        # The transformer steps are fitted once for the whole group
+        fit_time += prefix_time/len(suffix_params)
+
+        result["test_scores"] = test_scores
+        if return_train_score:
+            result["train_scores"] = train_scores
+        if return_n_test_samples:
+            result["n_test_samples"] = n_test_samples
+        if return_times:
+            result["fit_time"] = fit_time
+            result["score_time"] = score_time
+        if return_parameters:
+            result["parameters"] = {**prefix_params, **params}
+        results.append(result)
+
+    return results
+
+
+def _fit_and_score_shared(parallel, base_estimator, X, y, candidate_params, splits,
+                          **fit_and_score_kwargs):
+    """ Evaluates candidates for every split where each transformed fold is computed
+    once per group of candidates with equal parameters for the transformer steps.
+
+    Returns
+    -------
+    out : list of dict
+        The results ordered by candidate and split like ``product(candidates, splits)``.
+    """
+    groups = OrderedDict()
+    for cand_idx, parameters in enumerate(candidate_params):
+        prefix, suffix = _split_params(base_estimator, parameters)
+        key = joblib.hash(prefix)
+        if key not in groups:
+            groups[key] = (prefix, [], [])
+        groups[key][1].append(cand_idx)
+        groups[key][2].append(suffix)
+
+    fit_and_score_kwargs = dict(fit_and_score_kwargs)
+    fit_and_score_kwargs.pop('split_progress', None)
+    fit_and_score_kwargs.pop('candidate_progress', None)
+    fit_and_score_kwargs.pop('return_estimator', None)
+
+    tasks, jobs = [], []
+    for group_key, (prefix, cand_idxs, suffixes) in groups.items():
+        for split_idx, (train, test) in enumerate(splits):
+            tasks.append((cand_idxs, split_idx))
+            jobs.append(delayed(_fit_and_score_prefix)(
+                clone(base_estimator), X, y,
+                train=train, test=test,
+                prefix_params=prefix,
+                suffix_params=suffixes,
+                **fit_and_score_kwargs))
+
+    n_splits = len(splits)
+    out = [None]*(len(candidate_params)*n_splits)
+    for (cand_idxs, split_idx), results in zip(tasks, parallel(jobs)):
+        for cand_idx, result in zip(cand_idxs, results):
+            out[cand_idx*n_splits + split_idx] = result
+    return out
+
+
+def _restrict_to_days(train, n_days, sample_days):
+    """ Restricts a training range to its most recent *n_days* days.
+
+    Parameters
+    ----------
+    train : array-like of int, slice, IndexRanges or tuple
+        Either positions or a time interval (st, et) or two intervals ((st1, et1), (st2, et2)).
+    n_days : int
+    sample_days : np.ndarray of datetime64
+        The day of every sample.
+
+    Returns
+    -------
+    train : array-like of int, slice, IndexRanges or tuple
+    """
+    if isinstance(train, IndexRanges):
+        # The most recent days are taken from the last ranges
+        ranges, offsets = [], []
+        for rng, offset in zip(reversed(train), reversed(train.offsets)):
+            n_rng_days = len(np.unique(sample_days[rng]))
+            ranges.insert(0, _restrict_to_days(rng, n_days, sample_days))
+            offsets.insert(0, offset)
+            n_days -= n_rng_days
+            if n_days <= 0:
+                break
+        return IndexRanges(ranges, offsets)
+
+    if isinstance(train, slice):
+        # The days of a contiguous range of sorted samples are sorted
+        days = sample_days[train]
+        uniq_days = np.unique(days)
+        if len(uniq_days) <= n_days:
+            return train
+        return slice(train.start + int(np.searchsorted(days, uniq_days[-n_days])), train.stop)
+
+    if isinstance(train, tuple):
+        budget = pd.Timedelta(days=n_days)
+        if not isinstance(train[0], tuple):
+            st, et = train
+            return (max(st, et - budget), et)
+        (st1, et1), (st2, et2) = train
+        if et2 - st2 >= budget:
+            return (et2 - budget, et2)
+        return ((max(st1, et1 - (budget - (et2 - st2))), et1), (st2, et2))
+
+    train = np.asarray(train)
+    days = sample_days[train]
+    uniq_days = np.unique(days)
+    if len(uniq_days) <= n_days:
+        return train
+    return train[days >= uniq_days[-n_days]]
+
+
+class _DaySubsampleSplitter():
+    """ Restricts the training ranges of a cross-validator to a number of days.
+    """
+    def __init__(self, base_cv, n_days, sample_days):
+        self.base_cv = base_cv
+        self.n_days = n_days
+        self.sample_days = sample_days
+
+    def get_n_splits(self, X=None, y=None, groups=None):
+        return self.base_cv.get_n_splits(X, y, groups)
+
+    def split(self, X, y=None, groups=None):
+        for train, test in self.base_cv.split(X, y, groups):
+            yield _restrict_to_days(train, self.n_days, self.sample_days), test
@@ -6,6 +6,7 @@ from sklearn.model_selection._split import _BaseKFold
 from pyadlml.constants import ACTIVITY, TIME, START_TIME, END_TIME, DEVICE, VALUE
 from sklearn.model_selection import TimeSeriesSplit as SklearnTSSplit, KFold as SklearnKFold
 from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils import _safe_indexing
 from pyadlml.dataset._core.activities import is_activity_df
 
 from pyadlml.dataset.util import df_difference, get_last_states, select_timespan
@@ -267,14 +268,95 @@ def _split_acts(df_acts : pd.DataFrame, rnd_day, temporal : bool =False) -> list
         return idxs_train, idxs_test
 
 
+class IndexRanges(tuple):
+    """ Contiguous index ranges that together form the training set of a fold.
+
+    A :class:`CrossValSelector` selects every range and moves its times by the
+    respective offset before the ranges are concatenated. Thereby the gap that
+    the left out days create is closed without copying the data in advance.
+
+    Parameters
+    ----------
+    ranges : list of slice
+    offsets : list of pd.Timedelta, optional
+        Defaults to no offset for every range.
+    """
+    def __new__(cls, ranges, offsets=None):
+        self = super().__new__(cls, ranges)
+        self.offsets = tuple(pd.Timedelta(0) for _ in ranges) if offsets is None \
+            else tuple(pd.Timedelta(o) for o in offsets)
+        return self
+
+    def __reduce__(self):
+        return (self.__class__, (tuple(self), self.offsets))
+
+    def __repr__(self):
+        return f'IndexRanges({list(self)}, offsets={list(self.offsets)})'
+
+    def to_indices(self) -> np.ndarray:
+        """ Returns the positions of all ranges.
+        """
+        return np.concatenate([np.arange(r.start, r.stop) for r in self])
+
+
+def _range_length(rng) -> int:
+    """ Returns the number of samples in a fold range.
+    """
+    if isinstance(rng, slice):
+        return rng.stop - rng.start
+    if isinstance(rng, IndexRanges):
+        return sum(r.stop - r.start for r in rng)
+    return len(rng)
+
+
+def _sorted_times(X: pd.DataFrame) -> np.ndarray:
+    """ Returns the time column as array and asserts that it is sorted.
+    """
+    if not X[TIME].is_monotonic_increasing:
+        raise ValueError('The devices have to be sorted by time to be split.')
+    return X[TIME].values
+
+
+def _open_intervals(times, lower, upper) -> list:
+    """ Returns for each interval (lower, upper) the range of positions of the
+    times strictly within the interval.
+    """
+    lower = np.asarray(pd.DatetimeIndex(lower).values, dtype=times.dtype)
+    upper = np.asarray(pd.DatetimeIndex(upper).values, dtype=times.dtype)
+    starts = np.searchsorted(times, lower, side='right')
+    stops = np.searchsorted(times, upper, side='left')
+    return [slice(int(st), int(max(st, sp))) for st, sp in zip(starts, stops)]
+
+
+def _select_index_ranges(X, y, ranges):
+    """ Selects and concatenates the ranges after moving their times by the offsets.
+    """
+    def concat(parts):
+        if isinstance(parts[0], (pd.DataFrame, pd.Series)):
+            return pd.concat(parts)
+        return np.concatenate(parts)
+
+    X_parts, y_parts = [], []
+    for rng, offset in zip(ranges, ranges.offsets):
+        X_rng = _safe_indexing(X, rng)
+        if offset != pd.Timedelta(0):
+            X_rng = X_rng.copy()
+            X_rng[TIME] = X_rng[TIME] + offset
+        X_parts.append(X_rng)
+        if y is not None:
+            y_parts.append(_safe_indexing(y, rng))
+    return concat(X_parts), (concat(y_parts) if y is not None else None)
+
+
 class CrossValSelector(BaseEstimator, TransformerMixin, XAndYTransformer):
     """ Selects the subset from the whole dataset based on a given data_range.
 
     Attributes
     ----------
-    data_range  : list of either indices or tupel of timestamps
+    data_range  : slice, IndexRanges, list of indices or tupel of timestamps
         When the data_range is a tupel of timestamps, the range is seen as an interval
-        half open to the right (st, et)
+        half open to the right (st, et). The times of :class:`IndexRanges` are
+        moved by their offsets.
     y : boolean, default=False
         Only
 
@@ -299,8 +381,11 @@ class CrossValSelector(BaseEstimator, TransformerMixin, XAndYTransformer):
         assert self.data_range is not None, error_msg
 
         # determine whether the splits are made based on index ranges or timestamp tuples
-        sample = self._extract_first_sample(self.data_range)
-        self.is_temporal_split_ = not (isinstance(sample, int) or isinstance(sample, np.int64))
+        if isinstance(self.data_range, (slice, IndexRanges)):
+            self.is_temporal_split_ = False
+        else:
+            sample = self._extract_first_sample(self.data_range)
+            self.is_temporal_split_ = not (isinstance(sample, int) or isinstance(sample, np.int64))
 
         return self
 
@@ -317,6 +402,10 @@ class CrossValSelector(BaseEstimator, TransformerMixin, XAndYTransformer):
         X : pd.DataFrame
             Has to have one column named 'time' if the split is temporal.
         """
+        # The selector is skipped during fit when it is only active in eval mode
+        if not hasattr(self, 'is_temporal_split_'):
+            self.fit(X, y)
+
         # Case when x and y are activity and device dataframes
         if self.is_temporal_split_:
             # 1. case for |-sel-|-other-| or |-other-|-sel-|
@@ -358,8 +447,11 @@ class CrossValSelector(BaseEstimator, TransformerMixin, XAndYTransformer):
 
             return X_sel, y_sel
 
+        elif isinstance(self.data_range, IndexRanges):
+            return _select_index_ranges(X, y, self.data_range)
         else:
-            X, y = self._safe_split(None, X, y, self.data_range)
+            X = _safe_indexing(X, self.data_range)
+            y = _safe_indexing(y, self.data_range) if y is not None else None
             return X, y
 
 
@@ -413,31 +505,27 @@ class TimeSeriesSplit(_BaseKFold):
         assert self.max_train_size is None or isinstance(self.max_train_size, pd.Timedelta)
         assert self.test_size is None or isinstance(self.test_size, pd.Timedelta)
 
-        data_start = X[TIME].iloc[0]
-        data_end = X[TIME].iloc[-1]
+        times = _sorted_times(X)
+        data_start = pd.Timestamp(times[0])
+        data_end = pd.Timestamp(times[-1])
         n_folds = self.n_splits + 1 # |--|--|--|--|  k=3
         test_size = self.test_size if self.test_size is not None \
             else (data_end - data_start) // n_folds
 
         test_starts = pd.date_range(data_end - self.n_splits*test_size, data_end, freq=test_size)[:-1]
+        train_ets = test_starts - self.gap - self.EPS
+        test_ets = test_starts + test_size
+        train_sts = [train_et - self.max_train_size
+                     if self.max_train_size and self.max_train_size < train_et - data_start
+                     else data_start - self.EPS for train_et in train_ets]
 
-        res_lst = []
-        for test_st in test_starts:
-            train_et = test_st - self.gap - self.EPS
-            test_et = test_st + test_size
-
-            if self.max_train_size and self.max_train_size < train_et:
-                train_st = train_et - self.max_train_size
-            else:
-                train_st = data_start - self.EPS
+        if self.return_timestamp:
+            return [((train_st, train_et), (test_st, test_et)) for train_st, train_et, test_st, test_et
+                    in zip(train_sts, train_ets, test_starts, test_ets)]
 
-            if self.return_timestamp:
-                res_lst.append(((train_st, train_et), (test_st, test_et)))
-            else:
-                train_idx = X[(train_st < X[TIME]) & (X[TIME] < train_et)].index.values
-                test_idx = X[(test_st < X[TIME]) & (X[TIME] < test_et)].index.values
-                res_lst.append((train_idx, test_idx))
-        return res_lst
+        # All folds are located at once on the sorted times
+        return list(zip(_open_intervals(times, train_sts, train_ets),
+                        _open_intervals(times, test_starts, test_ets)))
 
 
     def _index_split(self, X, y, groups):
@@ -464,27 +552,28 @@ class TimeSeriesSplit(_BaseKFold):
                 (f"Too many splits={n_splits} for number of samples"
                  f"={n_samples} with test_size={test_size} and gap={gap}."))
 
-        indices = np.arange(n_samples)
         test_starts = range(n_samples - n_splits * test_size,
                             n_samples, test_size)
+        if self.return_timestamp:
+            times = X[TIME].values
         res_lst = []
         for test_start in test_starts:
             train_end = test_start - gap
             if self.max_train_size and self.max_train_size < train_end:
-                train_idxs = indices[train_end - self.max_train_size:train_end]  # sliding window
+                train_idxs = slice(train_end - self.max_train_size, train_end)  # sliding window
             else:
-                train_idxs = indices[:train_end]  # expanding window
-            test_idxs = indices[test_start:test_start + test_size]
+                train_idxs = slice(0, train_end)  # expanding window
+            test_idxs = slice(test_start, test_start + test_size)
 
             # own implementation addition
             if not self.return_timestamp:
                 res_lst.append((train_idxs, test_idxs))
             else:
-                train_st = X.iloc[train_idxs[0]][TIME] - self.EPS
-                train_et = X.iloc[train_idxs[-1]][TIME] + self.EPS
+                train_st = pd.Timestamp(times[train_idxs.start]) - self.EPS
+                train_et = pd.Timestamp(times[train_idxs.stop - 1]) + self.EPS
 
-                val_st = X.iloc[test_idxs[0]][TIME] - self.EPS
-                val_et = X.iloc[test_idxs[-1]][TIME] + self.EPS
+                val_st = pd.Timestamp(times[test_idxs.start]) - self.EPS
+                val_et = pd.Timestamp(times[test_idxs.stop - 1]) + self.EPS
 
                 res_lst.append(
                     ((train_st, train_et), (val_st, val_et))
@@ -510,10 +599,10 @@ class TimeSeriesSplit(_BaseKFold):
 
         Returns
         -------
-        train : ndarray
-            The training set indices for that split.
-        test : ndarray
-            The testing set indices for that split.
+        train : slice
+            The training set positions for that split.
+        test : slice
+            The testing set positions for that split.
 
         """
         if self.temporal_split:
@@ -546,7 +635,9 @@ class LeaveKDayOutSplit(object):
     offset : str, default='0s'
         The offset that is used to shift the start of a day
     shift : bool, defaul=False
-        Determines whether to shift the
+        Determines whether to shift the training days after the test days into the
+        past such that the gap is closed. The training set of such folds is an
+        :class:`IndexRanges` whose offsets are applied by the :class:`CrossValSelector`.
 
     Examples
     --------
@@ -599,12 +690,13 @@ class LeaveKDayOutSplit(object):
         splits : list
             Returns tuples of splits of train and test sets
             example: [(train1, test1), ..., (trainn, testn)]
+            The sets are slices of positions, except for training sets that
+            enclose the test set.
         """
+        times = _sorted_times(X)
 
-        X = X.copy()
-
-        first_day = X[TIME].iloc[0].floor('d')
-        last_day = X[TIME].iloc[-1].ceil('d')
+        first_day = pd.Timestamp(times[0]).floor('d')
+        last_day = pd.Timestamp(times[-1]).ceil('d')
         days = pd.date_range(first_day, last_day, freq='1D').values
         days[1:-2] = days[1:-2] + self.offset
 
@@ -615,6 +707,14 @@ class LeaveKDayOutSplit(object):
         assert self.k <= (N-2)//self.n_splits, "The number of days for each split exceeds the possible"
 
         step_size = N//self.n_splits
+        if not self.return_timestamp:
+            # Positions of the first sample after and of the last sample before each day
+            after = np.searchsorted(times, days.astype(times.dtype), side='right')
+            before = np.searchsorted(times, days.astype(times.dtype), side='left')
+
+            def get_range(l_idx, r_idx):
+                return slice(int(after[l_idx]), int(max(after[l_idx], before[r_idx])))
+
         res = []
         for i in range(self.n_splits):
             test = (days[i*step_size], days[i*step_size + self.k])
@@ -632,21 +732,23 @@ class LeaveKDayOutSplit(object):
             if self.return_timestamp:
                 res.append((train, test))
             else:
-                def get_indices(df, l_bound, r_bound):
-                    return df[(l_bound < df[TIME]) & (df[TIME] < r_bound)].index.values
-                test_idxs = get_indices(X, test[0], test[1])
-                if i == 0 or (i == self.n_splits-1 and (i*step_size+self.k) == N-1):
-                    train_idxs = get_indices(X, train[0], train[1])
+                test_st, test_et = i*step_size, i*step_size + self.k
+                test_idxs = get_range(test_st, test_et)
+                if i == 0:
+                    train_idxs = get_range(test_et, N-1)
+                elif i == self.n_splits-1 and test_et == N-1:
+                    train_idxs = get_range(0, test_st)
                 else:
-                    train_idxs_int_1 = get_indices(X, train[0][0], train[0][1])
-                    train_idxs_int_2 = get_indices(X, train[1][0], train[1][1])
-                    train_idxs = np.concatenate([train_idxs_int_1, train_idxs_int_2])
-
+                    train_idxs_int_1 = get_range(0, test_st)
+                    train_idxs_int_2 = get_range(test_et, N-1)
                     if self.shift:
-                        # shift the second interval by that amount of days into the past
-                        X.loc[train_idxs_int_2, TIME] = X[TIME] - pd.Timedelta(str(self.k) + 'D')
-                        if y is not None:
-                            y.loc[train_idxs_int_2, TIME] = y[TIME] - pd.Timedelta(str(self.k) + 'D')
+                        # the selector shifts the second interval by the test days into the past
+                        train_idxs = IndexRanges(
+                            [train_idxs_int_1, train_idxs_int_2],
+                            [pd.Timedelta(0), pd.Timedelta(days[test_st] - days[test_et])]
+                        )
+                    else:
+                        train_idxs = np.r_[train_idxs_int_1, train_idxs_int_2]
 
                 res.append((train_idxs, test_idxs))
 
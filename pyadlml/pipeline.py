@@ -8,6 +8,14 @@ estimator, as a chain of transforms and estimators.
 #         Alexandre Gramfort
 #         Lars Buitinck
 # License: BSD
+import copy
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+
+import joblib
 from joblib import Parallel
 from sklearn.base import clone, TransformerMixin, BaseEstimator
 from sklearn.utils.fixes import delayed
@@ -23,7 +31,7 @@ import numpy as np
 import pandas as pd
 
 __all__ = ['Pipeline', 'YTransformer', 'XAndYTransformer', 'XOrYTransformer',
-           'EvalOnlyWrapper', 'TrainOnlyWrapper']
+           'EvalOnlyWrapper', 'TrainOnlyWrapper', 'StepCache']
 
 
 class YTransformer():
@@ -152,6 +160,211 @@ class EvalOnlyWrapper(Wrapper):
         Wrapper.__init__(self, wr)
 
 
+def _fingerprint(obj) -> str:
+    """ Hashes the content of a pipeline input. Frames and numeric arrays are
+    hashed from their buffers, everything else is pickled by joblib.
+    """
+    if obj is None:
+        return 'none'
+    h = hashlib.md5()
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+        frame = obj.to_frame() if isinstance(obj, pd.Series) else obj
+        # Booleans and their string representation hash equally in object columns
+        kinds = [pd.api.types.infer_dtype(frame.iloc[:, i], skipna=True)
+                 if frame.dtypes.iloc[i] == object else str(frame.dtypes.iloc[i])
+                 for i in range(frame.shape[1])]
+        h.update(repr((type(obj).__name__, list(frame.columns), kinds)).encode())
+    elif isinstance(obj, np.ndarray) and obj.dtype != object:
+        h.update(np.ascontiguousarray(obj).reshape(-1).view(np.uint8))
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+    else:
+        return joblib.hash(obj)
+    return h.hexdigest()
+
+
+def _params_token(value):
+    """ Replaces the estimators within a parameter value by their class and
+    parameters, such that the fitted state does not enter the hash.
+    """
+    if isinstance(value, (list, tuple)):
+        return type(value)(_params_token(v) for v in value)
+    if not hasattr(value, 'get_params') or isinstance(value, type):
+        return value
+    cls = type(value)
+    if isinstance(value, Wrapper):
+        # Wrappers create a new class for every wrapped estimator
+        cls = next((c for c in cls.__mro__
+                    if c in (TrainOnlyWrapper, EvalOnlyWrapper, TrainOrEvalOnlyWrapper)), Wrapper)
+    params = value.get_params(deep=False)
+    return (cls.__module__, cls.__qualname__,
+            {k: _params_token(v) for k, v in sorted(params.items())})
+
+
+def _nbytes(obj) -> int:
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(index=True, deep=False)))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    return 0
+
+
+def _copy_output(obj):
+    return obj.copy() if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)) else obj
+
+
+class StepCache():
+    """
+    Memoizes the fitted transformer steps of a pipeline.
+
+    A step is looked up by the fingerprint of its inputs together with its
+    class, parameters and fit parameters. Only the raw pipeline input is hashed
+    from its buffers. Every step derives the fingerprint of its outputs from its
+    own key, such that the hashing cost does not grow with the number of steps.
+    Pass an instance as ``memory`` to :class:`Pipeline`.
+
+    Parameters
+    ----------
+    location : str or Path, optional
+        A folder where the step outputs are additionally written in the dataset
+        cache format. The steps are kept in the subfolder ``pyadlml_step_cache``.
+        Defaults to keeping the outputs in memory only.
+    max_bytes : int, default=2**30
+        The size of the outputs kept in memory. The least recently used steps
+        are evicted first.
+    max_disk_bytes : int, optional
+        The size of the outputs kept in the *location*. The least recently used
+        steps are evicted first. Defaults to no limit.
+
+    Attributes
+    ----------
+    hits : int
+        The number of steps that were loaded from the cache.
+    misses : int
+        The number of steps that were fitted.
+
+    Examples
+    --------
+    >>> from pyadlml.pipeline import Pipeline, StepCache
+    >>> cache = StepCache(max_bytes=2**28)
+    >>> pipe = Pipeline([('enc', StateVectorEncoder()), ('lbl', LabelMatcher()),
+    ...                  ('clf', RandomForestClassifier())], memory=cache)
+    >>> pipe.fit(X, y)
+    >>> pipe.set_params(clf__n_estimators=200).fit(X, y)   # refits only the classifier
+    """
+    FOLDER = 'pyadlml_step_cache'
+
+    def __init__(self, location=None, max_bytes=2**30, max_disk_bytes=None):
+        self.location = None if location is None else Path(location)
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._nbytes = 0
+
+    def __deepcopy__(self, memo):
+        # Clones of a pipeline, e.g. within a parameter search, share the cache
+        return self
+
+    def key(self, transformer, fp_X, fp_y, fit_params) -> str:
+        """ Returns the key of a step given the fingerprints of its inputs.
+        """
+        return joblib.hash((fp_X, fp_y, _params_token(transformer), fit_params))
+
+    def _folder(self, key):
+        return self.location.joinpath(self.FOLDER, key)
+
+    def _entries(self) -> list:
+        """ Returns the folders of the cached steps.
+
+        Only folders whose manifest was written by the cache for the same key
+        are considered, such that foreign files are never removed.
+        """
+        from pyadlml.dataset.io.cache import cache_is_valid
+
+        root = self.location.joinpath(self.FOLDER)
+        if not root.is_dir():
+            return []
+        return [f for f in root.iterdir() if f.is_dir() and cache_is_valid(f, f.name)]
+
+    def get(self, key):
+        """ Returns the tuple (X, y, transformer) or None if the step is not cached.
+        """
+        from pyadlml.dataset.io.cache import cache_is_valid, load_cache
+
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            X, y, transformer, _ = self._memory[key]
+        elif self.location is not None and cache_is_valid(self._folder(key), key):
+            data = load_cache(self._folder(key))
+            X, y, transformer = data['X'], data['y'], data['transformer']
+            # The modification time of the folder orders the steps for eviction
+            os.utime(self._folder(key))
+            self._keep_in_memory(key, X, y, transformer)
+        else:
+            return None
+        self.hits += 1
+        return _copy_output(X), _copy_output(y), copy.deepcopy(transformer)
+
+    def put(self, key, X, y, transformer):
+        """ Stores the outputs and the fitted transformer of a step.
+        """
+        from pyadlml.dataset.io.cache import delete_cache, dump_cache
+
+        self.misses += 1
+        X, y, transformer = _copy_output(X), _copy_output(y), copy.deepcopy(transformer)
+        self._keep_in_memory(key, X, y, transformer)
+        if self.location is None:
+            return
+        try:
+            dump_cache(dict(X=X, y=y, transformer=transformer), self._folder(key), key)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            # Transformers that can not be pickled are only kept in memory
+            delete_cache(self._folder(key))
+            return
+        self._evict_disk()
+
+    def _keep_in_memory(self, key, X, y, transformer):
+        nbytes = _nbytes(X) + _nbytes(y)
+        if nbytes > self.max_bytes:
+            return
+        self._memory[key] = (X, y, transformer, nbytes)
+        self._nbytes += nbytes
+        while self._nbytes > self.max_bytes:
+            _, (_, _, _, old_nbytes) = self._memory.popitem(last=False)
+            self._nbytes -= old_nbytes
+
+    def _evict_disk(self):
+        if self.max_disk_bytes is None:
+            return
+        from pyadlml.dataset.io.cache import delete_cache
+
+        folders = sorted(self._entries(), key=lambda f: f.stat().st_mtime)
+        sizes = [sum(fp.stat().st_size for fp in f.iterdir()) for f in folders]
+        total = sum(sizes)
+        for folder, size in zip(folders[:-1], sizes[:-1]):
+            if total <= self.max_disk_bytes:
+                break
+            delete_cache(folder)
+            total -= size
+
+    def clear(self):
+        """ Removes all steps from memory and the location.
+        """
+        from pyadlml.dataset.io.cache import delete_cache
+
+        self._memory.clear()
+        self._nbytes = 0
+        if self.location is None:
+            return
+        for folder in self._entries():
+            delete_cache(folder)
+        root = self.location.joinpath(self.FOLDER)
+        if root.is_dir() and not any(root.iterdir()):
+            root.rmdir()
+
+
 class Pipeline(SklearnPipeline):
     """
     Pipeline of transforms with a final estimator.
@@ -181,7 +394,7 @@ class Pipeline(SklearnPipeline):
         chained, in the order in which they are chained, with the last object
         an estimator.
 
-    memory : str or object with the joblib.Memory interface, default=None
+    memory : str, StepCache or object with the joblib.Memory interface, default=None
         Used to cache the fitted transformers of the pipeline. By default,
         no caching is performed. If a string is given, it is the path to
         the caching directory. Enabling caching triggers a clone of
@@ -190,6 +403,8 @@ class Pipeline(SklearnPipeline):
         directly. Use the attribute ``named_steps`` or ``steps`` to
         inspect estimators within the pipeline. Caching the
         transformers is advantageous when fitting is time consuming.
+        A :class:`StepCache` avoids hashing the inputs of every step and
+        supports transformers of y and of X and y.
 
     verbose : bool, default=False
         If True, the time elapsed while fitting each step will be printed as it
@@ -296,6 +511,9 @@ class Pipeline(SklearnPipeline):
         # shallow copy of steps - this should really be steps_
         self.steps = list(self.steps)
         self._validate_steps()
+        if isinstance(self.memory, StepCache):
+            return self._fit_step_cache(X, y, **fit_params_steps)
+
         # Setup the memory
         memory = check_memory(self.memory)
 
@@ -360,6 +578,61 @@ class Pipeline(SklearnPipeline):
             self.steps[step_idx] = (name, fitted_transformer)
         return X, y
 
+    def _fit_step_cache(self, X, y=None, **fit_params_steps):
+        """ Fits the transformers and loads the steps that were already fitted
+        on the same input from the step cache.
+        """
+        cache = self.memory
+        fp_X, fp_y = _fingerprint(X), _fingerprint(y)
+        for (step_idx,
+             name,
+             transformer) in self._iter(with_final=False,
+                                        filter_passthrough=False):
+            if (transformer is None or transformer == 'passthrough'
+                    or self._skip_transform(transformer)):
+                with _print_elapsed_time('Pipeline',
+                                         self._log_message(step_idx)):
+                    continue
+
+            transforms_X = not isinstance(transformer, YTransformer)
+            transforms_y = isinstance(transformer, (YTransformer, XAndYTransformer, XOrYTransformer))
+            key = cache.key(transformer, fp_X, fp_y, fit_params_steps[name])
+
+            cached = cache.get(key)
+            if cached is not None:
+                Xt, yt, fitted_transformer = cached
+            elif isinstance(transformer, YTransformer):
+                yt, fitted_transformer = _fit_transform_one(
+                    transformer, y, X, None,
+                    message_clsname='Pipeline',
+                    message=self._log_message(step_idx),
+                    **fit_params_steps[name])
+                Xt = None
+            elif transforms_y:
+                Xt, yt, fitted_transformer = _fit_transform_one(
+                    transformer, X, y, None,
+                    message_clsname='Pipeline',
+                    message=self._log_message(step_idx),
+                    **fit_params_steps[name])
+            else:
+                Xt, fitted_transformer = _fit_transform_one(
+                    transformer, X, y, None,
+                    message_clsname='Pipeline',
+                    message=self._log_message(step_idx),
+                    **fit_params_steps[name])
+                yt = None
+            if cached is None:
+                # Unchanged inputs are not stored again
+                cache.put(key, Xt, yt, fitted_transformer)
+
+            # The fingerprint of an output is derived from the step that created it
+            if transforms_X:
+                X, fp_X = Xt, key + ':X'
+            if transforms_y:
+                y, fp_y = yt, key + ':y'
+            self.steps[step_idx] = (name, fitted_transformer)
+        return X, y
+
     def _skip_transform(self, transformer):
         """
         skip the transform step if one of the following conditions is true
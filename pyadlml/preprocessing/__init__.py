@@ -1,4 +1,4 @@
-from .windows import TimeWindow, EventWindow, ExplicitWindow
+from .windows import TimeWindow, EventWindow, EventWindowIndexer, ExplicitWindow, RaggedWindows
 from .preprocessing import \
     StateVectorEncoder, \
     IndexEncoder, \
@@ -6,12 +6,13 @@ from sklearn.utils.metaestimators import _safe_split
 import sklearn.preprocessing as preprocessing
 from sklearn.base import BaseEstimator, TransformerMixin
 
-from pyadlml.dataset._representations.raw import create_raw, resample_raw
+from pyadlml.dataset._representations.raw import create_raw, resample_raw, resample_numpy
+from pyadlml.dataset._representations.util import create_bins
 from pyadlml.dataset._representations.changepoint import create_changepoint, resample_changepoint
 from pyadlml.dataset._representations.lastfired import create_lastfired, resample_last_fired
 from pyadlml.dataset._core.acts_and_devs import label_data
 from pyadlml.constants import ACTIVITY, TIME, DEVICE, VALUE, END_TIME, START_TIME, \
-                              ENC_RAW, ENC_LF, ENC_CP, REPS
+                              ENC_RAW, ENC_LF, ENC_CP, REPS, CAT, BOOL, NUM
 from pyadlml.dataset._core.devices import create_device_info_dict
 from pyadlml.pipeline import XOrYTransformer, XAndYTransformer, YTransformer
 from pyadlml.constants import OTHER
@@ -385,6 +386,9 @@ class StateVectorEncoder(Encoder, BaseEstimator, TransformerMixin):
 
     """
 
+    PRAEFIX_LF = 'lf_'
+    PRAEFIX_CP = 'cp_'
+
     def __init__(self, encode=ENC_RAW, dt=None):
         super().__init__()
         self.encode = encode
@@ -428,7 +432,44 @@ class StateVectorEncoder(Encoder, BaseEstimator, TransformerMixin):
 
         self.n_features_out =  copy(self.classes_)
 
+        self.reset_stream()
         return self
+
+    def _feature_names(self):
+        """ Returns the column order of the transformed state-vectors
+        """
+        iters = self.encode.split('+')
+        if len(iters) == 1:
+            return copy(self.classes_)
+
+        praefix = {ENC_RAW: '', ENC_CP: self.PRAEFIX_CP, ENC_LF: self.PRAEFIX_LF}
+        res = [TIME]
+        for enc in iters:
+            res += [praefix[enc] + dev for dev in self.classes_[1:]]
+        return res
+
+    def _format_encoding(self, enc, data, n_encodings):
+        """ Casts the encodings values, adds missing devices and makes the
+            column names unique when multiple encodings are combined.
+        """
+        if enc == ENC_RAW:
+            # convert boolean data into integers (1,0)
+            dev_bool = [dev for dev in self.data_info_.keys() if self.data_info_[dev]['dtype'] == 'boolean']
+            data[dev_bool] = data[dev_bool].astype(int)
+            return data.set_index(TIME)
+
+        # set values that are missing in transform but were present when fitting to 0
+        dev_diff = set(self.classes_) - set(data.columns)
+        if len(dev_diff) > 0:
+            for dev in dev_diff:
+                data[dev] = 0
+
+        # add prefix to make column names unique
+        if n_encodings > 1:
+            praefix = self.PRAEFIX_CP if enc == ENC_CP else self.PRAEFIX_LF
+            data.columns = [TIME] + list(map(praefix.__add__, data.columns[1:]))
+        return data.set_index(TIME)
+
     def transform(self, df_devs=None,y=None, initial_states={}):
         """
         Discretize the data.
@@ -451,10 +492,6 @@ class StateVectorEncoder(Encoder, BaseEstimator, TransformerMixin):
             Data in the binned space. Will be a sparse matrix if
             `self.encode='onehot'` and ndarray otherwise.
         """
-        PRAEFIX_LF = 'lf_'
-        PRAEFIX_CP = 'cp_'
-
-
         df_lst = []
         iters = self.encode.split('+')
         for enc in iters:
@@ -464,51 +501,158 @@ class StateVectorEncoder(Encoder, BaseEstimator, TransformerMixin):
                     data = resample_raw(data, df_dev=df_devs, dt=self.dt,
                                         most_likely_values=self.data_info_
                                         )
-
-                # convert boolean data into integers (1,0)
-                dev_bool = [dev for dev in self.data_info_.keys() if self.data_info_[dev]['dtype'] == 'boolean']
-                data[dev_bool] = data[dev_bool].astype(int)
-
             elif enc == ENC_CP:
                 data = create_changepoint(df_devs)
                 if self.dt is not None:
                     data = resample_changepoint(data, self.dt)
 
-                # set values that are missing in transform but were present when fitting to 0
-                dev_diff = set(self.classes_) - set(data.columns)
-                if len(dev_diff) > 0:
-                    for dev in dev_diff:
-                        data[dev] = 0
-
-                # add prefix to make column names unique
-                if len(iters) > 1:
-                    data.columns = [TIME] + list(map(PRAEFIX_CP.__add__, data.columns[1:]))
-
-
             elif enc == ENC_LF:
                 data = create_lastfired(df_devs)
                 if self.dt is not None:
                     data = resample_last_fired(data, self.dt)
+            else:
+                raise ValueError
+            df_lst.append(self._format_encoding(enc, data, len(iters)))
+
+        df_res = pd.concat(df_lst, axis=1).reset_index()
+        # Ensure to always return feature columns in order
+        return df_res[self._feature_names()]
+
+    def reset_stream(self):
+        """
+        Forget the device states and pending events remembered by
+        :meth:`partial_transform`.
+
+        Returns
+        -------
+        self
+        """
+        self.stream_row_ = None
+        self.stream_seen_ = set()
+        self.stream_buffer_ = pd.DataFrame(columns=[TIME, DEVICE, VALUE])
+        self.stream_origin_ = None
+        return self
+
+    def partial_transform(self, df_devs):
+        """
+        Discretize newly arrived events of a device stream.
+
+        In contrast to :meth:`transform` only the rows produced by the new events are
+        returned. Between calls the encoder remembers the state vector after the last
+        event and, when `dt` is set, the events of the last timeslice. Since that
+        timeslice may still receive events it is withheld and returned by the first
+        call that receives an event of a later timeslice. The first call behaves like
+        :meth:`transform`, except for the withheld timeslice.
+
+        Parameters
+        ----------
+        df_devs : pd.DataFrame
+            The device events that occurred after the events of the previous call.
+
+        Returns
+        -------
+        df : pd.DataFrame
+            The state-vectors of the new events or completed timeslices.
+        """
+        if len(df_devs) == 0:
+            # A poll without new events neither produces rows nor changes the stream
+            df_res = pd.DataFrame(columns=self._feature_names())
+            df_res[TIME] = pd.to_datetime(df_res[TIME])
+            return df_res
+
+        events = pd.concat([self.stream_buffer_, df_devs], ignore_index=True)\
+                   .sort_values(by=TIME, kind='stable')\
+                   .reset_index(drop=True)
+        events[TIME] = pd.to_datetime(events[TIME])
+
+        if self.stream_row_ is None:
+            df_res = self.transform(events)
+            raw = create_raw(events, self.data_info_)
+            if self.dt is not None:
+                self.stream_origin_ = events[TIME].iat[0].normalize()
+        else:
+            df_res, raw = self._transform_stream(events)
+
+        if self.dt is None:
+            self.stream_row_ = raw.iloc[-1]
+            self.stream_seen_ |= set(events[DEVICE])
+            return df_res
+
+        # Withhold the last timeslice, since it is not completed yet
+        _, bin_starts = create_bins(events[TIME], self.dt, self.stream_origin_)
+        open_start = bin_starts[-1]
+        is_prev = (raw[TIME] < open_start)
+        if is_prev.any():
+            self.stream_row_ = raw[is_prev].iloc[-1]
+            self.stream_seen_ |= set(events.loc[events[TIME] < open_start, DEVICE])
+        self.stream_buffer_ = events[events[TIME] >= open_start].reset_index(drop=True)
+
+        return df_res[df_res[TIME] < open_start].reset_index(drop=True)
+
+    def _transform_stream(self, events):
+        """ Computes the state-vectors for events following the remembered state.
 
-                # set values that are missing in transform but were present when fitting to 0
-                dev_diff = set(self.classes_) - set(data.columns)
-                if len(dev_diff) > 0:
-                    for dev in dev_diff:
-                        data[dev] = 0
+        Returns
+        -------
+        df_res : pd.DataFrame
+            The state-vectors for the events
+        raw : pd.DataFrame
+            The raw representation of the events including the remembered row
+        """
+        dtypes = {CAT: [], BOOL: [], NUM: []}
+        for dev, info in self.data_info_.items():
+            dtypes[info['dtype']].append(dev)
+
+        # Prepend the last known raw row and propagate the states of the
+        # boolean and categorical devices
+        if self.dt is None:
+            prev_time = events[TIME].iat[0] - pd.Timedelta('1ns')
+        else:
+            _, bin_starts = create_bins(events[TIME], self.dt, self.stream_origin_)
+            prev_time = bin_starts[0] - pd.Timedelta('1ns')
+        prev_row = self.stream_row_.drop(TIME).to_frame().T
+        prev_row.insert(0, TIME, prev_time)
+
+        raw = events.pivot(index=TIME, columns=DEVICE, values=VALUE)\
+                    .reindex(columns=self.classes_[1:])\
+                    .reset_index()
+        raw = pd.concat([prev_row, raw], ignore_index=True)
+        raw[TIME] = pd.to_datetime(raw[TIME])
+        raw[dtypes[CAT] + dtypes[BOOL]] = raw[dtypes[CAT] + dtypes[BOOL]].ffill()
+        raw.columns.name = None
 
-                # add prefix to make column names unique
-                if len(iters) > 1:
-                    data.columns = [TIME] + list(map(PRAEFIX_LF.__add__, data.columns[1:]))
+        df_lst = []
+        iters = self.encode.split('+')
+        for enc in iters:
+            if enc == ENC_RAW:
+                if self.dt is None:
+                    data = raw.iloc[1:].reset_index(drop=True)
+                else:
+                    # Devices that fired before the timeslice determine the state
+                    # at the start of the timeslice for collisions
+                    seen = [dev for dev in dtypes[CAT] + dtypes[BOOL] if dev in self.stream_seen_]
+                    df_prae = pd.DataFrame({TIME: prev_time, DEVICE: seen,
+                                            VALUE: self.stream_row_[seen].values})
+                    df_prae = pd.concat([df_prae, events], ignore_index=True)
+                    data = resample_numpy(raw, self.dt, df_prae, dtypes, self.data_info_,
+                                          origin=self.stream_origin_)
+                    data = data[data[TIME] > prev_time].reset_index(drop=True)
 
+            elif enc == ENC_CP:
+                data = create_changepoint(events)
+                if self.dt is not None:
+                    data = resample_changepoint(data, self.dt, self.stream_origin_)
+
+            elif enc == ENC_LF:
+                data = create_lastfired(events)
+                if self.dt is not None:
+                    data = resample_last_fired(data, self.dt, self.stream_origin_)
             else:
                 raise ValueError
-            data = data.set_index(TIME)
-            df_lst.append(data)
+            df_lst.append(self._format_encoding(enc, data, len(iters)))
 
         df_res = pd.concat(df_lst, axis=1).reset_index()
-        # Ensure to always return feature columns in order
-        return df_res[self.classes_]
-
+        return df_res[self._feature_names()], raw
 
     def fit_transform(self, df_devs, y=None):
         """
@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 from typing_extensions import override
 from pyadlml.dataset._core.acts_and_devs import label_data
+from pyadlml.dataset._representations.util import to_ns
 from pyadlml.dataset.plot.matplotlib.util import save_fig
 from pyadlml.pipeline import XOrYTransformer, XAndYTransformer, YTransformer
 import numpy.ma as ma
@@ -10,6 +11,7 @@ from scipy.stats.kde import gaussian_kde
 import dask
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from plotly.subplots import make_subplots
 from pyadlml.dataset.plot.util import  \
     fmt_seconds2time, \
@@ -179,6 +181,62 @@ class ExplicitWindow(BaseEstimator, TransformerMixin, XOrYTransformer):
 
         return Xt, yt
 
+class RaggedWindows():
+    """ Windows of different lengths stored as rows of a values array and offsets.
+
+    The window :math:`s` consists of the rows ``values[starts[s]:ends[s]]``. Since windows
+    may overlap, the values are not duplicated but shared by all windows.
+    """
+    def __init__(self, values: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+        """
+        Parameters
+        ----------
+        values : np.ndarray of shape (N, F)
+        starts : np.ndarray of shape (S,)
+            The first row of each window.
+        ends : np.ndarray of shape (S,)
+            The row after the last row of each window.
+
+        """
+        self.values = values
+        self.starts = starts
+        self.ends = ends
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return self.ends - self.starts
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, s):
+        return self.values[self.starts[s]:self.ends[s]]
+
+    def to_padded(self, fill_value=np.nan, dtype=None) -> np.ndarray:
+        """ Pads the windows to the length of the longest window.
+
+        Parameters
+        ----------
+        fill_value : scalar, default=np.nan
+            The value positions after the end of a window are filled with.
+        dtype : np.dtype, optional
+            The dtype of the tensor. Defaults to the dtype of the values.
+
+        Returns
+        -------
+        np.ndarray of shape (S, T, F)
+        """
+        dtype = self.values.dtype if dtype is None else dtype
+        lengths = self.lengths
+        T = lengths.max() if len(lengths) > 0 else 0
+
+        res = np.full((len(self), T, *self.values.shape[1:]), fill_value, dtype=dtype)
+        mask = np.arange(T) < lengths[:, None]
+        rows = (self.starts[:, None] + np.arange(T))[mask]
+        res[mask] = self.values[rows]
+        return res
+
+
 class TimeWindow(Windows):
     """ Divide data stream into time segments with a regular interval.
 
@@ -188,11 +246,24 @@ class TimeWindow(Windows):
     Van Kasteren et al. recommend 60s. 
 
     """
-    def __init__(self, window_size : str, stride: str = None, rep: str ='many-to-many',  drop_empty_intervals=True):
+    def __init__(self, window_size : str, stride: str = None, rep: str ='many-to-many',  drop_empty_intervals=True, ragged=False):
+        """
+        Parameters
+        ----------
+        window_size : str
+        stride : str, optional
+        rep : str
+        drop_empty_intervals : bool, default=True
+        ragged : bool, default=False
+            If True, the windows are returned as :class:`RaggedWindows` instead of
+            a NaN padded object tensor.
+
+        """
         TransformerMixin.__init__(self)
         XOrYTransformer.__init__(self)
         Windows.__init__(self, rep, window_size, stride)
         self.drop_empty_intervals = drop_empty_intervals
+        self.ragged = ragged
 
     def fit_transform(self, X, y=None):
         self.fit(X, y)
@@ -206,90 +277,78 @@ class TimeWindow(Windows):
         self.stride = pd.Timedelta(self.stride) if self.stride is not None else self.window_size
         return self
 
+    def _window_bounds(self, times: pd.Series):
+        """ Computes the rows each window spans.
+
+        Parameters
+        ----------
+        times : pd.Series
+            The sorted timestamps.
+
+        Returns
+        -------
+        win_st : pd.DatetimeIndex
+            The start time of each window.
+        starts, ends : np.ndarray
+            The first row and the row after the last row of each window.
+        """
+        st = times.iloc[0] - pd.Timedelta('1s')
+        et = times.iloc[-1] + pd.Timedelta('1s')
+        win_st = pd.date_range(st, et-self.window_size, freq=self.stride)
+
+        # Important the interval is [st,et) right open
+        t = to_ns(times)
+        starts = np.searchsorted(t, to_ns(win_st), side='left')
+        ends = np.searchsorted(t, to_ns(win_st + self.window_size), side='left')
+
+        if self.drop_empty_intervals:
+            # Jump over the windows that do not contain any event
+            non_empty = ends > starts
+            win_st, starts, ends = win_st[non_empty], starts[non_empty], ends[non_empty]
+
+        return win_st, starts, ends
+
     @XOrYTransformer.x_or_y_transform
     def transform(self, X, y=None) -> np.ndarray:
         """
         
         Parameters 
-        ----------- (S, T, F) and (S, T)
+        ----------
+        X : pd.DataFrame
+            A table with at least a column 'time'
+        y : pd.DataFrame, optional
+
+        Returns
+        -------
+        Xt : np.ndarray of shape (S, T, F) or RaggedWindows
+        yt : np.ndarray of shape (S, T, Fy) or (S, Fy) or RaggedWindows
         """
         # TODO refactor add conversion for different input types
         assert isinstance(X, pd.DataFrame) or X is None
         assert isinstance(y, pd.DataFrame) or y is None
 
-        df = X.copy().sort_values(by=TIME)
-        st = X[TIME].iloc[0] - pd.Timedelta('1s')
-        et = X[TIME].iloc[-1] + pd.Timedelta('1s')
-        win_st = st
+        order = np.argsort(X[TIME].values, kind='stable')
+        times = X[TIME].iloc[order].reset_index(drop=True)
+        _, starts, ends = self._window_bounds(times)
 
-        X_list = []
-        y_list = []
-        max_seq_length = 0
-        i = 0
+        Xt = RaggedWindows(X.to_numpy()[order], starts, ends)
+        if not self.ragged:
+            Xt = Xt.to_padded(fill_value=np.nan, dtype='object')
 
+        if y is None:
+            return Xt, None
 
-        st_windows = pd.date_range(st, et-self.window_size, freq=self.stride)
-        if self.drop_empty_intervals:
-            times = df[TIME].copy()
-            while win_st + self.window_size <= et:
-
-                win = (win_st, win_st + self.window_size)
-                # Important the interval is [st,et) right closed
-                event_idxs = df[(win[0] <= df[TIME]) & (df[TIME] < win[1])].index
-                
-                if not event_idxs.empty:
-                    X_list.append(X.iloc[event_idxs].copy())
-                    if y is not None:
-                        y_list.append(y.iloc[event_idxs].copy())
-                    max_seq_length = max(max_seq_length, len(X_list[i]))
-                    win_st = win_st + self.stride
-                    i += 1
-                else:
-                    # Get the next first window that covers the next event 
-                    next_event_time = times[win_st < times].iloc[0]
-                    win_min_idx_not_containing_ev = (st_windows <= next_event_time - self.window_size).cumsum().max() - 1
-                    if win_min_idx_not_containing_ev == len(st_windows) - 1:
-                        # When there is no event for the enxt windows 
-                        break
-                    win_st = st_windows[win_min_idx_not_containing_ev + 1]
-        else: 
-            for win_st in st_windows:
-                win = (win_st, win_st + self.window_size)
-                event_idxs = df[(win[0] <= df[TIME]) & (df[TIME] < win[1])].index
-                
-                X_list.append(X.iloc[event_idxs].copy())
-                if y is not None:
-                    y_list.append(y.iloc[event_idxs].copy())
-                max_seq_length = max(max_seq_length, len(X_list[i]))
-                i += 1
-
-
-        S = len(X_list)
-        F = len(X.columns)
-        T = max_seq_length
-        Xt = np.full((S, T, F), np.nan, dtype='object')
+        y_values = y.to_numpy()[order]
+        if self.rep == self.REP_M2M:
+            yt = RaggedWindows(y_values, starts, ends)
+            if not self.ragged:
+                yt = yt.to_padded(fill_value=np.nan, dtype='object')
+        else:
+            # Take the label of the last event in each window
+            yt = np.full((len(starts), y_values.shape[-1]), np.nan, dtype='object')
+            non_empty = ends > starts
+            yt[non_empty] = y_values[ends[non_empty] - 1]
 
-        if y is not None:
-            Fy = 1 if len(y.shape) == 1 else y.shape[-1]
-            if self.rep == 'many-to-many':
-                yt = np.full((S, T, Fy), np.nan, dtype='object')
-            else:
-                yt = np.full((S, Fy), np.nan, dtype='object')
-
-        for s in range(len(X_list)):
-            X_tmp = X_list[s].values
-            Xt[s, :X_tmp.shape[0], :] = X_tmp
-
-            if y is not None:
-                y_tmp = y_list[s].values
-                if y_tmp.size > 0:
-                    if self.rep == 'many-to-many':
-                        y_tmp = y_tmp.squeeze(-1)
-                        yt[s, :y_tmp.shape[0], :] = y_tmp
-                    else:
-                        yt[s, :] = y_tmp[-1]
-
-        yt = None if y is None else yt
         return Xt, yt 
 
     @classmethod
@@ -313,36 +372,23 @@ class TimeWindow(Windows):
         pd.DataFrame
         """
         assert (y.columns == [TIME, ACTIVITY]).all()
-        self.rep = self.REP_M2M
-        contains_nans = y[ACTIVITY].isna().any()
-        #if contains_nans:
-        #    act2int = { v:k for k, v in enumerate(y[ACTIVITY].unique())} 
-        #    from pandas._libs.tslibs.nattype import NaT
-        #    #act2int[NaT] = np.inf
-        #    y = self.transform(X=y)
-        #    y = np.vectorize(act2int.get)(y).astype(np.int32)
-        #    y = np.where(y == act2int[NaT], np.inf, y)
-        #    y = ma.masked_invalid(y)
-        #    counts_per_row = (y[:,1:] != y[:,:-1]).sum(axis=1)+1
-        #    x, y = np.unique(counts_per_row, return_counts=True)
-        #    df = pd.DataFrame(columns=['activity per window', 'count'], data=np.stack([x,y]).T)
-        #    return df.sort_values(by='activity per window')
-        #    
-        #else:
-        if True:
-            act2int = { v:k for k, v in enumerate(y[ACTIVITY].unique())} 
-            yt = self.transform(X=y)    # S, T, 2 (timestamps, activities) in feature_y dim
-            yt = yt[:, :, 1] # remove timestamps -> (S, T)
+        y = y.sort_values(by=TIME, kind='stable')
+        _, starts, ends = self._window_bounds(y[TIME])
 
-            # Hotfix nan issue
-            yt = np.where(pd.isnull(yt), -1, yt)
-            act2int[-1] = -1
-            yt = np.vectorize(act2int.get)(yt).astype(np.int32)
-            yt = np.where(yt == -1, np.inf, yt)
-            yt = ma.masked_invalid(yt)
-            counts_per_row = (yt[:,1:] != yt[:,:-1]).sum(axis=1)+1
-            bins, counts = np.unique(counts_per_row, return_counts=True)
-            return pd.DataFrame(columns=['activity per window', 'count'], data=np.stack([bins, counts]).T)
+        # Count the activity changes between successive labeled events once and
+        # get the changes per window as difference of the cumulative sum
+        acts = y[ACTIVITY]
+        codes = pd.factorize(acts)[0]
+        labeled = acts.notna().to_numpy()
+        changes = (codes[1:] != codes[:-1]) & labeled[1:] & labeled[:-1]
+        changes = np.concatenate([[0], np.cumsum(changes)])
+
+        non_empty = ends > starts
+        starts, ends = starts[non_empty], ends[non_empty]
+        counts_per_row = changes[ends-1] - changes[starts] + 1
+
+        bins, counts = np.unique(counts_per_row, return_counts=True)
+        return pd.DataFrame(columns=['activity per window', 'count'], data=np.stack([bins, counts]).T)
 
 
     @save_fig
@@ -365,9 +411,8 @@ class TimeWindow(Windows):
         """
 
         # Get nr events per window
-        yt = self.transform(X=times) 
-        yt = yt[:, :, 1] # Remove timestamps -> (S, T)
-        counts = np.count_nonzero(~pd.isnull(yt), axis=1)
+        _, starts, ends = self._window_bounds(times[TIME].sort_values())
+        counts = ends - starts
 
         title = f'#Events per window (size={self.window_size})'
 
@@ -490,15 +535,19 @@ class TimeWindow(Windows):
         return fig
 
     def nr_events_per_win(self, times):
-        """
+        """ How many events are present in a window
 
-        # Get nr events per window
-        # Pick first value after timestamps. The value is irrelevant just that it is not None
-        # -> (S, T, F)
+        Parameters
+        ----------
+        times: pd.DataFrame
+            A table with at least one column named 'time'
+
+        Returns
+        -------
+        pd.DataFrame
         """
-        yt = self.transform(X=times) 
-        yt = yt[:, :, 1] # Remove timestamps -> (S, T)
-        counts_per_row = np.count_nonzero(~pd.isnull(yt), axis=1)
+        _, starts, ends = self._window_bounds(times[TIME].sort_values())
+        counts_per_row = ends - starts
         bins, counts = np.unique(counts_per_row, return_counts=True)
         return pd.DataFrame(columns=['events per window', 'count'], data=np.stack([bins, counts]).T)
 
@@ -507,13 +556,9 @@ class TimeWindow(Windows):
         
         """
         self.drop_empty_intervals = False
-        st = X[TIME].iloc[0] - pd.Timedelta('1s')
-        et = X[TIME].iloc[-1] + pd.Timedelta('1s')
-        st_windows = pd.date_range(st, et-self.window_size, freq=self.stride)
+        st_windows, starts, ends = self._window_bounds(X[TIME].sort_values())
         st_windows = st_windows + self.window_size
-        # -> (S, T, F)
-        Xt = self.transform(X=X) 
-        counts_per_row = np.count_nonzero(~pd.isnull(Xt[:,:,0]), axis=1)
+        counts_per_row = ends - starts
         df = pd.DataFrame([counts_per_row, st_windows]).T
         df.columns = [VALUE, TIME]
         df[DEVICE] = 'Time window: Event rate'
@@ -555,9 +600,9 @@ class TimeWindow(Windows):
                 z[y-1, xi] = zi
 
         else:
-            z = np.zeros((max_acts.max(), len(window_sizes)), dtype=np.float32)
+            z = np.zeros((max_acts, len(window_sizes)), dtype=np.float32)
             for xi, s in enumerate(window_sizes):
-                df = cls(window_size=s, stride=stride).fit().nr_activities_per_win(x_labeled)
+                df = cls(window_size=s, stride=stride).fit().nr_events_per_win(x_labeled)
                 zi, y = df['count'], df['events per window']
                 z[y-1, xi] = zi
 
@@ -643,19 +688,23 @@ class EventWindow(Windows, XOrYTransformer):
                .fit_transform(X, y)
 
     """
-    def __init__(self, rep: str ='many-to-many', window_size: int =10, stride: int=1):
+    def __init__(self, rep: str ='many-to-many', window_size: int =10, stride: int=1, copy: bool=True):
         """
         Parameters
         ----------
         rep: str 
         window_size: int
         stride: int
+        copy: bool, default=True
+            If False, the windows are returned as a read-only strided view
+            onto the input array instead of a newly allocated array.
 
         """
 
         TransformerMixin.__init__(self)
         XOrYTransformer.__init__(self)
         Windows.__init__(self, rep, window_size, stride)
+        self.copy = copy
     
     def fit(self, X, y=None):
         self.feature_names_in_ = X.columns if isinstance(X, pd.DataFrame) else None
@@ -703,22 +752,31 @@ class EventWindow(Windows, XOrYTransformer):
     def _calc_new_N(self, n_old):
         return int(np.floor((n_old-self.window_size)/self.stride)+1)
 
-    def _transform_X(self, X):
-        """
+    def _window_view(self, X):
+        """ Creates a read-only view of the windows onto X without copying data.
 
+        Parameters
+        ----------
+        X : np.ndarray, pd.DataFrame or pd.Series of shape (N, ...)
+
+        Returns
+        -------
+        np.ndarray of shape (N', window_size, ...)
         """
         if isinstance(X, pd.DataFrame) or isinstance(X, pd.Series):
             X = X.to_numpy()
 
-        n_prime = self._calc_new_N(X.shape[0])
-        new_shape =[n_prime, self.window_size, *X.shape[1:]]
-
-        res = np.zeros(shape=new_shape, dtype=X.dtype)
+        # sliding_window_view appends the window dimension -> (N-W+1, ..., W)
+        view = sliding_window_view(X, self.window_size, axis=0)[::self.stride]
+        return np.moveaxis(view, -1, 1)
 
-        for r, i in enumerate(range(0, n_prime*self.stride, self.stride)):
-            res[r] = X[i:i+self.window_size]
-            #res[r, :, :] = X[i:i+self.window_size, :]
+    def _transform_X(self, X):
+        """
 
+        """
+        res = self._window_view(X)
+        if self.copy:
+            res = res.copy()
         return res.squeeze()
 
     def _transform_Y(self, y):
@@ -733,19 +791,28 @@ class EventWindow(Windows, XOrYTransformer):
             y = y.to_numpy()
 
         if self.rep == self.REP_M2M:
-            n_prime = self._calc_new_N(y.shape[0])
-            new_shape = [n_prime, self.window_size, *y.shape[1:]]
+            res = self._window_view(y)
+        elif self.rep == self.REP_M2O:
+            res = y[self.window_size-1::self.stride]
 
-            res = np.zeros(shape=new_shape, dtype=y.dtype)
+        if self.copy:
+            res = res.copy()
+        return res.squeeze()
 
-            for r, i in enumerate(range(0, n_prime*self.stride, self.stride)):
-                res[r, :] = y[i: i+self.window_size]
+    def window_indexer(self, X, y=None):
+        """ Creates an object that lazily yields the windows by index.
 
-            return res.squeeze()
+        Parameters
+        ----------
+        X : np.ndarray or pd.DataFrame of shape (N, F)
+        y : np.ndarray or pd.Series of shape (N,), optional
 
-        elif self.rep == self.REP_M2O:
-            res = y[np.arange(self.window_size-1, y.shape[0], self.stride)]
-            return res.squeeze()
+        Returns
+        -------
+        EventWindowIndexer
+        """
+        assert self.rep in [self.REP_M2M, self.REP_M2O]
+        return EventWindowIndexer(self, X, y)
 
     def nr_activities_per_win(self, y):
         """ How many different activities are present in a window
@@ -1137,18 +1204,16 @@ class EventWindow(Windows, XOrYTransformer):
         """
 
         # -> (S, T) or (S, T, F)
-        X = self._transform_X(X)
+        X = self._window_view(X)
         if self.rep == self.REP_M2O:
             if X.ndim == 2:
                 X = X[:,:, None]
 
             # Select last event for T
             X = X[:, -1, dev_slice]
-            if X.ndim == 3:
-                X = X.squeeze(1)
 
             assert X.ndim == 2
-            return X
+            return X.copy() if self.copy else X
         else:
             raise NotImplementedError
     
@@ -1163,3 +1228,78 @@ class EventWindow(Windows, XOrYTransformer):
 
         elif self.rep == self.REP_M2O:
             raise NotImplementedError
+
+
+class EventWindowIndexer():
+    """ Lazily indexes the windows of an :class:`EventWindow`.
+
+    Windows are only materialized when they are accessed which makes the indexer
+    suitable as backend for a torch Dataset.
+
+    .. code:: python
+
+        class WindowDataset(torch.utils.data.Dataset):
+            def __init__(self, X, y):
+                self.windows = EventWindow(window_size=100).window_indexer(X, y)
+
+            def __len__(self):
+                return len(self.windows)
+
+            def __getitem__(self, idx):
+                return self.windows[idx]
+
+    """
+    def __init__(self, window, X, y=None):
+        """
+        Parameters
+        ----------
+        window : EventWindow
+        X : np.ndarray or pd.DataFrame of shape (N, F)
+        y : np.ndarray or pd.Series of shape (N,), optional
+
+        """
+        if isinstance(X, pd.DataFrame) or isinstance(X, pd.Series):
+            X = X.to_numpy()
+        if isinstance(y, pd.DataFrame):
+            y = y.to_numpy().squeeze(-1)
+        elif isinstance(y, pd.Series):
+            y = y.to_numpy()
+        assert window.window_size <= len(X)
+        assert y is None or len(y) == len(X)
+
+        self.rep = window.rep
+        self.window_size = window.window_size
+        self.stride = window.stride
+        self.X = X
+        self.y = y
+
+    def __len__(self):
+        return int(np.floor((len(self.X) - self.window_size)/self.stride) + 1)
+
+    def _starts(self, idx):
+        return np.arange(len(self))[idx]*self.stride
+
+    def __getitem__(self, idx):
+        """ Returns the window(s) X of shape ([S], T, F) and y of shape ([S], T) or ([S],)
+        """
+        if isinstance(idx, (int, np.integer)):
+            n = len(self)
+            if not -n <= idx < n:
+                raise IndexError(f'Window index {idx} out of range for {n} windows.')
+            i = (idx % n)*self.stride
+            Xi = self.X[i:i+self.window_size]
+            if self.y is None:
+                return Xi
+            if self.rep == EventWindow.REP_M2M:
+                return Xi, self.y[i:i+self.window_size]
+            return Xi, self.y[i+self.window_size-1]
+
+        # Gather only the requested windows
+        starts = self._starts(idx)
+        rows = starts[:, None] + np.arange(self.window_size)
+        Xi = self.X[rows]
+        if self.y is None:
+            return Xi
+        if self.rep == EventWindow.REP_M2M:
+            return Xi, self.y[rows]
+        return Xi, self.y[starts + self.window_size - 1]
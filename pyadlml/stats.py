@@ -1,6 +1,7 @@
 from pyadlml.dataset.stats.acts_and_devs import (
     contingency_table_events as contingency_table_events,
-    contingency_table_states as contingency_table_states
+    contingency_table_states as contingency_table_states,
+    time_dependent_firing_rates as time_dependent_firing_rates
 )
 
 from pyadlml.dataset.stats.activities import (
@@ -15,7 +15,8 @@ _extras_light = [
     'dask[complete]',
     'matplotlib',
     'scipy',
-    'sklearn'
+    'sklearn',
+    'pyarrow',
 ]
 
 _extras_datavis = [
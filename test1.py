@@ -15,7 +15,7 @@ df_acts = data.df_activities_test
 df_devs = data.df_devices
 
 from pyadlml.dataset.plot.devices import event_cross_correlogram as plot
-from pyadlml.dataset.stats.devices import event_cross_correlogram2
+from pyadlml.dataset.stats.devices import event_cross_correlogram as event_cc
 from pyadlml.dataset.stats.acts_and_devs import cross_correlogram
 from pyadlml.plot import plot_device_event_raster
 from pyadlml.plot import plot_device_inter_event_intervals
@@ -35,7 +35,7 @@ data = fetch_amsterdam()
 binsize = '10s'
 maxlag = '1.2min'
 
-#ccg, bins = event_cross_correlogram2(df_devs, binsize='1min', maxlag='2min')
+#ccg, bins, rows, cols = event_cc(df_devs, binsize='1min', maxlag='2min')
 
 #plot(df_devs, binsize='2sec', maxlag='1min', axis='on', figsize=(20,20)).show()
 ##plot_device_event_raster(df_devs).show()
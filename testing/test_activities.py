@@ -0,0 +1,134 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pyadlml.constants import ACTIVITY, END_TIME, START_TIME, TIME
+from pyadlml.dataset._core.activities import _is_activity_overlapping, correct_activity_overlap
+from pyadlml.dataset.stats.activities import activities_dist
+
+
+def _create_activities():
+    ts = lambda s: pd.Timestamp('2020-01-01 00:00:00') + pd.Timedelta(s)
+    return pd.DataFrame([
+        [ts('1h'),      ts('3h'),      'sleeping'],
+        [ts('8h'),      ts('8h'),      'eating'],
+        [ts('23h'),     ts('1D 2h'),   'sleeping'],
+        [ts('1D 12h'),  ts('1D 13h'),  'eating'],
+    ], columns=[START_TIME, END_TIME, ACTIVITY])
+
+
+class TestActivitiesDist(unittest.TestCase):
+
+    def test_samples(self):
+        df_acts = _create_activities()
+        res = activities_dist(df_acts, n=100, rng=0)
+        assert len(res) == 200 and list(res[ACTIVITY].unique()) == ['sleeping', 'eating']
+
+        pd.testing.assert_frame_equal(res, activities_dist(df_acts, n=100, rng=0))
+
+        # Samples wrap around midnight and lie within the intervals
+        secs = activities_dist(df_acts, n=100, relative=True, rng=0)
+        sleeping = secs.loc[secs[ACTIVITY] == 'sleeping', TIME]
+        assert ((sleeping <= 3*3600) | (sleeping >= 23*3600)).all()
+        h, m, s = map(int, res.loc[0, TIME].split(':'))
+        assert h*3600 + m*60 + s == secs.loc[0, TIME]
+
+    def test_exact(self):
+        df_acts = _create_activities()
+        res = activities_dist(df_acts, dt='1h', exact=True)
+        assert list(res.columns) == [TIME, 'eating', 'sleeping'] and len(res) == 24
+
+        # Each sleeping interval is chosen with 1/2 and spread over its hours
+        sleeping = res['sleeping'].values
+        np.testing.assert_allclose(sleeping[[23, 0, 1, 2]], [1/6, 1/6, 1/6 + 1/4, 1/4])
+        np.testing.assert_allclose(res['eating'].values[[8, 12]], 1/2)
+        np.testing.assert_allclose(res[['eating', 'sleeping']].sum().values, 1)
+
+        # Sampling approximates the exact density
+        counts = activities_dist(df_acts, n=20000, dt='1h', rng=0)
+        np.testing.assert_allclose(counts[['eating', 'sleeping']].values/20000,
+                                   res[['eating', 'sleeping']].values, atol=0.02)
+
+    def test_timezone(self):
+        # Times of day are computed from the local wall clock time
+        df_acts = _create_activities()
+        for col in [START_TIME, END_TIME]:
+            df_acts[col] = df_acts[col].dt.tz_localize('Europe/Berlin')
+        res = activities_dist(df_acts, dt='1h', exact=True)
+        pd.testing.assert_frame_equal(res, activities_dist(_create_activities(), dt='1h', exact=True))
+
+        secs = activities_dist(df_acts, n=100, relative=True, rng=0)
+        eating = secs.loc[secs[ACTIVITY] == 'eating', TIME]
+        assert ((8*3600 <= eating) & (eating < 9*3600) | (12*3600 <= eating) & (eating < 13*3600)).all()
+
+
+class TestCorrectActivityOverlap(unittest.TestCase):
+
+    def test_areas(self):
+        ts = lambda s: pd.Timestamp('2020-01-01 00:00:00') + pd.Timedelta(s)
+        df_acts = pd.DataFrame([
+            [ts('3h'),     ts('4h'),     'eating'],
+            [ts('1h'),     ts('2h'),     'eating'],
+            [ts('5min'),   ts('15min'),  'sleeping'],
+            [ts('0min'),   ts('10min'),  'eating'],
+            [ts('1h10min'), ts('1h20min'), 'sleeping'],
+        ], columns=[START_TIME, END_TIME, ACTIVITY])
+
+        res, corrections = correct_activity_overlap(df_acts)
+        assert [len(area) for area, _ in corrections] == [2, 2]
+        assert [len(corr) for _, corr in corrections] == [2, 3]
+        assert not _is_activity_overlapping(res) and len(res) == 6
+
+        eps = pd.Timedelta('1ms')
+        expected = pd.DataFrame([
+            [ts('0min'),          ts('5min'),    'eating'],
+            [ts('5min') + eps,    ts('15min'),   'sleeping'],
+            [ts('1h'),            ts('1h10min'), 'eating'],
+            [ts('1h10min') + eps, ts('1h20min'), 'sleeping'],
+            [ts('1h20min') + eps, ts('2h'),      'eating'],
+            [ts('3h'),            ts('4h'),      'eating'],
+        ], columns=[START_TIME, END_TIME, ACTIVITY])
+        pd.testing.assert_frame_equal(res, expected)
+
+    def test_chained_area(self):
+        ts = lambda m: pd.Timestamp('2020-01-01 00:00:00') + pd.Timedelta(minutes=m)
+        # The first interval reaches over its direct successor into the third one
+        df_acts = pd.DataFrame([
+            [ts(0),  ts(30), 'sleeping'],
+            [ts(5),  ts(10), 'eating'],
+            [ts(20), ts(40), 'eating'],
+            [ts(50), ts(60), 'sleeping'],
+        ], columns=[START_TIME, END_TIME, ACTIVITY])
+
+        res, corrections = correct_activity_overlap(df_acts)
+        assert len(corrections) == 1 and len(corrections[0][0]) == 3
+        assert not _is_activity_overlapping(res)
+        assert res[END_TIME].iloc[-1] == ts(60)
+
+    def test_timezone(self):
+        ts = lambda s: pd.Timestamp('2020-01-01 08:00:00', tz='Europe/Berlin') + pd.Timedelta(s)
+        df_acts = pd.DataFrame([
+            [ts('0min'),  ts('10min'), 'eating'],
+            [ts('5min'),  ts('15min'), 'sleeping'],
+            [ts('1h'),    ts('2h'),    'eating'],
+        ], columns=[START_TIME, END_TIME, ACTIVITY])
+
+        res, _ = correct_activity_overlap(df_acts)
+        assert res[START_TIME].dt.tz == df_acts[START_TIME].dt.tz
+        assert res[END_TIME].dt.tz == df_acts[END_TIME].dt.tz
+        expected = pd.DataFrame([
+            [ts('0min'),                          ts('5min'),  'eating'],
+            [ts('5min') + pd.Timedelta('1ms'),    ts('15min'), 'sleeping'],
+            [ts('1h'),                            ts('2h'),    'eating'],
+        ], columns=[START_TIME, END_TIME, ACTIVITY])
+        pd.testing.assert_frame_equal(res, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pyadlml.constants import ACTIVITY, DEVICE, END_TIME, START_TIME, VALUE, TIME, OTHER
+from pyadlml.dataset._core.acts_and_devs import label_data
+from pyadlml.dataset.stats.acts_and_devs import contingency_table_states, time_dependent_firing_rates
+
+
+def _label_reference(ts, df_acts, other):
+    mask = (df_acts[START_TIME] <= ts) & (ts <= df_acts[END_TIME])
+    if mask.sum() == 0:
+        return OTHER if other else pd.NaT
+    return df_acts.loc[mask, ACTIVITY].values[0]
+
+
+class TestLabelData(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        base = pd.Timestamp('2020-01-01')
+        bounds = rng.integers(1, 1000, size=60).cumsum()
+        self.df_acts = pd.DataFrame({
+            START_TIME: base + pd.to_timedelta(bounds[0::2], 's'),
+            END_TIME: base + pd.to_timedelta(bounds[1::2], 's'),
+            ACTIVITY: rng.choice(['sleep', 'eat', 'cook'], 30),
+        }).sample(frac=1, random_state=1)
+
+        # Include timestamps that hit the interval boundaries exactly
+        ts = base + pd.to_timedelta(rng.integers(0, bounds[-1] + 100, 300), 's')
+        ts = ts.append(pd.DatetimeIndex(self.df_acts[START_TIME]))\
+               .append(pd.DatetimeIndex(self.df_acts[END_TIME]))
+        self.df_devs = pd.DataFrame({TIME: ts, DEVICE: 'dev', VALUE: True})
+
+    def test_matches_reference(self):
+        for other in [True, False]:
+            res = label_data(self.df_devs, self.df_acts, other=other)
+            exp = [_label_reference(t, self.df_acts, other) for t in self.df_devs[TIME]]
+            assert len(res) == len(self.df_devs)
+            assert res[ACTIVITY].fillna('nan').tolist() == pd.Series(exp).fillna('nan').tolist()
+
+    def test_nested_interval(self):
+        df_acts = pd.DataFrame({
+            START_TIME: pd.to_datetime(['2020-01-01 00:00', '2020-01-01 02:00']),
+            END_TIME: pd.to_datetime(['2020-01-01 01:00', '2020-01-01 02:10']),
+            ACTIVITY: ['a', 'b'],
+        })
+        df_acts = pd.concat([df_acts, pd.DataFrame({
+            START_TIME: [pd.Timestamp('2020-01-01 00:10')],
+            END_TIME: [pd.Timestamp('2020-01-01 00:20')],
+            ACTIVITY: ['c']})], ignore_index=True)
+        df_devs = pd.DataFrame({TIME: pd.to_datetime(['2020-01-01 00:30', '2020-01-01 01:30']),
+                                DEVICE: 'dev', VALUE: True})
+        res = label_data(df_devs, df_acts, other=True)
+        assert res[ACTIVITY].tolist() == ['a', OTHER]
+
+        df_devs = pd.DataFrame({TIME: pd.to_datetime(['2020-01-01 00:15']), DEVICE: 'dev', VALUE: True})
+        with self.assertRaises(ValueError):
+            label_data(df_devs, df_acts)
+
+
+class TestContingencyTableStates(unittest.TestCase):
+
+    def test_overlap_durations(self):
+        ts = lambda m: pd.Timestamp('2020-01-01') + pd.Timedelta(minutes=m)
+        df_devs = pd.DataFrame([
+            [ts(10), 'door', True],
+            [ts(40), 'door', False],
+            [ts(70), 'door', True],
+            [ts(100), 'door', False],
+        ], columns=[TIME, DEVICE, VALUE])
+        df_acts = pd.DataFrame([
+            [ts(0), ts(20), 'eat'],
+            [ts(30), ts(80), 'sleep'],
+            [ts(90), ts(110), 'eat'],
+        ], columns=[START_TIME, END_TIME, ACTIVITY])
+
+        for n_jobs in [1, 2]:
+            df = contingency_table_states(df_devs, df_acts, other=True, n_jobs=n_jobs)
+            minutes = (df/pd.Timedelta('1min')).round()
+
+            # door on: [10, 40) and [70, 100), door off: the rest from 1s before the
+            # first until 1s after the last activity
+            assert minutes.at['door:on', 'eat'] == 10 + 10
+            assert minutes.at['door:on', 'sleep'] == 10 + 10
+            assert minutes.at['door:on', OTHER] == 10 + 10
+            assert minutes.at['door:off', 'eat'] == 10 + 10
+            assert minutes.at['door:off', 'sleep'] == 30
+            assert minutes.at['door:off', OTHER] == 0
+
+
+class TestTimeDependentFiringRates(unittest.TestCase):
+
+    def test_rates(self):
+        ts = lambda m: pd.Timestamp('2020-01-01') + pd.Timedelta(minutes=m)
+        df_acts = pd.DataFrame([
+            [ts(0), ts(20), 'eat'],
+            [ts(30), ts(40), 'sleep'],
+            [ts(50), ts(70), 'eat'],
+        ], columns=[START_TIME, END_TIME, ACTIVITY])
+        df_devs = pd.DataFrame([
+            [ts(5), 'door', True],
+            [ts(15), 'door', False],
+            [ts(25), 'door', True],     # between trials
+            [ts(35), 'light', True],
+            [ts(52), 'door', False],
+            [ts(70), 'light', False],   # at the trials end
+        ], columns=[TIME, DEVICE, VALUE])
+
+        rates, bins, devs, acts = time_dependent_firing_rates(df_devs, df_acts, bin_width='10min')
+        assert devs == ['door', 'light'] and acts == ['eat', 'sleep']
+        np.testing.assert_allclose(bins, [0, 600, 1200])
+
+        # Counts are normalized by the number of trials and the bin width
+        counts = rates*600*np.array([2, 1])[None, :, None]
+        np.testing.assert_allclose(counts, [[[2, 1], [0, 0]], [[0, 0], [1, 0]]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import importlib
+import tempfile
+import unittest
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from pyadlml.constants import ACTIVITY, DEVICE, END_TIME, START_TIME, TIME, VALUE
+from pyadlml.dataset._core.activities import ActivityDict
+from pyadlml.dataset.io import DataFetcher, get_data_home, set_data_home
+from pyadlml.dataset.io.cache import join_mixed, split_mixed
+
+
+class _DummyFetcher(DataFetcher):
+    n_loads = 0
+
+    def __init__(self):
+        super().__init__(dataset_name='dummy', downloader=None)
+
+    def load_data(self, folder_path, **kwargs):
+        _DummyFetcher.n_loads += 1
+        times = pd.date_range('2020-01-01', periods=48, freq='1h')
+        df_devs = pd.DataFrame({TIME: times, DEVICE: 'dev_1', VALUE: np.arange(48) % 2 == 0})
+        df_acts = pd.DataFrame({
+            START_TIME: times[::4], END_TIME: times[::4] + pd.Timedelta('2h'),
+            ACTIVITY: 'sleeping'
+        })
+        return dict(
+            activities=ActivityDict({'alice': df_acts, 'bob': df_acts.iloc[::2].reset_index(drop=True)}),
+            devices=df_devs,
+            activity_list=['sleeping'],
+            device_list=['dev_1'],
+        )
+
+
+class TestDataFetcherCache(unittest.TestCase):
+
+    def setUp(self):
+        self._prev_data_home = get_data_home()
+        self._tmp = tempfile.TemporaryDirectory()
+        set_data_home(self._tmp.name)
+        fetcher = _DummyFetcher()
+        fetcher.original_folder.mkdir(parents=True)
+
+    def tearDown(self):
+        set_data_home(self._prev_data_home)
+        self._tmp.cleanup()
+
+    def _fetch(self, **kwargs):
+        return _DummyFetcher()(cache=True, keep_original=True, apply_corrections=False, **kwargs)
+
+    def test_roundtrip(self):
+        _DummyFetcher.n_loads = 0
+        expected = self._fetch()
+        data = self._fetch()
+        assert _DummyFetcher.n_loads == 1
+
+        assert list(data.keys()) == list(expected.keys())
+        pd.testing.assert_frame_equal(data['devices'], expected['devices'])
+        assert isinstance(data['activities'], ActivityDict)
+        for subj in ['alice', 'bob']:
+            pd.testing.assert_frame_equal(data['activities'][subj], expected['activities'][subj])
+        assert data['device_list'] == ['dev_1']
+
+    def test_selection(self):
+        full = self._fetch()
+        st, et = pd.Timestamp('2020-01-01 10:00'), pd.Timestamp('2020-01-01 20:00')
+
+        # The first call loads and selects in memory, the second one reads the cache
+        for _ in range(2):
+            data = self._fetch(tables=['devices', 'activities'], subjects=['bob'],
+                               start_time=st, end_time=et)
+            assert list(data.keys()) == ['activities', 'devices']
+            assert list(data['activities'].keys()) == ['bob']
+
+            df_devs = full['devices']
+            expected = df_devs[(st <= df_devs[TIME]) & (df_devs[TIME] < et)].reset_index(drop=True)
+            pd.testing.assert_frame_equal(data['devices'], expected)
+
+            df_acts = full['activities']['bob']
+            expected = df_acts[(st <= df_acts[END_TIME]) & (df_acts[START_TIME] < et)].reset_index(drop=True)
+            pd.testing.assert_frame_equal(data['activities']['bob'], expected)
+
+    def test_invalidation(self):
+        _DummyFetcher.n_loads = 0
+        self._fetch()
+        _DummyFetcher.LOADER_VERSION += 1
+        try:
+            self._fetch()
+        finally:
+            _DummyFetcher.LOADER_VERSION -= 1
+        assert _DummyFetcher.n_loads == 2
+
+    def test_changed_helper(self):
+        # A module level parser of the fetcher is modified between two loads
+        template = (
+            'import pandas as pd\n'
+            'from pyadlml.constants import TIME, DEVICE, VALUE\n'
+            'from pyadlml.dataset.io import DataFetcher\n\n'
+            'def _parse(n):\n'
+            '    return pd.DataFrame({TIME: pd.date_range("2020-01-01", periods=n, freq="1h"),\n'
+            '                         DEVICE: "dev_1", VALUE: True})\n\n'
+            'class HelperFetcher(DataFetcher):\n'
+            '    def __init__(self):\n'
+            '        super().__init__(dataset_name="dummy", downloader=None)\n\n'
+            '    def load_data(self, folder_path, **kwargs):\n'
+            '        return dict(devices=_parse(%d))\n'
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            fp = pathlib.Path(tmp).joinpath('_helper_fetcher.py')
+            fp.write_text(template % 3)
+            sys.path.insert(0, tmp)
+            try:
+                import _helper_fetcher
+                kwargs = dict(cache=True, keep_original=True, apply_corrections=False)
+                assert len(_helper_fetcher.HelperFetcher()(**kwargs)['devices']) == 3
+
+                fp.write_text(template.replace('periods=n', 'periods=2*n') % 3)
+                importlib.reload(_helper_fetcher)
+                assert len(_helper_fetcher.HelperFetcher()(**kwargs)['devices']) == 6
+            finally:
+                sys.path.remove(tmp)
+                sys.modules.pop('_helper_fetcher', None)
+
+    def test_cached_corrections(self):
+        n_corrections = Counter()
+
+        class CorrectedFetcher(_DummyFetcher):
+            def __init__(self):
+                DataFetcher.__init__(self, dataset_name='dummy', downloader=None,
+                                     correct_activities=True)
+
+            def correct_activities(self, subject, df_activities, ident=None):
+                n_corrections[subject] += 1
+                return super().correct_activities(subject, df_activities, ident)
+
+        _DummyFetcher.n_loads = 0
+        st = pd.Timestamp('2020-01-01 10:00')
+        for _ in range(2):
+            data = CorrectedFetcher()(cache=True, keep_original=True, start_time=st)
+            assert data['activities']['alice'][END_TIME].min() >= st
+        assert _DummyFetcher.n_loads == 1
+        assert n_corrections == {'alice': 1, 'bob': 1}
+
+        # Uncorrected tables are cached under another fingerprint
+        CorrectedFetcher()(cache=True, keep_original=True, apply_corrections=False)
+        assert _DummyFetcher.n_loads == 2 and n_corrections == {'alice': 1, 'bob': 1}
+
+    def test_timezone_selection(self):
+        class TzFetcher(_DummyFetcher):
+            def load_data(self, folder_path, **kwargs):
+                data = super().load_data(folder_path, **kwargs)
+                data['devices'][TIME] = data['devices'][TIME].dt.tz_localize('Europe/Berlin')
+                return data
+
+        st, et = '2020-01-01 10:00', pd.Timestamp('2020-01-01 19:00', tz='UTC')
+        for _ in range(2):
+            df_devs = TzFetcher()(cache=True, keep_original=True, apply_corrections=False,
+                                  tables=['devices'], start_time=st, end_time=et)['devices']
+            # Naive bounds are wall times of the columns timezone
+            assert df_devs[TIME].iloc[0] == pd.Timestamp(st, tz='Europe/Berlin')
+            assert df_devs[TIME].iloc[-1] == pd.Timestamp('2020-01-01 19:00', tz='Europe/Berlin')
+
+
+class TestMixedColumns(unittest.TestCase):
+
+    def test_roundtrip(self):
+        df_devs = pd.DataFrame({
+            TIME: pd.date_range('2020-01-01', periods=6, freq='1h'),
+            DEVICE: ['bool', 'num', 'cat', 'num', 'bool', 'cat'],
+            VALUE: [True, 1.5, 'open', np.nan, False, 'closed'],
+        })
+        df, mixed = split_mixed(df_devs)
+        assert mixed == {VALUE: ['bool', 'float', 'str']}
+        assert list(df.columns) == [TIME, DEVICE, f'{VALUE}:kind', f'{VALUE}:bool',
+                                    f'{VALUE}:float', f'{VALUE}:str']
+        assert df[f'{VALUE}:bool'].dtype == 'boolean' and df[f'{VALUE}:float'].dtype == np.float64
+
+        res = join_mixed(df, mixed)
+        pd.testing.assert_frame_equal(res, df_devs)
+        assert [type(v) for v in res[VALUE].iloc[[0, 4]]] == [bool, bool]
+
+    def test_homogeneous(self):
+        df_acts = pd.DataFrame({ACTIVITY: ['sleeping', 'eating']})
+        df, mixed = split_mixed(df_acts)
+        assert mixed == {}
+        pd.testing.assert_frame_equal(df, df_acts)
+
+
+if __name__ == '__main__':
+    unittest.main()
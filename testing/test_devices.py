@@ -0,0 +1,363 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import os
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pyadlml.constants import ACTIVITY, DEVICE, END_TIME, START_TIME, TIME, VALUE
+from pyadlml.dataset._core.acts_and_devs import label_data
+from pyadlml.dataset._core.devices import DeviceEvents, create_device_info_dict, device_events_to_states, \
+    device_metadata
+from pyadlml.dataset._representations.raw import create_raw
+from pyadlml.dataset.stats.acts_and_devs import contingency_table_states
+from pyadlml.dataset.stats.devices import event_count, event_cross_correlogram, inter_event_intervals, \
+    resampling_imputation_loss, state_cross_correlation, state_times
+from pyadlml.dataset.util import categorical_2_binary, get_first_states, get_last_states, infer_dtypes
+
+
+def _create_devices():
+    ts = lambda s: pd.Timestamp('2020-01-01 00:00:00') + pd.Timedelta(s)
+    return pd.DataFrame([
+        [ts('0s'),   'num', 1.0],
+        [ts('10s'),  'bool', True],
+        [ts('20s'),  'cat', 'open'],
+        [ts('30s'),  'bool', False],
+        [ts('40s'),  'cat', 'closed'],
+        [ts('50s'),  'num', 2.0],
+        [ts('60s'),  'cat', 'open'],
+        [ts('70s'),  'bool', True],
+        [ts('80s'),  'cat', 'half'],
+        [ts('90s'),  'cat', 'open'],
+        [ts('100s'), 'num', 3.0],
+    ], columns=[TIME, DEVICE, VALUE])
+
+
+class TestDeviceEventsToStates(unittest.TestCase):
+
+    def test_states(self):
+        df_devs = _create_devices()
+        res = device_events_to_states(df_devs)
+
+        states = res[res[DEVICE] != 'num'].sort_values(START_TIME)
+        # The last event of each device does not form a state
+        assert list(states[DEVICE]) == ['bool', 'cat', 'bool', 'cat', 'cat', 'cat']
+        assert list(states[VALUE]) == [True, 'open', False, 'closed', 'open', 'half']
+        for _, row in states.iterrows():
+            dev = df_devs[df_devs[DEVICE] == row[DEVICE]]
+            succ = dev[dev[TIME] > row[START_TIME]][TIME].iloc[0]
+            assert row[END_TIME] == succ
+
+        num = res[res[DEVICE] == 'num']
+        assert len(num) == 3 and (num[START_TIME] == num[END_TIME]).all()
+
+    def test_extrapolate_states(self):
+        df_devs = _create_devices()
+        first_ts = df_devs[TIME].iloc[0]
+        last_ts = df_devs[TIME].iloc[-1]
+        res = device_events_to_states(df_devs, extrapolate_states=True)
+
+        # The boolean is prepended with the inverted state and the category
+        # with the one that preceded 'open' most often
+        first = res[res[DEVICE] != 'num'].sort_values(START_TIME).groupby(DEVICE).head(1)\
+                   .set_index(DEVICE)
+        assert first.at['bool', VALUE] == False
+        assert first.at['bool', START_TIME] == first_ts + pd.Timedelta('1ns')
+        assert first.at['bool', END_TIME] == pd.Timestamp('2020-01-01 00:00:10')
+        assert first.at['cat', VALUE] == 'closed'
+        assert first.at['cat', START_TIME] == first_ts + pd.Timedelta('2ns')
+
+        # The last states are extended to the last timestamp
+        last = res[res[DEVICE] != 'num'].sort_values(START_TIME).groupby(DEVICE).tail(1)
+        assert (last[END_TIME] == last_ts).all()
+
+
+class TestDeviceEvents(unittest.TestCase):
+
+    def test_roundtrip(self):
+        df_devs = _create_devices()
+        events = DeviceEvents(df_devs)
+
+        assert len(events) == len(df_devs)
+        assert events.dtypes == infer_dtypes(df_devs)
+        assert list(events.device_values('cat')) == ['open', 'closed', 'open', 'half', 'open']
+        assert list(events.device_values('num')) == [1.0, 2.0, 3.0]
+        np.testing.assert_array_equal(
+            events.device_times('bool'),
+            df_devs.loc[df_devs[DEVICE] == 'bool', TIME].values.astype(np.int64)
+        )
+
+        res = events.to_df()
+        assert list(res[TIME]) == list(df_devs[TIME])
+        assert list(res[DEVICE]) == list(df_devs[DEVICE])
+        assert list(res[VALUE]) == list(df_devs[VALUE])
+
+    def test_state_times_simultaneous(self):
+        ts = pd.Timestamp('2020-01-01 00:00:00')
+        df_devs = pd.DataFrame([
+            [ts, 'bool_1', True],
+            [ts, 'bool_2', True],
+            [ts, 'cat', 'open'],
+            [ts + pd.Timedelta('10s'), 'bool_1', False],
+            [ts + pd.Timedelta('10s'), 'cat', 'closed'],
+            [ts + pd.Timedelta('20s'), 'bool_2', False],
+            [ts + pd.Timedelta('20s'), 'cat', 'closed'],
+            [ts + pd.Timedelta('30s'), 'bool_1', True],
+            [ts + pd.Timedelta('30s'), 'cat', 'open'],
+        ], columns=[TIME, DEVICE, VALUE])
+        events = DeviceEvents(df_devs)
+        for binary_state in ['on', 'off']:
+            for categorical in [True, False]:
+                pd.testing.assert_frame_equal(state_times(events, binary_state, categorical),
+                                              state_times(df_devs, binary_state, categorical))
+
+    def test_immutable(self):
+        events = DeviceEvents(_create_devices())
+        with self.assertRaises(AttributeError):
+            events.times = None
+        with self.assertRaises(ValueError):
+            events.times[0] = 0
+
+    def test_interchangeable(self):
+        df_devs = _create_devices()
+        events = DeviceEvents(df_devs)
+        pd.testing.assert_frame_equal(event_count(events), event_count(df_devs))
+        np.testing.assert_array_equal(inter_event_intervals(events), inter_event_intervals(df_devs))
+        pd.testing.assert_frame_equal(device_events_to_states(events), device_events_to_states(df_devs))
+        for binary_state in ['on', 'off']:
+            pd.testing.assert_frame_equal(state_times(events, binary_state),
+                                          state_times(df_devs, binary_state))
+
+        info = create_device_info_dict(df_devs)
+        pd.testing.assert_frame_equal(create_raw(events, info), create_raw(df_devs, info))
+
+        df_acts = pd.DataFrame([
+            [pd.Timestamp('2020-01-01 00:00:05'), pd.Timestamp('2020-01-01 00:00:45'), 'eating'],
+            [pd.Timestamp('2020-01-01 00:01:00'), pd.Timestamp('2020-01-01 00:01:30'), 'sleeping'],
+        ], columns=[START_TIME, END_TIME, ACTIVITY])
+        pd.testing.assert_frame_equal(label_data(events, df_acts), label_data(df_devs, df_acts))
+        pd.testing.assert_frame_equal(contingency_table_states(events, df_acts),
+                                      contingency_table_states(df_devs, df_acts))
+
+    def test_timezone(self):
+        df_devs = _create_devices()
+        df_devs[TIME] = df_devs[TIME].dt.tz_localize('Europe/Berlin')
+        events = DeviceEvents(df_devs)
+
+        # The times are stored in UTC and localized again
+        assert events.tz == df_devs[TIME].dt.tz
+        assert events.times[0] == pd.Timestamp('2019-12-31 23:00:00').value
+        pd.testing.assert_frame_equal(events.to_df(), df_devs)
+        pd.testing.assert_frame_equal(device_events_to_states(events), device_events_to_states(df_devs))
+
+    def test_wrap(self):
+        events = DeviceEvents(_create_devices())
+        assert DeviceEvents.wrap(events) is events
+        with self.assertRaises(TypeError):
+            DeviceEvents.wrap(_create_devices().values)
+
+
+class TestDeviceMetadata(unittest.TestCase):
+
+    def test_metadata(self):
+        df_devs = _create_devices()
+        meta = device_metadata(df_devs)
+        assert meta.dtypes == {'categorical': ['cat'], 'boolean': ['bool'], 'numerical': ['num']}
+        assert meta.categories == {'cat': ['closed', 'half', 'open']}
+        assert meta.first_state == get_first_states(df_devs) == {'bool': True, 'cat': 'open', 'num': 1.0}
+        assert get_last_states(df_devs) == {'bool': True, 'cat': 'open', 'num': 3.0}
+        assert get_last_states(df_devs, 5) == {'bool': False, 'cat': 'closed', 'num': 1.0}
+
+        info = create_device_info_dict(df_devs)
+        assert info['cat'] == {'dtype': 'categorical', 'ml_state': 'open'}
+        assert info['num'] == {'dtype': 'numerical', 'ml_state': 2.0}
+        assert meta.ml_state is not None
+
+    def test_registry(self):
+        df_devs = _create_devices()
+        meta = device_metadata(df_devs)
+
+        # Equal content shares the metadata, changed content is inferred again
+        assert device_metadata(df_devs.copy()) is meta
+        df_changed = df_devs.copy()
+        df_changed.loc[df_changed[DEVICE] == 'num', VALUE] = 'low'
+        assert device_metadata(df_changed) is not meta
+        assert infer_dtypes(df_changed)['categorical'] == ['num', 'cat']
+
+        # Returned dtypes can be modified without corrupting the registry
+        infer_dtypes(df_devs)['boolean'].append('num')
+        assert infer_dtypes(df_devs)['boolean'] == ['bool']
+
+
+class TestEventCrossCorrelogram(unittest.TestCase):
+
+    def test_against_all_pairs(self):
+        rng = np.random.default_rng(0)
+        offsets = pd.to_timedelta(np.sort(rng.integers(0, 2*86400, 300)), unit='s')
+        df_devs = pd.DataFrame({
+            TIME: pd.Timestamp('2020-01-01') + offsets,
+            DEVICE: rng.choice(['a', 'b'], 300),
+            VALUE: True,
+        })
+
+        ccg, bins, rows, cols = event_cross_correlogram(df_devs, binsize='10s', maxlag='1m')
+        assert ccg.shape == (2, 2, 13) and len(bins) == 13
+
+        maxlag = pd.Timedelta('1m').value
+        for i, r in enumerate(rows):
+            for j, c in enumerate(cols):
+                t_r = df_devs.loc[df_devs[DEVICE] == r, TIME].values.astype(np.int64)
+                t_c = df_devs.loc[df_devs[DEVICE] == c, TIME].values.astype(np.int64)
+                lags = t_r[None, :] - t_c[:, None]
+                if r == c:
+                    np.fill_diagonal(lags, 2*maxlag)
+                lags = lags[np.abs(lags) <= maxlag]
+                idx = np.minimum((lags + maxlag)*13//(2*maxlag), 12)
+                np.testing.assert_array_equal(ccg[i, j], np.bincount(idx, minlength=13))
+
+    def test_fix_to(self):
+        df_devs = _create_devices()
+        ccg, _, rows, cols = event_cross_correlogram(df_devs, binsize='10s', maxlag='20s',
+                                                     fix=['bool'], to=['cat', 'num'])
+        assert rows == ['cat', 'num'] and cols == ['bool']
+        # The bool events at 10s, 30s, 70s see cat events at 20s, 20s|40s, 60s|80s|90s
+        assert ccg[0, 0].sum() == 6
+
+
+class TestStateCrossCorrelation(unittest.TestCase):
+
+    def test_duration_weighting(self):
+        ts = lambda s: pd.Timestamp('2020-01-01 00:00:00') + pd.Timedelta(s)
+        df_devs = pd.DataFrame([
+            [ts('0s'),  'a', True],
+            [ts('5s'),  'b', True],
+            [ts('10s'), 'a', False],
+            [ts('20s'), 'b', False],
+        ], columns=[TIME, DEVICE, VALUE])
+
+        # b is off before its first event, hence a and b agree on 5s of 20s
+        res = state_cross_correlation(df_devs, n_jobs=1)
+        np.testing.assert_allclose(res.loc[['a', 'b'], ['a', 'b']].values, [[1, -0.5], [-0.5, 1]])
+
+    def test_chunks_and_threads(self):
+        df_devs = _create_devices()
+        expected = state_cross_correlation(df_devs, n_jobs=1)
+        res = state_cross_correlation(df_devs, n_jobs=3, chunksize=2)
+        pd.testing.assert_frame_equal(res, expected)
+        assert 'num' not in res.columns and 'cat:open' in res.columns
+
+    def test_order(self):
+        res = state_cross_correlation(_create_devices(), n_jobs=1)
+        assert list(res.index) == ['bool', 'cat:closed', 'cat:half', 'cat:open']
+        assert list(res.columns) == list(res.index)
+
+
+class TestResamplingImputationLoss(unittest.TestCase):
+
+    def test_resolutions(self):
+        df_devs = _create_devices()
+        res = resampling_imputation_loss(df_devs, ['1s', '20s', '1min'])
+        assert list(res.columns) == ['dt', DEVICE, 'lost_events', 'frac'] and len(res) == 9
+
+        lost = res.set_index(['dt', DEVICE])['lost_events']
+        assert (lost.loc['1s'] == 0).all()
+        # cat fires at 20s, 40s | 60s, 80s, 90s
+        assert lost.loc[('20s', 'cat')] == 1 and lost.loc[('1min', 'cat')] == 3
+        assert lost.loc[('1min', 'num')] == 1
+
+        for dt in ['1s', '20s', '1min']:
+            assert resampling_imputation_loss(df_devs, dt) == lost.loc[dt].sum()
+            assert resampling_imputation_loss(df_devs, dt, return_fraction=True) \
+                == lost.loc[dt].sum()/len(df_devs)
+
+
+def _create_categorical_devices(n, n_devs=20, seed=0):
+    rng = np.random.default_rng(seed)
+    devices = np.array([f'cat_{i}' for i in range(n_devs)], dtype=object)
+    values = np.array(['a', 'b', 'c', 'd'], dtype=object)
+    return pd.DataFrame({
+        TIME: pd.Timestamp('2020-01-01') + pd.to_timedelta(np.arange(n), unit='s'),
+        DEVICE: devices[rng.integers(0, n_devs, n)],
+        VALUE: values[rng.integers(0, len(values), n)],
+    })
+
+
+class TestCategoricalToBinary(unittest.TestCase):
+
+    def _create_devices(self):
+        ts = lambda s: pd.Timestamp('2020-01-01') + pd.Timedelta(s)
+        return pd.DataFrame([
+            [ts('0s'),  'cat', 'open'],
+            [ts('10s'), 'bool', True],
+            [ts('20s'), 'cat', 'closed'],
+            [ts('30s'), 'bool', False],
+            [ts('40s'), 'cat', 'open'],
+            [ts('50s'), 'num', 1.0],
+            [ts('60s'), 'bool', True],
+        ], columns=[TIME, DEVICE, VALUE])
+
+    def test_categorical_2_binary(self):
+        ts = lambda s: pd.Timestamp('2020-01-01') + pd.Timedelta(s)
+        expected = pd.DataFrame([
+            [ts('0s'),      'cat:open',   True],
+            [ts('10s'),     'bool',       True],
+            [ts('20s'),     'cat:closed', True],
+            [ts('20.000000001s'), 'cat:open', False],
+            [ts('30s'),     'bool',       False],
+            [ts('40s'),     'cat:open',   True],
+            [ts('40.000000001s'), 'cat:closed', False],
+            [ts('50s'),     'num',        1.0],
+            [ts('60s'),     'bool',       True],
+        ], columns=[TIME, DEVICE, VALUE])
+        res = categorical_2_binary(self._create_devices(), ['cat'])
+        pd.testing.assert_frame_equal(res, expected)
+
+    def test_state_times(self):
+        ts = lambda s: pd.Timestamp('2020-01-01') + pd.Timedelta(s)
+        # The last state of a device lasts until the last event
+        expected = pd.DataFrame([
+            [ts('0s'),  'cat:open',   pd.Timedelta('20.000000001s')],
+            [ts('10s'), 'bool',       pd.Timedelta('20s')],
+            [ts('20s'), 'cat:closed', pd.Timedelta('20.000000001s')],
+            [ts('40s'), 'cat:open',   pd.Timedelta('20s')],
+        ], columns=[TIME, DEVICE, 'td'], index=[0, 1, 2, 5])
+        pd.testing.assert_frame_equal(state_times(self._create_devices()), expected)
+
+        expected = pd.DataFrame([
+            [ts('30s'), 'bool', pd.Timedelta('30s')],
+        ], columns=[TIME, DEVICE, 'td'], index=[3])
+        res = state_times(self._create_devices(), binary_state='off', categorical=False)
+        pd.testing.assert_frame_equal(res, expected)
+
+
+@unittest.skipUnless(os.environ.get('PYADLML_BENCHMARK'), 'Set PYADLML_BENCHMARK=1 to run the timings.')
+class TestCategoricalScaling(unittest.TestCase):
+    """ Benchmarks the scaling with 10 million events.
+    """
+    N = 10_000_000
+
+    def _assert_linear(self, func):
+        runtimes = []
+        for n in [self.N//4, self.N]:
+            df_devs = _create_categorical_devices(n)
+            st = time.perf_counter()
+            func(df_devs)
+            runtimes.append(time.perf_counter() - st)
+
+        # Linear scaling quadruples the runtime, quadratic scaling would be 16 times
+        assert runtimes[1]/runtimes[0] < 8, runtimes
+
+    def test_categorical_2_binary(self):
+        self._assert_linear(lambda df: categorical_2_binary(df, df[DEVICE].unique()))
+
+    def test_state_times(self):
+        self._assert_linear(state_times)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import sqlite3
+import tempfile
+import unittest
+
+import pandas as pd
+
+from pyadlml.constants import DEVICE, TIME, VALUE
+from pyadlml.dataset._datasets.homeassistant import load_homeassistant, load_homeassistant_devices, \
+    sync_homeassistant_devices
+
+
+T0 = pd.Timestamp('2020-01-01 00:00:00')
+
+
+def _create_recorder():
+    """ Creates an in-memory database with the recorder tables of Home Assistant.
+    """
+    con = sqlite3.connect(':memory:')
+    con.executescript("""
+        CREATE TABLE states_meta (metadata_id INTEGER PRIMARY KEY, entity_id TEXT);
+        CREATE TABLE states (
+            state_id INTEGER PRIMARY KEY, entity_id TEXT, state TEXT,
+            last_changed_ts FLOAT, last_updated_ts FLOAT, metadata_id INTEGER
+        );
+    """)
+    con.executemany('INSERT INTO states_meta VALUES (?, ?)', [
+        (1, 'binary_sensor.door'), (2, 'light.kitchen'), (3, 'sun.sun'),
+    ])
+    _add_states(con, [
+        (1, 'on', 0), (2, 'on', 5), (3, 'above_horizon', 6), (1, 'off', 10),
+        (2, 'unavailable', 12), (1, 'on', 20), (2, 'off', 30),
+    ])
+    return con
+
+
+def _add_states(con, rows):
+    # last_changed_ts is NULL when the state was only updated
+    con.executemany(
+        'INSERT INTO states (metadata_id, state, last_changed_ts, last_updated_ts) VALUES (?, ?, ?, ?)',
+        [(m, s, None if sec == 20 else (T0 + pd.Timedelta(seconds=sec)).timestamp(),
+          (T0 + pd.Timedelta(seconds=sec)).timestamp()) for m, s, sec in rows]
+    )
+    con.commit()
+
+
+class TestHomeAssistant(unittest.TestCase):
+
+    def test_load(self):
+        con = _create_recorder()
+        df = load_homeassistant(con, chunksize=2)
+        assert list(df.columns) == ['entity_id', 'state', 'last_changed_ts'] and len(df) == 6
+        assert df['state'].dtype == 'category'
+        assert df['last_changed_ts'].iloc[-2] == T0 + pd.Timedelta('20s')
+
+        df = load_homeassistant(con, start_time=T0 + pd.Timedelta('5s'), end_time=T0 + pd.Timedelta('20s'))
+        assert list(df['state']) == ['on', 'above_horizon', 'off']
+
+    def test_devices(self):
+        con = _create_recorder()
+        df = load_homeassistant_devices(con, ['binary_sensor.door', 'light.kitchen'], chunksize=3)
+        assert list(df.columns) == [TIME, DEVICE, VALUE]
+        assert list(df[DEVICE]) == ['binary_sensor.door', 'light.kitchen', 'binary_sensor.door',
+                                    'binary_sensor.door', 'light.kitchen']
+        assert list(df[VALUE]) == [True, True, False, True, False]
+        assert df[TIME].is_monotonic_increasing
+
+        with self.assertRaises(ValueError):
+            load_homeassistant_devices(con, ["light.kitchen' OR 1=1 --"])
+
+    def test_sync(self):
+        con = _create_recorder()
+        devs = ['binary_sensor.door', 'light.kitchen']
+        with tempfile.TemporaryDirectory() as folder:
+            df = sync_homeassistant_devices(con, devs, folder=folder)
+            assert len(df) == 5
+
+            # Only rows after the newest cached row are fetched
+            con.execute("UPDATE states SET state = 'changed' WHERE last_updated_ts < ?",
+                        ((T0 + pd.Timedelta('30s')).timestamp(),))
+            _add_states(con, [(1, 'off', 40), (3, 'below_horizon', 41)])
+            df = sync_homeassistant_devices(con, devs, folder=folder)
+            assert list(df[VALUE]) == [True, True, False, True, False, False]
+            pd.testing.assert_frame_equal(df, sync_homeassistant_devices(con, devs, folder=folder))
+
+            # A row committed late with an earlier timestamp is fetched as well
+            _add_states(con, [(2, 'on', 35)])
+            df = sync_homeassistant_devices(con, devs, folder=folder)
+            assert list(df[VALUE]) == [True, True, False, True, False, True, False]
+            assert df[TIME].is_monotonic_increasing
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pyadlml.constants import ACTIVITY, DEVICE, END_TIME, START_TIME, TIME, VALUE
+from pyadlml.dataset._datasets.casas_houses import _load_corrected_dfs, _read_corrected_csv
+from pyadlml.dataset._datasets.kasteren_2010 import matlab_date_to_timestamp, matlab_datenums_to_datetimes
+
+
+CASAS_LINES = """\
+2010-11-04 00:03:50.209589,M003,ON,Sleeping begin
+2010-11-04 00:03:57.399391,M003,OFF
+2010-11-04 00:15:08,T002,21.5
+2010-11-04 00:30:19.823494,D001,OPEN,Meal_Preparation begin
+2010-11-04 00:30:19.823494,D001,OPEN,Meal_Preparation begin
+2010-11-04 00:40:01.1,M003,ON,Sleeping end
+2010-11-04 00:42:10.3,D001,CLOSE,Meal_Preparation end 
+2010-11-04 01:03:50.209589,M003,OFF,Sleeping begin
+2010-11-04 01:13:50.209589,M003,ON,Sleeping end
+"""
+
+
+class TestCasasParser(unittest.TestCase):
+
+    def test_corrected_file(self):
+        with tempfile.TemporaryDirectory() as folder:
+            fp = pathlib.Path(folder).joinpath('corrected_data.csv')
+            fp.write_text(CASAS_LINES)
+            df_devs, df_acts = _load_corrected_dfs(fp)
+            pd.testing.assert_frame_equal(_read_corrected_csv(fp, chunksize=4), _read_corrected_csv(fp))
+
+        assert list(df_devs.columns) == [TIME, DEVICE, VALUE] and len(df_devs) == 8
+        assert df_devs[TIME].is_monotonic_increasing
+        assert list(df_devs[VALUE]) == [True, False, 21.5, 'OPEN', True, 'CLOSE', False, True]
+
+        ts = pd.Timestamp
+        assert list(df_acts[ACTIVITY]) == ['Sleeping', 'Meal_Preparation', 'Sleeping']
+        assert list(df_acts[START_TIME]) == [ts('2010-11-04 00:03:50.209589'), ts('2010-11-04 00:30:19.823494'),
+                                             ts('2010-11-04 01:03:50.209589')]
+        assert list(df_acts[END_TIME]) == [ts('2010-11-04 00:40:01.1'), ts('2010-11-04 00:42:10.3'),
+                                           ts('2010-11-04 01:13:50.209589')]
+
+
+class TestMatlabDatenums(unittest.TestCase):
+
+    def test_matches_scalar_conversion(self):
+        rng = np.random.default_rng(0)
+        datenums = np.concatenate([[732877.4520, 732877.4521, 733000.], 733000 + rng.random(1000)*365])
+        res = matlab_datenums_to_datetimes(datenums)
+        assert list(pd.DatetimeIndex(res)) == [matlab_date_to_timestamp(d) for d in datenums]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pyadlml.metrics import OnlineConfusionAccumulator, online_accuracy, online_confusion_matrix
+
+
+def _create_predictions(n=1000, n_classes=4, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = rng.integers(0, n_classes, n)
+    y_pred = np.where(rng.random(n) < 0.7, y_true, rng.integers(0, n_classes, n))
+    times = (pd.Timestamp('2020-01-01')
+             + pd.to_timedelta(np.cumsum(rng.integers(1, 10**6, n)), unit='ms')).values
+    return y_true, y_pred, times
+
+
+class TestOnlineConfusionMatrix(unittest.TestCase):
+
+    def test_durations(self):
+        times = pd.to_datetime(['2020-01-01 00:00:00', '2020-01-01 00:00:10',
+                                '2020-01-01 00:00:30', '2020-01-01 00:01:00']).values
+        y_true = np.array([0, 0, 1, 0])
+        y_pred = np.array([0, 1, 1, 3])
+
+        # Class 2 never occurs and the last prediction lasts the mean of class 0
+        cm = online_confusion_matrix(y_true[:, None], y_pred, times, n_classes=4)
+        assert cm.shape == (4, 4)
+        s = lambda x: pd.Timedelta(seconds=x)
+        assert cm.at[0, 0] == s(10) and cm.at[1, 0] == s(20) and cm.at[1, 1] == s(30)
+        assert cm.at[3, 0] == s(15) and cm.values.sum() == s(75)
+
+        np.testing.assert_allclose(online_accuracy(y_true, y_pred, times, 4), [10/45, 1, 0, 0])
+        # Only the classes with a true duration are averaged
+        assert online_accuracy(y_true, y_pred, times, 4, average='macro') == (10/45 + 1)/2
+        assert online_accuracy(y_true, y_pred, times, 4, average='micro') == 40/75
+        assert online_accuracy(y_true, y_pred, times, 4, average='weighted') == 40/75
+
+    def test_invalid_labels(self):
+        y_true, y_pred, times = _create_predictions()
+        with self.assertRaises(ValueError):
+            online_confusion_matrix(y_true, y_pred, times, n_classes=3)
+        with self.assertRaises(ValueError):
+            online_confusion_matrix(y_true.astype(str), y_pred, times, n_classes=4)
+        with self.assertRaises(ValueError):
+            online_accuracy(y_true, y_pred, times, 4, average='samples')
+
+
+class TestOnlineConfusionAccumulator(unittest.TestCase):
+
+    def test_batches(self):
+        y_true, y_pred, times = _create_predictions()
+        expected = online_confusion_matrix(y_true, y_pred, times, n_classes=4)
+
+        acc = OnlineConfusionAccumulator(n_classes=4)
+        for batch in np.array_split(np.arange(len(times)), 9):
+            acc.update(y_true[batch], y_pred[batch], times[batch])
+        pd.testing.assert_frame_equal(acc.confusion_matrix(), expected)
+        for average in [None, 'micro', 'macro', 'weighted']:
+            np.testing.assert_allclose(acc.compute(average),
+                                       online_accuracy(y_true, y_pred, times, 4, average))
+
+        # Classes that were not seen in the first batch do not lower the score
+        acc.reset().update(np.zeros(3, dtype=int), np.zeros(3, dtype=int), times[:3])
+        assert acc.compute('macro') == 1.
+
+        acc.reset()
+        assert acc.compute('macro') == 0 and acc.confusion_matrix().values.sum() == pd.Timedelta(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import tempfile
+import unittest
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.linear_model import LogisticRegression
+
+from pyadlml.pipeline import Pipeline, StepCache, XAndYTransformer, YTransformer
+
+
+N_FITS = Counter()
+
+
+class _Scaler(BaseEstimator, TransformerMixin):
+    def __init__(self, scale=1.):
+        self.scale = scale
+
+    def fit(self, X, y=None):
+        N_FITS['scaler'] += 1
+        return self
+
+    def transform(self, X):
+        return X*self.scale
+
+
+class _Labeler(BaseEstimator, TransformerMixin, YTransformer):
+    def fit(self, y, X=None):
+        N_FITS['labeler'] += 1
+        return self
+
+    def transform(self, y, X=None):
+        return (y > 0).astype(int)
+
+
+class _DropFirst(BaseEstimator, TransformerMixin, XAndYTransformer):
+    def __init__(self, n=1):
+        self.n = n
+
+    def fit(self, X, y):
+        N_FITS['drop'] += 1
+        return self
+
+    def transform(self, X, y):
+        return X.iloc[self.n:], y.iloc[self.n:]
+
+    def fit_transform(self, X, y):
+        return self.fit(X, y).transform(X, y)
+
+
+def _create_data(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        'time': pd.Timestamp('2020-01-01') + pd.to_timedelta(np.arange(n), unit='s'),
+        'a': rng.normal(size=n),
+        'b': rng.normal(size=n),
+    }).set_index('time')
+    y = pd.Series(X['a'].values + rng.normal(scale=0.1, size=n), index=X.index)
+    return X, y
+
+
+def _create_pipe(memory, clf=None):
+    return Pipeline([
+        ('drop', _DropFirst()),
+        ('labeler', _Labeler()),
+        ('scaler', _Scaler()),
+        ('clf', LogisticRegression() if clf is None else clf),
+    ], memory=memory)
+
+
+class TestStepCache(unittest.TestCase):
+
+    def setUp(self):
+        N_FITS.clear()
+
+    def test_skip_fitted_steps(self):
+        X, y = _create_data()
+        expected = _create_pipe(None).fit(X, y)[-1].coef_
+        N_FITS.clear()
+
+        cache = StepCache()
+        pipe = _create_pipe(cache)
+        for _ in range(2):
+            pipe.fit(X, y)
+            np.testing.assert_allclose(pipe[-1].coef_, expected)
+        assert N_FITS == {'drop': 1, 'labeler': 1, 'scaler': 1}
+        assert cache.hits == 3 and cache.misses == 3
+
+        # Equal content hits the cache, changed parameters refit the downstream steps
+        clone(pipe).fit(X.copy(), y.copy())
+        pipe.set_params(clf__C=0.1).fit(X, y)
+        pipe.set_params(scaler__scale=2.).fit(X, y)
+        assert N_FITS == {'drop': 1, 'labeler': 1, 'scaler': 2}
+        pipe.set_params(drop__n=2).fit(X, y)
+        assert N_FITS == {'drop': 2, 'labeler': 2, 'scaler': 3}
+        X.iloc[5, 0] += 1
+        pipe.fit(X, y)
+        assert N_FITS == {'drop': 3, 'labeler': 3, 'scaler': 4}
+
+    def test_outputs_are_copied(self):
+        X, y = _create_data()
+        pipe = _create_pipe(StepCache(), clf='passthrough')
+        Xt, yt = pipe.fit_transform(X, y)
+        Xt.iloc[:, :] = 0
+        Xt, yt = pipe.fit_transform(X, y)
+        np.testing.assert_allclose(Xt.values, X.iloc[1:].values)
+        np.testing.assert_array_equal(yt.values, (y.iloc[1:] > 0).values)
+
+    def test_memory_eviction(self):
+        X, y = _create_data()
+        expected = _create_pipe(None).fit(X, y)[-1].coef_
+
+        # The outputs of the first step exceed the limit and are not kept
+        cache = StepCache(max_bytes=X.memory_usage().sum())
+        pipe = _create_pipe(cache)
+        for _ in range(2):
+            pipe.fit(X, y)
+            assert len(cache._memory) == 1 and cache._nbytes <= cache.max_bytes
+            np.testing.assert_allclose(pipe[-1].coef_, expected)
+
+    def test_location(self):
+        X, y = _create_data()
+        with tempfile.TemporaryDirectory() as tmp:
+            _create_pipe(StepCache(tmp)).fit(X, y)
+            cache = StepCache(tmp)
+            _create_pipe(cache).fit(X, y)
+            assert N_FITS == {'drop': 1, 'labeler': 1, 'scaler': 1}
+            assert cache.hits == 3
+
+            # Foreign folders next to and within the cache are never removed
+            foreign = [pathlib.Path(tmp).joinpath('data'),
+                       pathlib.Path(tmp).joinpath(StepCache.FOLDER, 'data')]
+            for folder in foreign:
+                folder.mkdir()
+                folder.joinpath('file.txt').write_text('keep')
+
+            # Only the most recent step fits into the limit
+            cache = StepCache(tmp, max_disk_bytes=1)
+            _create_pipe(cache).set_params(drop__n=3).fit(X, y)
+            assert len(cache._entries()) == 1
+
+            cache.clear()
+            assert cache._entries() == []
+            assert all(f.joinpath('file.txt').is_file() for f in foreign)
+            foreign[1].joinpath('file.txt').unlink()
+            foreign[1].rmdir()
+            cache.clear()
+            assert not pathlib.Path(tmp).joinpath(StepCache.FOLDER).exists()
+            assert pathlib.Path(tmp).exists()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pyadlml.constants import ACTIVITY, DEVICE, VALUE, TIME
+from pyadlml.preprocessing import StateVectorEncoder, EventWindow, TimeWindow
+
+
+def _create_devices(n=600, seed=0):
+    """ Creates a random device dataframe with boolean and categorical devices
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2020-01-01 08:13:27.123').value
+    times = np.sort(rng.choice(2*24*3600*1000, n, replace=False))*10**6 + start
+    devs = np.array(['bool_1', 'bool_2', 'bool_3', 'cat_1'])
+    dev = rng.choice(devs, n)
+    dev[:len(devs)] = devs
+
+    values, states = [], {}
+    for d in dev:
+        if d.startswith('bool'):
+            states[d] = not states.get(d, False)
+        else:
+            states[d] = rng.choice([v for v in ['open', 'closed', 'half'] if v != states.get(d)])
+        values.append(states[d])
+    return pd.DataFrame({TIME: pd.to_datetime(times), DEVICE: dev,
+                         VALUE: pd.Series(values, dtype=object)})
+
+
+class TestStateVectorEncoder(unittest.TestCase):
+    def setUp(self):
+        self.df_devs = _create_devices()
+
+    def test_partial_transform(self):
+        cuts = [0, 150, 151, 400, 600]
+        for encode in ['raw', 'changepoint', 'last_fired', 'raw+changepoint+last_fired']:
+            for dt in [None, '10min']:
+                sve = StateVectorEncoder(encode=encode, dt=dt).fit(self.df_devs)
+                expected = sve.transform(self.df_devs)
+                res = pd.concat([sve.partial_transform(self.df_devs.iloc[a:b])
+                                 for a, b in zip(cuts[:-1], cuts[1:])], ignore_index=True)
+
+                # The last timeslice is withheld until it is completed
+                if dt is not None:
+                    expected = expected.iloc[:-1]
+                assert (res.columns == expected.columns).all()
+                assert (res.values == expected.values).all(), (encode, dt)
+
+    def test_partial_transform_empty(self):
+        empty = self.df_devs.iloc[:0]
+        cuts = [0, 0, 150, 150, 600, 600]
+        for dt in [None, '10min']:
+            sve = StateVectorEncoder(encode='raw+changepoint', dt=dt).fit(self.df_devs)
+            expected = sve.transform(self.df_devs)
+            if dt is not None:
+                expected = expected.iloc[:-1]
+
+            res = [sve.partial_transform(self.df_devs.iloc[a:b]) for a, b in zip(cuts[:-1], cuts[1:])]
+            for i in [0, 2, 4]:
+                assert len(res[i]) == 0 and list(res[i].columns) == list(expected.columns)
+            res = pd.concat(res[1::2], ignore_index=True)
+            assert (res.values == expected.values).all(), dt
+            assert len(sve.partial_transform(empty)) == 0
+
+
+class TestEventWindow(unittest.TestCase):
+
+    def test_view_matches_copy(self):
+        X = np.arange(50*3).reshape(50, 3)
+        y = np.arange(50)
+        for rep in [EventWindow.REP_M2M, EventWindow.REP_M2O]:
+            for window_size, stride in [(5, 1), (7, 3)]:
+                Xc, yc = EventWindow(rep, window_size, stride).fit_transform(X, y)
+                Xv, yv = EventWindow(rep, window_size, stride, copy=False).fit_transform(X, y)
+
+                assert not Xv.flags.writeable
+                assert np.shares_memory(Xv, X)
+                assert (Xc == Xv).all() and (yc == yv).all()
+                assert (Xc[1] == X[stride:stride+window_size]).all()
+
+                windows = EventWindow(rep, window_size, stride).window_indexer(X, y)
+                assert len(windows) == len(Xc)
+                Xi, yi = windows[2]
+                assert (Xi == Xc[2]).all() and (yi == yc[2]).all()
+                Xi, yi = windows[1:4]
+                assert (Xi == Xc[1:4]).all() and (yi == yc[1:4]).all()
+
+
+class TestTimeWindow(unittest.TestCase):
+
+    def _reference(self, X, window_size, stride, drop_empty):
+        """ Selects the events of each window with a boolean mask """
+        st = X[TIME].iloc[0] - pd.Timedelta('1s')
+        et = X[TIME].iloc[-1] + pd.Timedelta('1s')
+        windows = []
+        for win_st in pd.date_range(st, et - window_size, freq=stride):
+            mask = (win_st <= X[TIME]) & (X[TIME] < win_st + window_size)
+            if mask.any() or not drop_empty:
+                windows.append(X[mask].values)
+        return windows
+
+    def test_ragged_matches_reference(self):
+        rng = np.random.default_rng(1)
+        times = np.sort(rng.choice(10**6, 300, replace=False))*10**9 + pd.Timestamp('2020-01-01').value
+        X = pd.DataFrame({TIME: pd.to_datetime(times), ACTIVITY: rng.choice(['a', 'b'], 300)})
+
+        for window_size, stride in [('1h', '10min'), ('30min', '2h')]:
+            for drop_empty in [True, False]:
+                expected = self._reference(X, pd.Timedelta(window_size), pd.Timedelta(stride), drop_empty)
+                Xt = TimeWindow(window_size, stride, drop_empty_intervals=drop_empty, ragged=True)\
+                        .fit_transform(X)
+                assert len(Xt) == len(expected)
+                for s in range(len(Xt)):
+                    assert (Xt[s] == expected[s]).all()
+
+                padded = TimeWindow(window_size, stride, drop_empty_intervals=drop_empty)\
+                            .fit_transform(X)
+                assert padded.shape == (len(Xt), Xt.lengths.max(), 2)
+                assert pd.isnull(padded).sum() == (padded.shape[1] - Xt.lengths).sum()*2
+
+        y = pd.Series(rng.integers(0, 5, 300)).to_frame()
+        Xt, yt = TimeWindow('1h', '10min', ragged=True).fit_transform(X, y)
+        yt = yt.to_padded(fill_value=-1, dtype=np.int64)
+        assert yt.dtype == np.int64
+        assert ((yt == -1).sum(axis=(1, 2)) == yt.shape[1] - Xt.lengths).all()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pyadlml.constants import DEVICE, VALUE, TIME, BOOL, CAT, NUM
+from pyadlml.dataset._representations.raw import create_raw, resample_raw
+from pyadlml.dataset._representations.changepoint import create_changepoint, resample_changepoint
+from pyadlml.dataset._representations.lastfired import create_lastfired, resample_last_fired
+
+
+def _create_devices(n=400, seed=0):
+    """ Creates a random device dataframe with boolean, categorical and numerical devices
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2020-01-01 08:13:27.123').value
+    times = np.sort(rng.choice(3*24*3600*1000, n, replace=False))*10**6 + start
+    devs = np.array(['bool_1', 'bool_2', 'cat_1', 'num_1'])
+    dev = rng.choice(devs, n)
+    dev[:len(devs)] = devs
+
+    values, states = [], {}
+    for d in dev:
+        if d.startswith('bool'):
+            states[d] = not states.get(d, False)
+            values.append(states[d])
+        elif d.startswith('cat'):
+            states[d] = rng.choice([v for v in ['open', 'closed', 'half'] if v != states.get(d)])
+            values.append(states[d])
+        else:
+            values.append(float(np.round(rng.normal(20, 3), 1)))
+
+    df = pd.DataFrame({TIME: pd.to_datetime(times), DEVICE: dev,
+                       VALUE: pd.Series(values, dtype=object)})
+    info = {
+        'bool_1': {'dtype': BOOL, 'ml_state': False},
+        'bool_2': {'dtype': BOOL, 'ml_state': True},
+        'cat_1': {'dtype': CAT, 'ml_state': 'open'},
+        'num_1': {'dtype': NUM, 'ml_state': 20.0},
+    }
+    return df, info
+
+
+class TestResampleRaw(unittest.TestCase):
+    def setUp(self):
+        self.df_devs, self.info = _create_devices()
+        self.raw = create_raw(self.df_devs, self.info)
+
+    def test_engines_match(self):
+        for dt in ['1min', '20min', '2h']:
+            res_pd = resample_raw(self.raw, self.df_devs, dt, pd.DataFrame(self.info).T, engine='pandas')
+            res_np = resample_raw(self.raw, self.df_devs, dt, self.info, engine='numpy')
+
+            assert (res_pd.columns == res_np.columns).all()
+            assert (res_pd[TIME] == res_np[TIME]).all()
+            for dev in ['bool_1', 'bool_2']:
+                assert (res_pd[dev].astype(int) == res_np[dev].astype(int)).all()
+            assert (res_pd['cat_1'] == res_np['cat_1']).all()
+            assert np.allclose(res_pd['num_1'].astype(float), res_np['num_1'], equal_nan=True)
+
+
+class TestResampleChangepointLastFired(unittest.TestCase):
+    def setUp(self):
+        self.df_devs, _ = _create_devices()
+
+    def test_resample_changepoint(self):
+        cp = create_changepoint(self.df_devs)
+        res = resample_changepoint(cp, '20min').set_index(TIME)
+
+        bins = self.df_devs[TIME].dt.floor('20min')
+        for (b, dev), _ in self.df_devs.groupby([bins, DEVICE]):
+            assert res.at[b, dev] == 1
+        assert res.values.sum() == self.df_devs.groupby([bins, DEVICE]).ngroups
+
+    def test_resample_last_fired(self):
+        lf = create_lastfired(self.df_devs)
+        res = resample_last_fired(lf, '20min')
+
+        # every timeslice holds the device of the last event up to its end
+        for _, row in res.iterrows():
+            end = row[TIME] + pd.Timedelta('20min')
+            last_dev = self.df_devs[self.df_devs[TIME] < end][DEVICE].iat[-1]
+            assert row[last_dev] == 1 and row.drop(TIME).sum() == 1
+
+
+if __name__ == '__main__':
+    unittest.main()
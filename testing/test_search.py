@@ -0,0 +1,147 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import KFold
+
+from pyadlml.constants import TIME
+from pyadlml.model_selection._search import GridSearchCV, HalvingTimeSearchCV, _restrict_to_days
+from pyadlml.model_selection._split import CrossValSelector
+from pyadlml.pipeline import EvalOnlyWrapper, Pipeline, TrainOnlyWrapper
+
+
+class _CountingScaler(BaseEstimator, TransformerMixin):
+    n_fits = 0
+
+    def __init__(self, scale=1.):
+        self.scale = scale
+
+    def fit(self, X, y=None):
+        _CountingScaler.n_fits += 1
+        return self
+
+    def transform(self, X):
+        return X*self.scale
+
+
+def _create_data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4))
+    y = (X[:, 0] + 0.5*rng.normal(size=n) > 0).astype(int)
+    return X, y
+
+
+def _create_pipe():
+    return Pipeline([
+        ('train_sel', TrainOnlyWrapper(CrossValSelector())),
+        ('val_sel', EvalOnlyWrapper(CrossValSelector())),
+        ('scaler', _CountingScaler()),
+        ('clf', LogisticRegression()),
+    ])
+
+
+class TestSharedTransforms(unittest.TestCase):
+    param_grid = {'scaler__scale': [0.5, 2.], 'clf__C': [0.01, 0.1, 1., 10.]}
+
+    def _search(self, **kwargs):
+        X, y = _create_data()
+        search = GridSearchCV(_create_pipe(), self.param_grid, online_train_val_split=True,
+                              cv=KFold(n_splits=3), return_train_score=True, **kwargs)
+        _CountingScaler.n_fits = 0
+        search.fit(X, y)
+        # the refit counts once
+        return search, _CountingScaler.n_fits - 1
+
+    def test_prefix_fitted_once_per_fold(self):
+        shared, n_shared = self._search()
+        assert n_shared == 2*3
+
+        unshared, n_unshared = self._search(share_transforms=False)
+        assert n_unshared == 8*3
+
+        for key in ['mean_test_score', 'mean_train_score', 'rank_test_score']:
+            np.testing.assert_allclose(shared.cv_results_[key], unshared.cv_results_[key])
+        assert shared.best_params_ == unshared.best_params_
+
+    def test_manual_folds(self):
+        X, y = _create_data()
+        search, _ = self._search()
+        for i, params in enumerate(search.cv_results_['params']):
+            for k, (train, test) in enumerate(KFold(n_splits=3).split(X)):
+                clf = LogisticRegression(C=params['clf__C'])
+                clf.fit(X[train]*params['scaler__scale'], y[train])
+                score = clf.score(X[test]*params['scaler__scale'], y[test])
+                assert np.isclose(search.cv_results_[f'split{k}_test_score'][i], score)
+
+
+class _DropTime(BaseEstimator, TransformerMixin):
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        return X.drop(columns=TIME).values
+
+
+def _create_daily_data(n_days=12, seed=0):
+    X, y = _create_data(n=24*n_days, seed=seed)
+    X = pd.DataFrame(X, columns=['a', 'b', 'c', 'd'])
+    X.insert(0, TIME, pd.date_range('2020-01-01', periods=len(X), freq='1h'))
+    return X, y
+
+
+class TestHalvingTimeSearch(unittest.TestCase):
+    param_grid = {'clf__C': [0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1., 3., 10.]}
+
+    def _search(self, online=True):
+        X, y = _create_daily_data()
+        steps = [('drop_time', _DropTime()), ('clf', LogisticRegression())]
+        if online:
+            steps = [('train_sel', TrainOnlyWrapper(CrossValSelector())),
+                     ('val_sel', EvalOnlyWrapper(CrossValSelector()))] + steps
+        search = HalvingTimeSearchCV(Pipeline(steps), self.param_grid, factor=3,
+                                     online_train_val_split=online, cv=KFold(n_splits=3))
+        return search.fit(X, y), X, y
+
+    def test_rounds(self):
+        search, X, y = self._search()
+        assert search.n_days_ == [1, 3, 12] and search.n_candidates_ == [9, 3, 1]
+
+        res = search.cv_results_
+        np.testing.assert_array_equal(res['iter'], [0]*9 + [1]*3 + [2])
+        np.testing.assert_array_equal(res['n_days'], [1]*9 + [3]*3 + [12])
+        np.testing.assert_allclose(res['round_time'], np.repeat(search.round_times_, [9, 3, 1]))
+        assert search.best_params_ == res['params'][-1]
+
+        # The first round trains on the last day of each training fold
+        days = X[TIME].dt.floor('D').values
+        features = X.drop(columns=TIME).values
+        for k, (train, test) in enumerate(KFold(n_splits=3).split(X)):
+            train = train[days[train] == days[train].max()]
+            clf = LogisticRegression(C=0.1).fit(features[train], y[train])
+            assert np.isclose(res[f'split{k}_test_score'][4], clf.score(features[test], y[test]))
+
+        offline, _, _ = self._search(online=False)
+        np.testing.assert_allclose(offline.cv_results_['mean_test_score'], res['mean_test_score'])
+
+    def test_restrict_time_ranges(self):
+        ts = pd.Timestamp
+        day = pd.Timedelta('1D')
+        assert _restrict_to_days((ts('2020-01-01'), ts('2020-01-10')), 2, None) \
+            == (ts('2020-01-08'), ts('2020-01-10'))
+        assert _restrict_to_days((ts('2020-01-01'), ts('2020-01-02')), 2, None) \
+            == (ts('2020-01-01'), ts('2020-01-02'))
+
+        train = ((ts('2020-01-01'), ts('2020-01-05')), (ts('2020-01-07'), ts('2020-01-09')))
+        assert _restrict_to_days(train, 1, None) == (ts('2020-01-08'), ts('2020-01-09'))
+        assert _restrict_to_days(train, 3, None) == ((ts('2020-01-05') - day, ts('2020-01-05')), train[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
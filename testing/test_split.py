@@ -0,0 +1,96 @@
+import sys
+import pathlib
+working_directory = pathlib.Path().absolute()
+script_directory = pathlib.Path(__file__).parent.absolute()
+sys.path.append(str(working_directory))
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pyadlml.constants import DEVICE, TIME, VALUE
+from pyadlml.model_selection import CrossValSelector, LeaveKDayOutSplit, TimeSeriesSplit
+from pyadlml.model_selection._split import IndexRanges
+
+
+def _create_devices(n=2000, n_days=10, seed=0):
+    rng = np.random.default_rng(seed)
+    offsets = pd.to_timedelta(np.sort(rng.integers(0, n_days*86400, n)), unit='s')
+    return pd.DataFrame({
+        TIME: pd.Timestamp('2020-01-01') + offsets,
+        DEVICE: rng.choice(['a', 'b'], n),
+        VALUE: rng.choice([True, False], n),
+    })
+
+
+def _positions(df, st, et):
+    return np.flatnonzero(((st < df[TIME]) & (df[TIME] < et)).values)
+
+
+class TestLeaveKDayOutSplit(unittest.TestCase):
+
+    def test_ranges(self):
+        df_devs = _create_devices()
+        splits = LeaveKDayOutSplit(n_splits=3, k=2).split(df_devs)
+        intervals = LeaveKDayOutSplit(n_splits=3, k=2, return_timestamp=True).split(df_devs)
+        assert len(splits) == 3
+
+        for (train, test), (train_int, test_int) in zip(splits, intervals):
+            assert isinstance(test, slice)
+            np.testing.assert_array_equal(np.arange(len(df_devs))[test], _positions(df_devs, *test_int))
+            if isinstance(train_int[0], tuple):
+                # The training set encloses the test set
+                expected = np.concatenate([_positions(df_devs, *train_int[0]),
+                                           _positions(df_devs, *train_int[1])])
+                np.testing.assert_array_equal(train, expected)
+            else:
+                assert isinstance(train, slice)
+                np.testing.assert_array_equal(np.arange(len(df_devs))[train],
+                                              _positions(df_devs, *train_int))
+
+    def test_shift(self):
+        df_devs = _create_devices()
+        train, test = LeaveKDayOutSplit(n_splits=3, k=2, shift=True).split(df_devs)[1]
+        assert isinstance(train, IndexRanges) and train.offsets[1] == pd.Timedelta('-2D')
+        # The input is not modified by the split
+        pd.testing.assert_frame_equal(df_devs, _create_devices())
+
+        y = np.arange(len(df_devs))
+        X_sel, y_sel = CrossValSelector(data_range=train).fit_transform(df_devs, y)
+        np.testing.assert_array_equal(y_sel, train.to_indices())
+        second = df_devs.iloc[train[1]]
+        np.testing.assert_array_equal(X_sel[TIME].values[-len(second):],
+                                      (second[TIME] - pd.Timedelta('2D')).values)
+        assert X_sel[TIME].is_monotonic_increasing
+
+    def test_unsorted(self):
+        df_devs = _create_devices().iloc[::-1]
+        with self.assertRaises(ValueError):
+            LeaveKDayOutSplit(n_splits=2).split(df_devs)
+
+
+class TestTimeSeriesSplit(unittest.TestCase):
+
+    def test_temporal_ranges(self):
+        df_devs = _create_devices()
+        kwargs = dict(n_splits=4, temporal_split=True, max_train_size=pd.Timedelta('3D'))
+        splits = TimeSeriesSplit(**kwargs).split(df_devs)
+        intervals = TimeSeriesSplit(return_timestamp=True, **kwargs).split(df_devs)
+        for (train, test), (train_int, test_int) in zip(splits, intervals):
+            assert isinstance(train, slice) and isinstance(test, slice)
+            assert train_int[1] - train_int[0] <= pd.Timedelta('3D')
+            np.testing.assert_array_equal(np.arange(len(df_devs))[train], _positions(df_devs, *train_int))
+            np.testing.assert_array_equal(np.arange(len(df_devs))[test], _positions(df_devs, *test_int))
+
+    def test_index_timestamps(self):
+        df_devs = _create_devices()
+        splits = TimeSeriesSplit(n_splits=3, gap=5).split(df_devs)
+        intervals = TimeSeriesSplit(n_splits=3, gap=5, return_timestamp=True).split(df_devs)
+        for (train, test), (train_int, test_int) in zip(splits, intervals):
+            assert train.stop + 5 == test.start
+            assert train_int[1] == df_devs[TIME].iloc[train.stop - 1] + TimeSeriesSplit.EPS
+            assert test_int[0] == df_devs[TIME].iloc[test.start] - TimeSeriesSplit.EPS
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Measures the cold-load time and peak memory of the dataset loaders.
+
+Every dataset is loaded from its original files without the cache in a fresh
+process such that the peak resident set size belongs to that dataset alone.
+The original files are downloaded into the data home on first use.
+
+    python tools/benchmark_loaders.py -d casas_milan casas_kyoto_2010 casas_tulum kasteren_A
+"""
+import argparse
+import multiprocessing as mp
+import resource
+import sys
+import time
+
+from pyadlml.constants import DATASET_STRINGS
+
+
+def _cold_load(dataset, queue):
+    from pyadlml.dataset.util import fetch_by_name
+
+    start = time.perf_counter()
+    fetch_by_name(dataset, cache=False, keep_original=True)
+    runtime = time.perf_counter() - start
+
+    # ru_maxrss is given in kilobytes on linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss /= 2**20 if sys.platform == 'darwin' else 2**10
+    queue.put((runtime, peak_rss))
+
+
+def benchmark(dataset, repeat=1):
+    """ Returns the best cold-load time in seconds and the peak RSS in MB.
+    """
+    ctx = mp.get_context('spawn')
+    results = []
+    for _ in range(repeat):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_cold_load, args=(dataset, queue))
+        proc.start()
+        results.append(queue.get())
+        proc.join()
+    return min(r[0] for r in results), max(r[1] for r in results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-d', '--datasets', type=str, nargs='+',
+                        default=['casas_aruba', 'casas_milan', 'casas_kyoto_2010', 'casas_tulum',
+                                 'kasteren_A', 'kasteren_B', 'kasteren_C'],
+                        choices=DATASET_STRINGS,
+                        help='Select the datasets to benchmark.'
+                        )
+    parser.add_argument('-r', '--repeat', type=int, default=1,
+                        help='Number of cold loads per dataset.'
+    )
+    args = parser.parse_args()
+
+    print(f"{'dataset':<20}{'time [s]':>12}{'peak RSS [MB]':>16}")
+    for dataset in args.datasets:
+        runtime, peak_rss = benchmark(dataset, args.repeat)
+        print(f'{dataset:<20}{runtime:>12.2f}{peak_rss:>16.0f}')